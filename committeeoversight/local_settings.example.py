@@ -21,4 +21,32 @@ DATABASES = {
     }
 }
 
+# Cache shared by every worker, behind each worker's in-memory cache. Defaults
+# to a file-based cache in the project directory. To share it between servers,
+# use a Redis-compatible backend, e.g., with django-redis:
+#
+# SHARED_CACHE = {
+#     'BACKEND': 'django_redis.cache.RedisCache',
+#     'LOCATION': 'redis://localhost:6379/1',
+# }
+#
+# A file-based shared cache deletes a third of its entries at random once it
+# holds MAX_ENTRIES, 20000 by default. Raise it with OPTIONS if the cache
+# fills up, e.g., 'OPTIONS': {'MAX_ENTRIES': 50000}.
+
+# Cache for the versions of cached data, which must never be evicted, or
+# every cached rating table and committee is rebuilt. Defaults to a
+# file-based cache of its own. With Redis, use another database with an
+# eviction policy that keeps keys without an expiry, e.g., volatile-lru:
+#
+# VERSION_CACHE = {
+#     'BACKEND': 'django_redis.cache.RedisCache',
+#     'LOCATION': 'redis://localhost:6379/2',
+# }
+
+# Log the queries run by each request, and report them in the X-Query-Count
+# and Server-Timing response headers
+#
+# QUERY_LOG = True
+
 SENTRY_DSN = ''
@@ -72,6 +72,7 @@ INSTALLED_APPS = [
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
 MIDDLEWARE = [
+    'committeeoversightapp.query_log.QueryLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.cache.UpdateCacheMiddleware',
@@ -91,11 +92,78 @@ CACHE_MIDDLEWARE_KEY_PREFIX = ''
 
 ROOT_URLCONF = 'committeeoversight.urls'
 
+try:
+    from committeeoversight.local_settings import SHARED_CACHE
+except ImportError:
+    # If no SHARED_CACHE is configured, share cached data between the workers
+    # on this server through the filesystem. Once full, it deletes a third of
+    # its files at random, so leave room for the cached pages, fragments and
+    # hearing list counts.
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+
+try:
+    from committeeoversight.local_settings import VERSION_CACHE
+except ImportError:
+    # The versions of cached data (see committeeoversightapp.cache) are kept
+    # apart from the data, where culling a full cache can't delete them
+    VERSION_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'versions'),
+    }
+
+try:
+    from committeeoversight.local_settings import QUERY_LOG
+except ImportError:
+    # Log the count, time and call sites of the queries run by each request.
+    # See committeeoversightapp.query_log.
+    QUERY_LOG = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'committeeoversightapp.query_log': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+try:
+    from committeeoversight.local_settings import ARCHIVE_BACKEND, ARCHIVE_OPTIONS
+except ImportError:
+    # Archive hearing documents to the Wayback Machine. See
+    # committeeoversightapp.archive for swapping in another archive.
+    ARCHIVE_BACKEND = 'committeeoversightapp.archive.WaybackArchive'
+    ARCHIVE_OPTIONS = {}
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'cache_table',
-    }
+        'BACKEND': 'committeeoversightapp.cache.TieredCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_TIMEOUT': 30,
+        },
+    },
+    'shared': SHARED_CACHE,
+    'versions': {
+        'BACKEND': 'committeeoversightapp.cache.TieredCache',
+        'LOCATION': 'versions-l1',
+        'OPTIONS': {
+            'L2': 'shared_versions',
+            'L1_TIMEOUT': 30,
+        },
+    },
+    'shared_versions': VERSION_CACHE,
 }
 
 TEMPLATES = [
@@ -24,7 +24,7 @@ from wagtail.admin import urls as wagtailadmin_urls
 from wagtail.documents import urls as wagtaildocs_urls
 from wagtail.core import urls as wagtail_urls
 
-from committeeoversightapp.views import pong
+from committeeoversightapp.views import pong, cache_stats
 from committeeoversightapp.models import HearingEvent
 
 
@@ -42,6 +42,7 @@ sitemaps = {
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('pong/', pong,),
+    path('cache/stats/', cache_stats),
     path('', include('committeeoversightapp.urls')),
     path('sitemap.xml', views.index, {'sitemaps': sitemaps}),
     path('sitemap-<section>.xml', views.sitemap, {'sitemaps': sitemaps},
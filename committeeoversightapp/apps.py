@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class committeeoversightappConfig(AppConfig):
     name = 'committeeoversightapp'
+
+    def ready(self):
+        from . import signals
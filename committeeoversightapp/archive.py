@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class ArchiveError(Exception):
+    """The archive didn't return a snapshot of a URL."""
+
+
+class RateLimiter(object):
+    """
+    Space out requests to each host at least interval seconds apart, across
+    every thread sharing the limiter.
+    """
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_request = defaultdict(float)
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_request[host])
+            self.next_request[host] = start + self.interval
+
+        time.sleep(start - now)
+
+
+class WaybackArchive(object):
+    """
+    Save snapshots of URLs to the Internet Archive's Wayback Machine.
+
+    One instance is shared by the threads of archive_documents. They reuse
+    up to pool_size connections, and send at most requests_per_minute
+    requests to each host, to stay under the Wayback Machine's limits.
+
+    Archives are swappable through the ARCHIVE_BACKEND setting, e.g., for a
+    stub in tests. They need a save(url) method that returns the URL of the
+    snapshot, or raises an exception if there isn't one, in which case the
+    ArchiveJob is retried.
+    """
+    def __init__(self,
+                 host='http://web.archive.org',
+                 timeout=120,
+                 pool_size=10,
+                 requests_per_minute=15):
+        self.host = host
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(60 / requests_per_minute)
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def save(self, url):
+        save_url = '{0}/save/{1}'.format(self.host, url)
+
+        self.rate_limiter.wait(save_url)
+        response = self.session.get(save_url, timeout=self.timeout)
+        response.raise_for_status()
+
+        try:
+            return '{0}{1}'.format(self.host, response.headers['Content-Location'])
+        except KeyError:
+            raise ArchiveError('No snapshot of {} was returned'.format(url))
+
+
+def get_archive():
+    """Return an instance of the archive named by ARCHIVE_BACKEND."""
+    backend = import_string(settings.ARCHIVE_BACKEND)
+    return backend(**settings.ARCHIVE_OPTIONS)
@@ -0,0 +1,183 @@
+import uuid
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import DisallowedHost
+from django.http import HttpRequest
+from django.utils.cache import get_cache_key
+
+_missing = object()
+
+
+class TieredCache(BaseCache):
+    """
+    Two-level cache backend: a small local-memory cache in each worker (L1)
+    in front of a cache shared by every worker (L2), e.g., a file-based or
+    Redis-compatible backend, named by the L2 option.
+
+    L1 entries live for at most L1_TIMEOUT seconds, which bounds how long a
+    worker can keep serving a value deleted or replaced by another worker.
+    Hit and miss counts for this worker are available from stats().
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'committeeoversightapp.cache.TieredCache',
+            'OPTIONS': {'L2': 'shared', 'L1_TIMEOUT': 30},
+        },
+        'shared': {...},
+    }
+    """
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+
+        self.l2_alias = options.get('L2', 'shared')
+        self.l1_timeout = options.get('L1_TIMEOUT', 30)
+        self.l1 = LocMemCache(location or 'tiered-l1', {
+            'TIMEOUT': self.l1_timeout,
+            'OPTIONS': {'MAX_ENTRIES': options.get('L1_MAX_ENTRIES', 1000)},
+        })
+        self.counts = Counter()
+
+    @property
+    def l2(self):
+        return caches[self.l2_alias]
+
+    def get_l1_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.l1_timeout
+        return min(timeout, self.l1_timeout)
+
+    def stats(self):
+        return {
+            'l1_hits': self.counts['l1_hits'],
+            'l2_hits': self.counts['l2_hits'],
+            'misses': self.counts['misses'],
+        }
+
+    def get(self, key, default=None, version=None):
+        value = self.l1.get(key, _missing, version=version)
+        if value is not _missing:
+            self.counts['l1_hits'] += 1
+            return value
+
+        value = self.l2.get(key, _missing, version=version)
+        if value is not _missing:
+            self.counts['l2_hits'] += 1
+            self.l1.set(key, value, self.l1_timeout, version=version)
+            return value
+
+        self.counts['misses'] += 1
+        return default
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version=version)
+        if added:
+            self.l1.set(key, value, self.get_l1_timeout(timeout), version=version)
+        return added
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version=version)
+        self.l1.set(key, value, self.get_l1_timeout(timeout), version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l1.touch(key, self.get_l1_timeout(timeout), version=version)
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.l1.delete(key, version=version)
+        self.l2.delete(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self.l1.delete(key, version=version)
+        return self.l2.incr(key, delta, version=version)
+
+    def has_key(self, key, version=None):
+        return self.l1.has_key(key, version=version) \
+            or self.l2.has_key(key, version=version)
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+
+def get_cache_version(name):
+    """
+    Return the current version of a named set of cached data, for use in
+    cache keys. Versions are kept in the 'versions' cache, apart from the
+    data. If the version hasn't been set, or has been evicted, start a new
+    one, so that keys built before the eviction aren't reused.
+    """
+    cache = caches['versions']
+    key = name + '_version'
+
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key) or version
+
+    return version
+
+
+def set_cache_version(name, version=None):
+    """
+    Replace the version of a named set of cached data, orphaning any keys
+    built from the old version. Defaults to a random version.
+    """
+    caches['versions'].set(name + '_version', version or uuid.uuid4().hex, None)
+
+
+class PurgeRequest(HttpRequest):
+    """A bare GET request for looking up a URL's cached response."""
+    def __init__(self, url):
+        super().__init__()
+        url = urlsplit(url)
+        self.method = 'GET'
+        self.path = self.path_info = url.path
+        self.META['HTTP_HOST'] = url.netloc
+        self.META['QUERY_STRING'] = url.query
+        self.url_scheme = url.scheme
+
+    def _get_scheme(self):
+        return self.url_scheme
+
+
+def purge_urls(urls):
+    """
+    Remove the responses stored by the cache middleware for each absolute
+    URL, over both http and https.
+    """
+    cache = caches[settings.CACHE_MIDDLEWARE_ALIAS]
+
+    for url in urls:
+        path = url.split('://', 1)[-1]
+
+        for scheme in ('http', 'https'):
+            request = PurgeRequest('{}://{}'.format(scheme, path))
+
+            for method in ('GET', 'HEAD'):
+                try:
+                    key = get_cache_key(request, method=method, cache=cache)
+                except DisallowedHost:
+                    key = None
+
+                if key:
+                    cache.delete(key)
+
+
+def purge_pages(pages):
+    """Purge the cached responses for a list of Wagtail pages."""
+    urls = []
+
+    for page in pages:
+        url_parts = page.get_url_parts()
+        if url_parts:
+            _, root_url, page_path = url_parts
+            urls.append(root_url + page_path)
+
+    purge_urls(urls)
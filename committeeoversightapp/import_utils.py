@@ -0,0 +1,283 @@
+import csv
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from difflib import SequenceMatcher
+
+VALID_CATEGORIES = {str(category) for category in range(1,14)}
+
+HearingRecord = namedtuple('HearingRecord', [
+    'filename',
+    'row_index',
+    'row',
+    'name',
+    'start_date',
+    'classification',
+    'category',
+    'committee_codes',
+    'hearing_number',
+    'source',
+    'source_hash',
+])
+
+# A hearing matched by name: its id and name, and how similar the names are,
+# from 0 to 1. Names that are equal once normalized have a ratio of 1.
+HearingMatch = namedtuple('HearingMatch', ['event_id', 'name', 'ratio'])
+
+
+def get_source_hash(row):
+    '''
+    A fixed-width fingerprint of a spreadsheet row, for skipping rows that
+    have already been imported.
+    '''
+    return hashlib.sha256(str(sorted(row.items())).encode()).hexdigest()
+
+
+def clean_encoding(name):
+    '''
+    Fix punctuation that was decoded as Windows-1252 instead of UTF-8.
+    '''
+    return name \
+        .replace('â€“', '–') \
+        .replace('â€™', '’') \
+        .replace('â€\x9d', '”') \
+        .replace('â€œ', '“') \
+        .replace('â€˜', '‘') \
+        .replace('â€”', '—')
+
+
+def normalize_name(name):
+    '''
+    The lowercase words of a hearing name, without punctuation, accents or
+    extra whitespace, so that "The Nation’s Farms -- Part 1" and
+    "the nation's farms: part 1" compare equal.
+    '''
+    name = unicodedata.normalize('NFKD', clean_encoding(name)).lower()
+    return ' '.join(re.findall(r'\w+', name))
+
+
+def read_rows(filename):
+    '''
+    Yield (row_index, row) for each hearing in a spreadsheet, where
+    row_index is the row's line number, for debugging purposes.
+    '''
+    with open(filename, 'r') as csvfile:
+        for row_index, row in enumerate(csv.DictReader(csvfile), 2):
+            # ignore rows with a missing name
+            if row['Hearing/Report']:
+                yield row_index, row
+
+
+def read_rejected_rows(path, filename):
+    '''
+    Yield (row_index, row) for each row from filename that a RejectionLog
+    at path recorded as rejected, e.g., after correcting them in the log.
+    '''
+    with open(path, 'r') as f:
+        for line in f:
+            rejection = json.loads(line)
+
+            if rejection['rejected'] and rejection['file'] == filename:
+                yield rejection['row_index'], rejection['row']
+
+
+def get_house_committee_codes(row):
+    # get committees into a edited list format
+    # committee codes with a zero appended indicate "full committee"
+    # and only the full committee will be recorded as an event participant
+    # hearings with a subcommittee listed will only have the subcommittee saved,
+    # as the full committee is attached as a parent
+
+    committee1 = row['Committee1']
+    committee2 = row['Committee2']
+    subcommittee1 = row['Subcommittee']
+    subcommittee2 = row['Subcommittee2']
+
+    participating_committees = []
+
+    if (committee1 and not subcommittee1) or (subcommittee1 == (committee1 + str(0))):
+        participating_committees.append(committee1)
+    elif committee1:
+        participating_committees.append(subcommittee1)
+
+    if (committee2 and not subcommittee2) or (subcommittee2 == (committee2 + str(0))):
+        participating_committees.append(committee2)
+    elif committee2:
+        participating_committees.append(subcommittee2)
+
+    return participating_committees
+
+
+def parse_records(rows, filename, chamber, rejections):
+    '''
+    Validate (row_index, row) pairs from one chamber's spreadsheet, yielding
+    a HearingRecord for each usable row and logging problems to rejections
+    as they're found.
+
+    Rows without a valid date are rejected. Otherwise, unrecognized
+    committee codes, categories and hearing numbers are logged and left out
+    of the record, and the hearing is still imported.
+    '''
+    for row_index, row in rows:
+        errors = []
+
+        raw_date = row['Date'].split('T', 1)[0]
+        try:
+            start_date = datetime.strptime(raw_date, '%Y-%m-%d').date().isoformat()
+        except ValueError:
+            start_date = None
+            errors.append(('Date', row['Date'], 'Unrecognized date'))
+
+        if chamber == 'house':
+            committee_codes = get_house_committee_codes(row)
+        else:
+            committee_codes = [row['Committee1'], row['Committee2']]
+
+        valid_codes = []
+        for code in committee_codes:
+            if code.strip().isdigit():
+                valid_codes.append(str(int(code)))
+            elif code:
+                errors.append(('Committee', code, 'Bad committee code'))
+
+        category = row['Category1']
+        if category and category not in VALID_CATEGORIES:
+            errors.append(('Category1', category, 'Unrecognized category'))
+            category = None
+
+        hearing_number_raw = row.get('Hearing #')
+        hearing_number = None
+        if hearing_number_raw:
+            match = re.search(r'\d{2,}-\d{1,}', hearing_number_raw)
+            if match:
+                hearing_number = match.group(0)
+            else:
+                errors.append(('Hearing #', hearing_number_raw, 'Unrecognized hearing number'))
+
+        rejected = start_date is None
+
+        if errors:
+            rejections.write(filename, row_index, row, errors, rejected)
+
+        if not rejected:
+            yield HearingRecord(filename=filename,
+                                row_index=row_index,
+                                row=row,
+                                name=row['Hearing/Report'],
+                                start_date=start_date,
+                                classification=row['Type'],
+                                category=category or None,
+                                committee_codes=valid_codes,
+                                hearing_number=hearing_number,
+                                source=row['source'],
+                                source_hash=get_source_hash(row))
+
+
+class RejectionLog(object):
+    '''
+    A JSON Lines file with one entry per spreadsheet row that failed
+    validation, written as rows are read:
+
+    {"file": "data/final/house.csv", "row_index": 12, "rejected": true,
+     "errors": [{"field": "Date", "value": "2017-13-01", "message": "..."}],
+     "row": {...}}
+
+    Rejected rows were not imported. Correct them in the log and pass it to
+    import_data --rejected to import only those rows.
+    '''
+    def __init__(self, path, append=False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a' if append else 'w')
+        self.count = 0
+        self.rejected_count = 0
+
+    def write(self, filename, row_index, row, errors, rejected):
+        entry = {
+            'file': filename,
+            'row_index': row_index,
+            'rejected': rejected,
+            'errors': [
+                {'field': field, 'value': value, 'message': message}
+                for field, value, message in errors
+            ],
+            'row': row,
+        }
+
+        with self.lock:
+            self.file.write(json.dumps(entry) + '\n')
+            self.file.flush()
+
+            self.count += 1
+            if rejected:
+                self.rejected_count += 1
+
+    def close(self):
+        self.file.close()
+
+
+class HearingNameMatcher(object):
+    '''
+    Match hearing names from a spreadsheet to hearings, built once from
+    (id, start_date, name) tuples.
+
+    Candidates are blocked by date, so a name is only compared with the
+    names of hearings held that day, and with names containing the same
+    numbers, so that "Part 1" is never matched to "Part 2". Normalized names
+    that are equal match outright; otherwise the most similar name matches
+    if its similarity is at least threshold and beats the runner-up's by at
+    least margin. Ties between the best candidates don't match.
+
+    Matches that aren't exact may still be to a sibling hearing, e.g., the
+    nomination of Jane Smith rather than John Smith, so callers should have
+    them reviewed rather than apply them.
+    '''
+    def __init__(self, hearings, threshold=0.9, margin=0.05):
+        self.threshold = threshold
+        self.margin = margin
+        self.by_date = defaultdict(list)
+
+        for event_id, start_date, name in hearings:
+            normalized = normalize_name(name)
+            self.by_date[start_date].append(
+                (event_id, name, normalized, re.findall(r'\d+', normalized))
+            )
+
+    def match(self, start_date, name):
+        '''
+        Return a HearingMatch for the hearing on start_date best matching
+        name, or None.
+        '''
+        name = normalize_name(name)
+        numbers = re.findall(r'\d+', name)
+
+        ratios = []
+        for event_id, original, candidate, candidate_numbers in self.by_date.get(start_date, []):
+            if candidate_numbers != numbers:
+                continue
+
+            if candidate == name:
+                ratio = 1.0
+            else:
+                ratio = SequenceMatcher(None, name, candidate).ratio()
+
+            ratios.append(HearingMatch(event_id, original, ratio))
+
+        if not ratios:
+            return None
+
+        ratios.sort(key=lambda match: match.ratio, reverse=True)
+        best = ratios[0]
+        runner_up = ratios[1].ratio if len(ratios) > 1 else 0
+
+        if best.ratio < self.threshold or best.ratio == runner_up:
+            return None
+
+        if best.ratio < 1 and best.ratio - runner_up < self.margin:
+            return None
+
+        return best
@@ -0,0 +1,103 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from committeeoversightapp.archive import get_archive
+from committeeoversightapp.models import ArchiveJob
+
+
+class Command(BaseCommand):
+    help = "Archive queued hearing documents and save links to the snapshots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Archive this many documents at a time'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Claim this many due jobs at a time'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Give up on a document after this many attempts'
+        )
+        parser.add_argument(
+            '--backoff',
+            type=int,
+            default=60,
+            help='Seconds to wait before the first retry, doubling with each attempt'
+        )
+        parser.add_argument(
+            '--lease',
+            type=int,
+            default=3600,
+            help='Seconds before a claimed job that was never finished can be claimed again. '
+                 'Keep this well above the time a batch can take: each save can wait '
+                 'on the rate limit and then time out after two minutes'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep waiting for new jobs instead of exiting once no jobs are due'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=int,
+            default=30,
+            help='With --loop, seconds to wait between checks for due jobs'
+        )
+
+    def handle(self, *args, **options):
+        self.archive = get_archive()
+        self.options = options
+        counts = Counter()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                jobs = ArchiveJob.objects.claim(options['batch_size'],
+                                                options['lease'])
+
+                if not jobs:
+                    if options['loop']:
+                        time.sleep(options['poll_interval'])
+                        continue
+                    break
+
+                for status in executor.map(self.run_job, jobs):
+                    counts[status] += 1
+
+                self.stdout.write('{}: Archived {} documents, {} to retry, {} failed.'.format(
+                    datetime.now(),
+                    counts[ArchiveJob.DONE],
+                    counts[ArchiveJob.PENDING],
+                    counts[ArchiveJob.FAILED]
+                ))
+
+        self.stdout.write(self.style.SUCCESS('Archived {} documents.'.format(
+            counts[ArchiveJob.DONE]
+        )))
+
+    def run_job(self, job):
+        try:
+            archived_url = self.archive.save(job.link.url)
+        except Exception as e:
+            claimed = job.retry(e, self.options['max_attempts'], self.options['backoff'])
+        else:
+            claimed = job.complete(archived_url)
+        finally:
+            # Each thread opens its own database connection
+            connection.close()
+
+        # Jobs claimed by another worker since are counted by that worker
+        return job.status if claimed else None
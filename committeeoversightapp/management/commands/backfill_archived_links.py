@@ -0,0 +1,14 @@
+from committeeoversightapp.models import ArchiveJob
+from committeeoversightapp.management.commands import archive_documents
+
+
+class Command(archive_documents.Command):
+    help = "Archive every hearing document that doesn't have an archived link"
+
+    def handle(self, *args, **options):
+        # Queued jobs record which documents are done, so an interrupted
+        # backfill picks up where it left off when run again
+        queued = ArchiveJob.objects.enqueue_missing()
+        self.stdout.write('Queued {} documents to archive.'.format(queued))
+
+        super().handle(*args, **options)
@@ -0,0 +1,83 @@
+import random
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from committeeoversightapp.models import HearingEvent, HearingSearchDocument
+
+
+class Command(BaseCommand):
+    help = "Compare hearing search latency between name__icontains and the full-text index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--terms',
+            nargs='+',
+            help='Search for these terms. Defaults to words sampled from hearing names'
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=20,
+            help='Number of words to sample from hearing names'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Run each search this many times, keeping the median'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=25,
+            help='Fetch this many results per search, as the hearing table does'
+        )
+
+    def handle(self, *args, **options):
+        terms = options['terms'] or self.sample_terms(options['sample'])
+
+        if not terms:
+            raise CommandError('There are no hearings to sample search terms from.')
+
+        searches = {
+            'icontains': lambda term: HearingEvent.objects.filter(name__icontains=term),
+            'full-text': lambda term: HearingSearchDocument.objects.search_events(
+                HearingEvent.objects.all(), term
+            ),
+        }
+        timings = {name: [] for name in searches}
+
+        for term in terms:
+            # Type-ahead searches for each prefix of the term, as DataTables
+            # does on each keystroke
+            for prefix in [term[:i] for i in range(min(3, len(term)), len(term) + 1)]:
+                for name, search in searches.items():
+                    timings[name].append(self.time_search(search(prefix), options))
+
+        self.stdout.write('{} searches for {} terms:'.format(len(timings['icontains']), len(terms)))
+
+        for name, times in timings.items():
+            self.stdout.write('{:>10}: median {:.1f} ms, 95th percentile {:.1f} ms'.format(
+                name,
+                statistics.median(times) * 1000,
+                sorted(times)[int(len(times) * 0.95)] * 1000
+            ))
+
+    def sample_terms(self, sample):
+        names = HearingEvent.objects.order_by('?').values_list('name', flat=True)[:sample]
+        words = [word for name in names for word in re.findall(r'\w{4,}', name)]
+        return random.sample(words, min(sample, len(words)))
+
+    def time_search(self, qs, options):
+        times = []
+
+        for _ in range(options['repeat']):
+            start = time.perf_counter()
+            qs.count()
+            list(qs.order_by('-start_date')[:options['page_size']])
+            times.append(time.perf_counter() - start)
+
+        return statistics.median(times)
@@ -0,0 +1,323 @@
+import random
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from opencivicdata.core.models import Division, Jurisdiction, Organization
+from opencivicdata.legislative.models import Event, EventParticipant, \
+                                             EventDocument, EventDocumentLink, \
+                                             EventSource
+
+from committeeoversightapp.models import Congress, HearingCategory, \
+                                         HearingCategoryType, WitnessDetails, \
+                                         HearingEvent, EventCommitteeSignature, \
+                                         CommitteeHearing, HearingSearchDocument, \
+                                         StaleCommitteeRating
+
+# Generated hearings are marked with a source with this note, so that
+# --clear removes them and nothing else
+SYNTHETIC_NOTE = 'synthetic data'
+
+# Categories weighted roughly as in the Lugar Center's spreadsheets
+CATEGORY_WEIGHTS = {
+    'Policy': 30,
+    'Legislative': 20,
+    'Agency Conduct': 20,
+    'Nominations': 10,
+    'Private Sector Oversight': 5,
+    'Fact Finding': 5,
+    'Field': 4,
+    'Closed': 3,
+    'Other': 3,
+}
+
+TOPICS = ['Agriculture', 'Energy', 'Health Care', 'Veterans', 'Housing',
+          'Transportation', 'Cybersecurity', 'Trade', 'Water Resources',
+          'Small Business', 'Public Lands', 'Election Security', 'Banking',
+          'Drug Pricing', 'Broadband', 'Disaster Recovery', 'Tax Policy']
+
+AGENCIES = ['Department of Agriculture', 'Department of Energy',
+            'Department of Veterans Affairs', 'Federal Aviation Administration',
+            'Environmental Protection Agency', 'Department of Defense',
+            'Securities and Exchange Commission', 'Census Bureau',
+            'Food and Drug Administration', 'Department of Homeland Security']
+
+NAME_TEMPLATES = [
+    'Oversight of the {agency}',
+    'Examining the {agency} Budget Request for Fiscal Year {year}',
+    'The Future of {topic}',
+    '{topic} Reform Act of {year}',
+    'Nomination Hearing on the {agency}',
+    'Review of {topic} Programs at the {agency}',
+    'Challenges Facing {topic} in Rural America',
+]
+
+FIRST_NAMES = ['Jane', 'John', 'Maria', 'David', 'Aisha', 'Wei', 'Carlos',
+               'Emily', 'Robert', 'Priya', 'James', 'Fatima']
+
+LAST_NAMES = ['Smith', 'Garcia', 'Johnson', 'Lee', 'Brown', 'Nguyen', 'Patel',
+              'Williams', 'Davis', 'Martinez', 'Chen', 'Wilson']
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic hearings, committees and Congresses for benchmarking"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hearings',
+            type=int,
+            default=20000,
+            help='Number of hearings to generate'
+        )
+        parser.add_argument(
+            '--first-congress',
+            type=int,
+            default=110,
+            help='Spread hearings over the Congresses from this one...'
+        )
+        parser.add_argument(
+            '--last-congress',
+            type=int,
+            default=116,
+            help='...to this one'
+        )
+        parser.add_argument(
+            '--subcommittees',
+            type=int,
+            default=4,
+            help='Number of subcommittees to add to each permanent committee'
+        )
+        parser.add_argument(
+            '--witnesses',
+            type=int,
+            default=4,
+            help='Greatest number of witnesses per hearing'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of hearings to save per transaction'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed for the random generator, so that runs are repeatable'
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete the hearings generated by earlier runs first'
+        )
+
+    def handle(self, *args, **options):
+        if options['first_congress'] > options['last_congress']:
+            raise CommandError('--first-congress must not be after --last-congress.')
+
+        self.random = random.Random(options['seed'])
+
+        if options['clear']:
+            deleted, _ = Event.objects.filter(sources__note=SYNTHETIC_NOTE).delete()
+            self.stdout.write('Deleted {} rows of generated hearings.'.format(deleted))
+
+        self.jurisdiction = self.get_jurisdiction()
+        self.congresses = self.get_congresses(options['first_congress'],
+                                              options['last_congress'])
+        self.committees = self.get_committees(options['subcommittees'])
+        self.categories = self.get_categories()
+
+        remaining = options['hearings']
+        while remaining > 0:
+            size = min(remaining, options['batch_size'])
+            self.write_batch(size, options['witnesses'])
+            remaining -= size
+
+            self.stdout.write('Generated {} of {} hearings.'.format(
+                options['hearings'] - remaining,
+                options['hearings']
+            ))
+
+        HearingEvent.objects.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Run load_committeeratings to rate committees on the new hearings.'
+        ))
+
+    def get_jurisdiction(self):
+        division, _ = Division.objects.get_or_create(
+            id='ocd-division/country:us',
+            defaults={'name': 'United States'}
+        )
+        jurisdiction, _ = Jurisdiction.objects.get_or_create(
+            id='ocd-jurisdiction/country:us/legislature',
+            defaults={'name': 'United States of America', 'division': division}
+        )
+        return jurisdiction
+
+    def get_congresses(self, first, last):
+        congresses = []
+
+        for number in range(first, last + 1):
+            # Each Congress starts on January 3rd of an odd year
+            start_year = 1789 + 2 * (number - 1)
+            congress, _ = Congress.objects.get_or_create(
+                id=number,
+                defaults={'start_date': date(start_year, 1, 3),
+                          'end_date': date(start_year + 2, 1, 2)}
+            )
+            congresses.append(congress)
+
+        return congresses
+
+    def get_committees(self, subcommittee_count):
+        """
+        The permanent committees of each chamber and some subcommittees of
+        each, as lists of [committee, subcommittee, ...].
+        """
+        house, _ = Organization.objects.get_or_create(
+            name='United States House of Representatives',
+            defaults={'classification': 'lower', 'jurisdiction': self.jurisdiction}
+        )
+        senate, _ = Organization.objects.get_or_create(
+            name='United States Senate',
+            defaults={'classification': 'upper', 'jurisdiction': self.jurisdiction}
+        )
+
+        committees = []
+
+        for name in settings.CURRENT_PERMANENT_COMMITTEES:
+            parent = senate if name.startswith('Senate') else house
+            committee = self.get_organization(name, parent)
+
+            committees.append([committee] + [
+                self.get_organization('Subcommittee {} of the {}'.format(i, name),
+                                      committee)
+                for i in range(1, subcommittee_count + 1)
+            ])
+
+        return committees
+
+    def get_organization(self, name, parent):
+        organization, _ = Organization.objects.get_or_create(
+            name=name,
+            parent=parent,
+            classification='committee',
+            defaults={'jurisdiction': self.jurisdiction}
+        )
+        return organization
+
+    def get_categories(self):
+        categories = []
+
+        for name in CATEGORY_WEIGHTS:
+            category = HearingCategoryType.objects.filter(name=name).first()
+            if category is None:
+                category = HearingCategoryType.objects.create(id=name, name=name)
+            categories.append(category)
+
+        return categories
+
+    def random_date(self):
+        congress = self.random.choice(self.congresses)
+        days = self.random.randrange((congress.end_date - congress.start_date).days)
+        return (congress.start_date + timedelta(days=days)).isoformat()
+
+    def random_name(self, start_date):
+        return self.random.choice(NAME_TEMPLATES).format(
+            agency=self.random.choice(AGENCIES),
+            topic=self.random.choice(TOPICS),
+            year=start_date[:4]
+        )
+
+    def write_batch(self, size, max_witnesses):
+        events = []
+        participants = []
+        documents = []
+        links = []
+        witness_details = []
+        categories = []
+        sources = []
+
+        def add_document(event, note, url):
+            document = EventDocument(note=note, event=event)
+            documents.append(document)
+            links.extend([
+                EventDocumentLink(url=url, document=document,
+                                  media_type='application/pdf'),
+                # Archived already, so that backfill_archived_links leaves
+                # generated documents alone
+                EventDocumentLink(url='http://web.archive.org/web/2020/' + url,
+                                  document=document,
+                                  media_type='application/pdf',
+                                  text='archived'),
+            ])
+            return document
+
+        for _ in range(size):
+            start_date = self.random_date()
+            event = Event(jurisdiction=self.jurisdiction,
+                          name=self.random_name(start_date),
+                          start_date=start_date,
+                          classification='Hearing')
+            events.append(event)
+
+            # Most hearings are held by one committee or subcommittee; some
+            # jointly with a subcommittee or another committee
+            committee = self.random.choice(self.committees)
+            organizations = [self.random.choice(committee)]
+            if self.random.random() < 0.1:
+                organizations.append(self.random.choice(
+                    self.random.choice(self.committees)
+                ))
+
+            for organization in {o.id: o for o in organizations}.values():
+                participants.append(EventParticipant(name=organization.name,
+                                                     event=event,
+                                                     organization=organization,
+                                                     entity_type='organization'))
+
+            url = 'https://example.com/hearings/{}'.format(event.id.split('/')[-1])
+            add_document(event, 'transcript', url + '/transcript.pdf')
+
+            for i in range(self.random.randint(0, max_witnesses)):
+                witness = EventParticipant(
+                    name='{} {}'.format(self.random.choice(FIRST_NAMES),
+                                        self.random.choice(LAST_NAMES)),
+                    event=event,
+                    entity_type='person',
+                    note='witness'
+                )
+                participants.append(witness)
+                witness_details.append(WitnessDetails(
+                    witness=witness,
+                    document=add_document(event, 'witness statement',
+                                          '{}/witness-{}.pdf'.format(url, i)),
+                    organization=self.random.choice(AGENCIES),
+                    retired=self.random.random() < 0.05
+                ))
+
+            categories.append(HearingCategory(
+                event=event,
+                category=self.random.choices(self.categories,
+                                             weights=list(CATEGORY_WEIGHTS.values()))[0]
+            ))
+            sources.append(EventSource(event=event, note=SYNTHETIC_NOTE))
+
+        with transaction.atomic():
+            Event.objects.bulk_create(events)
+            EventParticipant.objects.bulk_create(participants)
+            EventDocument.objects.bulk_create(documents)
+            EventDocumentLink.objects.bulk_create(links)
+            WitnessDetails.objects.bulk_create(witness_details)
+            HearingCategory.objects.bulk_create(categories)
+            EventSource.objects.bulk_create(sources)
+
+            # Bulk inserts skip the signals that keep these up to date
+            event_ids = [event.id for event in events]
+            EventCommitteeSignature.objects.refresh(event_ids)
+            CommitteeHearing.objects.refresh(event_ids)
+            HearingSearchDocument.objects.refresh(event_ids)
+            StaleCommitteeRating.objects.mark_events(event_ids)
@@ -1,72 +1,136 @@
 import csv
 
+from psycopg2.extras import execute_values
 from django.core.management.base import BaseCommand, CommandError
-from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
 from django.db import transaction, connection
 
-from committeeoversightapp.models import HearingEvent, HearingCategoryType, HearingCategory
+from committeeoversightapp.models import HearingEvent, HearingCategoryType, \
+                                         StaleCommitteeRating
+from committeeoversightapp.import_utils import HearingNameMatcher
 
 CATEGORIES_EDITED_CSV = 'data/final/categories_edited.csv'
 CATEGORIES_ML_CSV = 'data/final/categories_ml.csv'
 
+NO_MATCH_CSV = 'no_category_match.csv'
+REVIEW_CSV = 'category_matches_to_review.csv'
+
+# Hearings have at most one category: update the ones that have one and
+# add the rest
+UPSERT_CATEGORIES_SQL = '''
+    WITH data (event_id, category_id) AS (VALUES %s),
+    updated AS (
+      UPDATE committeeoversightapp_hearingcategory AS hearing_category
+      SET category_id = data.category_id
+      FROM data
+      WHERE hearing_category.event_id = data.event_id
+      RETURNING hearing_category.event_id
+    )
+    INSERT INTO committeeoversightapp_hearingcategory (event_id, category_id)
+    SELECT event_id, category_id
+    FROM data
+    WHERE event_id NOT IN (SELECT event_id FROM updated)
+'''
+
 class Command(BaseCommand):
     help = "Import manually entered hearing categories"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.9,
+            help='How similar, from 0 to 1, a hearing name must be to a name in the spreadsheet to be suggested for review'
+        )
+        parser.add_argument(
+            '--margin',
+            type=float,
+            default=0.05,
+            help='How much more similar the best name must be than the next best to be suggested for review'
+        )
+
     def handle(self, *args, **options):
         file_names = [CATEGORIES_EDITED_CSV, CATEGORIES_ML_CSV]
 
+        rows = {}
         for file_name in file_names:
-            self.stdout.write('Loading in {}...'.format(file_name))
-
             with open(file_name, 'r') as csvfile:
-                no_match = []
-                matches = 0
-
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    name = self.clean_encoding(row['NAME'])
-                    try:
-                        hearing = HearingEvent.objects.get(
-                            start_date=row['DATE'],
-                            name=name
-                        )
+                rows[file_name] = list(csv.DictReader(csvfile))
 
-                        category = HearingCategoryType.objects.get(
-                            name=row['CATEGORY']
-                        )
+        dates = {row['DATE'] for file_rows in rows.values() for row in file_rows}
+        matcher = HearingNameMatcher(
+            HearingEvent.objects.filter(start_date__in=dates)
+                                .values_list('id', 'start_date', 'name'),
+            threshold=options['threshold'],
+            margin=options['margin']
+        )
+        categories = dict(HearingCategoryType.objects.values_list('name', 'id'))
 
-                        hearing_category, created = HearingCategory.objects.get_or_create(
-                            event=hearing
-                        )
-
-                        hearing_category.category = category
-                        hearing_category.save()
-
-                        matches += 1
+        for file_name in file_names:
+            self.stdout.write('Loading in {}...'.format(file_name))
 
-                    except ObjectDoesNotExist:
-                        no_match += [row['DATE'] + ',' + row['NAME']]
+            no_match = []
+            to_review = []
+            hearing_categories = {}
+
+            for row in rows[file_name]:
+                match = matcher.match(row['DATE'], row['NAME'])
+                category_id = categories.get(row['CATEGORY'])
+
+                if match and category_id and match.ratio == 1:
+                    # Later rows for the same hearing win, as they did when
+                    # each row was saved in turn
+                    hearing_categories[match.event_id] = category_id
+                elif match and category_id:
+                    # Similar names may be sibling hearings, so leave them
+                    # for someone to check and correct in the spreadsheet
+                    to_review.append([row['DATE'], row['NAME'], row['CATEGORY'],
+                                      match.event_id, match.name,
+                                      '{:.2f}'.format(match.ratio)])
+                else:
+                    no_match += [row['DATE'] + ',' + row['NAME']]
+
+            self.save_categories(hearing_categories)
 
             self.stdout.write(
                 self.style.SUCCESS(
                     '{file_name} loaded! \
                     \n{matches} hearings matched. \
+                    \n{to_review_len} similar names to review in {review_file}. \
                     \n{no_matches_len} with no matches.'.format(
                     file_name=file_name,
-                    matches=matches,
+                    matches=len(rows[file_name]) - len(no_match) - len(to_review),
+                    to_review_len=len(to_review),
+                    review_file=REVIEW_CSV,
                     no_matches_len=len(no_match),
                 ))
             )
 
-            with open('no_category_match.csv', 'a') as f:
+            with open(NO_MATCH_CSV, 'a') as f:
                 for row in no_match:
                     f.write(row + '\n')
 
-    def clean_encoding(self, name):
-        return name \
-            .replace('â€“', '–') \
-            .replace('â€™', '’') \
-            .replace('â€\x9d', '”') \
-            .replace('â€œ', '“') \
-            .replace('â€˜', '‘') \
-            .replace('â€”', '—')
+            with open(REVIEW_CSV, 'a') as f:
+                writer = csv.writer(f)
+                if f.tell() == 0:
+                    writer.writerow(['DATE', 'NAME', 'CATEGORY', 'MATCHED_ID',
+                                     'MATCHED_NAME', 'SIMILARITY'])
+                writer.writerows(to_review)
+
+    def save_categories(self, hearing_categories):
+        '''
+        Set the categories of many hearings in one statement. This skips the
+        signals that flag ratings to recompute, so flag them here.
+        '''
+        if not hearing_categories:
+            return
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                execute_values(cursor.cursor,
+                               UPSERT_CATEGORIES_SQL,
+                               list(hearing_categories.items()),
+                               page_size=len(hearing_categories))
+
+            StaleCommitteeRating.objects.mark_events(list(hearing_categories))
+
+        HearingEvent.objects.invalidate()
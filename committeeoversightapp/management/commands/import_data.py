@@ -1,8 +1,13 @@
 import os
 import csv
+import json
 import re
+import threading
 
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from psycopg2.extras import execute_values
 from django.core.management.base import BaseCommand, CommandError
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
 from django.conf import settings
@@ -12,13 +17,445 @@ from django.db.models import Q
 
 from opencivicdata.core.models import Organization, OrganizationName
 from opencivicdata.legislative.models import Event, EventSource, EventParticipant
-from committeeoversightapp.models import HearingCategory, Committee
+from committeeoversightapp.models import HearingCategory, Committee, \
+                                         StaleCommitteeRating, EventSourceHash, \
+                                         EventCommitteeSignature, HearingSearchDocument, \
+                                         HearingEvent, CommitteeHearing
+from committeeoversightapp.import_utils import RejectionLog, parse_records, \
+                                               read_rows, read_rejected_rows
 
 ExistingEvents = Event.objects.exclude(sources__note='spreadsheet file')
 
+BULK_UPDATE_EVENTS_SQL = '''
+    UPDATE opencivicdata_event AS event
+    SET name = data.name,
+        start_date = data.start_date,
+        classification = data.classification,
+        updated_at = NOW()
+    FROM (VALUES %s) AS data (id, name, start_date, classification)
+    WHERE event.id = data.id
+'''
+
+
+class HearingIndex(object):
+    '''
+    In-memory copies of the lookups import_data makes for every spreadsheet
+    row, loaded in a handful of queries so that --bulk can match rows to
+    hearings without going back to the database:
+
+    - source_hashes: rows that have already been imported
+    - by_date_and_committees: (start_date, committee signature) => [(id, name)]
+      of hearings that haven't been matched to a spreadsheet row
+    - by_hearing_number: the same hearings, by the trailing "114-123" part of
+      their hearing numbers
+    - committees: Lugar committee code => [Committee]
+    - participants, categories, sources: what each hearing already has, so
+      only new rows are written
+    '''
+    def __init__(self):
+        self.lock = threading.Lock()
+
+        matched_ids = set(
+            EventSource.objects.filter(note='spreadsheet file')
+            .values_list('event_id', flat=True)
+        )
+
+        self.participants = set()
+        self.participant_names = set()
+
+        for event_id, name, organization_id, entity_type in \
+                EventParticipant.objects.values_list('event_id',
+                                                     'name',
+                                                     'organization_id',
+                                                     'entity_type'):
+            self.participants.add((event_id, name, organization_id, entity_type))
+            self.participant_names.add((event_id, name, entity_type))
+
+        # Hearings with a participant that isn't an organization have a null
+        # signature and never match, as in match_by_date_and_participants
+        signatures = dict(
+            EventCommitteeSignature.objects.filter(signature__isnull=False)
+            .values_list('event_id', 'signature')
+        )
+
+        self.source_hashes = set(
+            EventSourceHash.objects.values_list('source_hash', flat=True)
+        )
+        self.by_date_and_committees = defaultdict(list)
+        self.by_hearing_number = defaultdict(list)
+        self.event_keys = {}
+        self.event_numbers = {}
+
+        for event_id, name, start_date, extras in \
+                Event.objects.values_list('id', 'name', 'start_date', 'extras'):
+            if event_id in matched_ids:
+                continue
+
+            if event_id in signatures:
+                key = (start_date, signatures[event_id])
+                self.by_date_and_committees[key].append((event_id, name))
+                self.event_keys[event_id] = key
+
+            hearing_number = re.search(r'(\d+)-(\d+)$', extras.get('hearing_number') or '')
+            if hearing_number:
+                congress, number = hearing_number.groups()
+                self.by_hearing_number[number].append((congress, event_id))
+                self.event_numbers[event_id] = number
+
+        self.committees = defaultdict(list)
+        for committee in Committee.objects.select_related('organization'):
+            self.committees[str(committee.lugar_id)].append(committee)
+
+        self.categories = set(
+            HearingCategory.objects.values_list('event_id', 'category_id')
+        )
+        self.sources = set(
+            EventSource.objects.filter(note__in=['spreadsheet', 'spreadsheet file'])
+            .values_list('event_id', 'note', 'url')
+        )
+
+    def match_hearing_number(self, hearing_number):
+        '''
+        Return unmatched hearings whose hearing numbers end with e.g. "14-123",
+        like extras__hearing_number__endswith.
+        '''
+        congress, number = hearing_number.split('-')
+        return [event_id for event_congress, event_id in self.by_hearing_number[number]
+                if event_congress.endswith(congress)]
+
+    def match_date_and_committees(self, start_date, committee_ids):
+        if not committee_ids:
+            return []
+
+        signature = EventCommitteeSignature.objects.get_signature(committee_ids)
+        return self.by_date_and_committees.get((start_date, signature), [])
+
+    def claim(self, event_id):
+        '''
+        Stop matching a hearing once a row has been imported into it, as
+        ExistingEvents does once it has a spreadsheet file source.
+        '''
+        key = self.event_keys.pop(event_id, None)
+        if key:
+            self.by_date_and_committees[key] = [
+                event for event in self.by_date_and_committees[key]
+                if event[0] != event_id
+            ]
+
+        number = self.event_numbers.pop(event_id, None)
+        if number:
+            self.by_hearing_number[number] = [
+                event for event in self.by_hearing_number[number]
+                if event[1] != event_id
+            ]
+
+class ImportCheckpoint(object):
+    '''
+    The last row of each spreadsheet whose hearings have been committed,
+    saved to a JSON file after every chunk so that an interrupted import
+    resumes where it stopped instead of starting over.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+        try:
+            with open(path, 'r') as f:
+                self.rows = json.load(f)
+        except FileNotFoundError:
+            self.rows = {}
+
+    def last_row(self, filename):
+        return self.rows.get(filename, 0)
+
+    def save(self, filename, row_index):
+        with self.lock:
+            self.rows[filename] = row_index
+
+            # Replace the file in one step so a crash can't truncate it
+            with open(self.path + '.tmp', 'w') as f:
+                json.dump(self.rows, f)
+            os.replace(self.path + '.tmp', self.path)
+
+    def clear(self):
+        with self.lock:
+            self.rows = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+class BulkHearingImport(object):
+    '''
+    Imports one chamber's spreadsheet the way add_house_hearings and
+    add_senate_hearings do, but matches rows against a shared HearingIndex
+    and saves them in batched queries, one transaction per chunk_size rows.
+
+    Matching holds the index's lock; House and Senate rows never match the
+    same hearings, so their imports can otherwise run side by side.
+    '''
+    def __init__(self, command, index, checkpoint, filename, chamber, chunk_size):
+        self.command = command
+        self.stdout = command.stdout
+        self.index = index
+        self.checkpoint = checkpoint
+        self.filename = filename
+        self.chamber = chamber
+        self.chunk_size = chunk_size
+
+        self.bad_rows = []
+        self.noop_count = 0
+        self.updated_count = 0
+        self.created_count = 0
+        self.row_index = None
+
+        self.reset()
+
+    def reset(self):
+        self.chunk_rows = 0
+        self.new_events = []
+        self.event_updates = {}
+        self.new_participants = []
+        self.new_categories = []
+        self.new_sources = []
+        self.new_source_hashes = []
+
+    def run(self):
+        last_row = self.checkpoint.last_row(self.filename)
+
+        if last_row:
+            self.stdout.write('Resuming {} after row {}.'.format(self.filename, last_row))
+
+        records = self.command.read_records(self.filename, self.chamber, last_row)
+
+        i = 0
+        for i, record in enumerate(records, 1):
+            self.row_index = record.row_index
+
+            with self.index.lock:
+                self.add_hearing(record)
+
+            if self.chunk_rows >= self.chunk_size:
+                self.write()
+
+        if self.chunk_rows:
+            self.write()
+
+        self.command.check_hearing_count(self.filename, self.chamber, i, last_row)
+
+    def run_in_thread(self):
+        try:
+            self.run()
+        finally:
+            # Each thread opens its own database connection
+            connection.close()
+
+    def add_hearing(self, record):
+        if record.source_hash in self.index.source_hashes:
+            self.noop_count += 1
+            return
+
+        self.index.source_hashes.add(record.source_hash)
+        self.chunk_rows += 1
+
+        participating_committees = []
+        for committee_key in record.committee_codes:
+            participating_committees += self.index.committees[committee_key]
+
+        if self.chamber == 'senate':
+            participating_committees = [committee for committee in participating_committees
+                                        if committee.organization_id]
+
+        event_ids = []
+
+        if self.chamber == 'senate' and record.hearing_number:
+            # hearing numbers can be non-unique if a hearing has multiple
+            # sessions these are recorded in the Lugar data as separate events
+            event_ids = self.index.match_hearing_number(record.hearing_number)
+
+        if not event_ids:
+            event_id = self.match_by_date_and_participants(record.name,
+                                                           participating_committees,
+                                                           record.start_date)
+            if event_id:
+                event_ids = [event_id]
+
+        if event_ids:
+            for event_id in event_ids:
+                self.index.claim(event_id)
+                self.event_updates[event_id] = (event_id,
+                                                record.name,
+                                                record.start_date,
+                                                record.classification)
+                self.new_source_hashes.append(EventSourceHash(event_id=event_id,
+                                                              source_hash=record.source_hash))
+                self.add_related(event_id,
+                                 participating_committees,
+                                 record.category,
+                                 record.source)
+                self.updated_count += 1
+
+        else:
+            event = Event(name=record.name,
+                          start_date=record.start_date,
+                          jurisdiction_id=self.command.jurisdiction_id,
+                          classification=record.classification)
+            self.new_events.append(event)
+            self.new_source_hashes.append(EventSourceHash(event_id=event.id,
+                                                          source_hash=record.source_hash))
+            self.add_related(event.id,
+                             participating_committees,
+                             record.category,
+                             record.source)
+            self.created_count += 1
+
+    def match_by_date_and_participants(self, name, participating_committees, start_date):
+        lugar_committees = [committee.organization_id
+                            for committee in participating_committees
+                            if committee.organization_id]
+
+        matched_events = self.index.match_date_and_committees(start_date, lugar_committees)
+
+        if len(matched_events) == 1:
+            return matched_events[0][0]
+
+        elif len(matched_events) > 1:
+            matched_by_name = [event_id for event_id, event_name in matched_events
+                               if event_name.lower() == name.lower()]
+
+            if len(matched_by_name) == 1:
+                return matched_by_name[0]
+            else:
+                self.bad_rows.append("Row " + str(self.row_index) + ": Multiple possible matches but no matching name " + str(matched_events))
+
+    def add_related(self, event_id, participating_committees, category, source):
+        '''
+        Queue the participants, category and sources that new_event_participant,
+        new_category and new_source would get or create.
+        '''
+        entity_type = "organization"
+
+        for committee in participating_committees:
+            if committee.organization_id:
+                name = committee.organization.name
+                key = (event_id, name, committee.organization_id, entity_type)
+                exists = key in self.index.participants
+            else:
+                name = committee.lugar_name
+                key = (event_id, name, None, entity_type)
+                exists = (event_id, name, entity_type) in self.index.participant_names
+
+            if not exists:
+                self.new_participants.append(EventParticipant(name=name,
+                                                              event_id=event_id,
+                                                              organization_id=committee.organization_id,
+                                                              entity_type=entity_type))
+                self.index.participants.add(key)
+                self.index.participant_names.add((event_id, name, entity_type))
+
+        if category and (event_id, category) not in self.index.categories:
+            self.new_categories.append(HearingCategory(event_id=event_id, category_id=category))
+            self.index.categories.add((event_id, category))
+
+        sources = [('spreadsheet file', self.filename)]
+        if source.strip():
+            sources.insert(0, ('spreadsheet', source))
+
+        for note, url in sources:
+            if (event_id, note, url) not in self.index.sources:
+                self.new_sources.append(EventSource(event_id=event_id, note=note, url=url))
+                self.index.sources.add((event_id, note, url))
+
+    def write(self):
+        '''
+        Save the hearings queued since the last chunk in one transaction,
+        then checkpoint the last row they came from.
+        '''
+        with transaction.atomic():
+            self.write_chunk()
+
+        HearingEvent.objects.invalidate()
+        self.checkpoint.save(self.filename, self.row_index)
+
+        self.stdout.write(
+            '{}: Saved {} rows through row {} of {}.'.format(
+                datetime.now(),
+                self.chunk_rows,
+                self.row_index,
+                self.filename
+            )
+        )
+        self.reset()
+
+    def write_chunk(self):
+        updates = list(self.event_updates.values())
+        updated_ids = list(self.event_updates.keys())
+
+        # Bulk writes skip the signals that flag ratings to recompute, so flag
+        # them here: before the update for the dates hearings are moving
+        # from, and after for their new dates and participants
+        StaleCommitteeRating.objects.mark_events(updated_ids)
+
+        if updates:
+            with connection.cursor() as cursor:
+                execute_values(cursor.cursor, BULK_UPDATE_EVENTS_SQL, updates, page_size=1000)
+
+        Event.objects.bulk_create(self.new_events, batch_size=1000)
+        EventParticipant.objects.bulk_create(self.new_participants, batch_size=1000)
+        HearingCategory.objects.bulk_create(self.new_categories, batch_size=1000)
+        EventSource.objects.bulk_create(self.new_sources, batch_size=1000)
+        EventSourceHash.objects.bulk_create(self.new_source_hashes, batch_size=1000)
+
+        # Likewise the signals that keep committee signatures, committee
+        # hearings and the search index up to date
+        changed_ids = updated_ids + [event.id for event in self.new_events]
+        EventCommitteeSignature.objects.refresh(changed_ids)
+        CommitteeHearing.objects.refresh(changed_ids)
+        HearingSearchDocument.objects.refresh(changed_ids)
+        StaleCommitteeRating.objects.mark_events(changed_ids)
+
+
 class Command(BaseCommand):
     help = "Import Lugar spreadsheets data"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Match rows against hearings loaded into memory up front and '
+                 'write them in batches, instead of querying and saving each '
+                 'row in turn.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='With --bulk, the number of rows to save per transaction.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default='import_data_checkpoint.json',
+            help='With --bulk, the file recording the last row saved from each '
+                 'spreadsheet. An interrupted import resumes from it, and it '
+                 'is removed once the import completes.'
+        )
+        parser.add_argument(
+            '--parallel',
+            action='store_true',
+            help='With --bulk, import House and Senate hearings at the same '
+                 'time, on separate database connections.'
+        )
+        parser.add_argument(
+            '--rejections',
+            default='import_data_rejections.jsonl',
+            help='The JSON Lines file to log rows that fail validation to.'
+        )
+        parser.add_argument(
+            '--rejected',
+            help='Import only the rejected rows in this log from an earlier '
+                 'run, e.g., after correcting them, instead of the '
+                 'spreadsheets.'
+        )
+
     def handle(self, *args, **options):
         self.bad_rows = []
         self.jurisdiction_id = 'ocd-jurisdiction/country:us/legislature'
@@ -26,6 +463,22 @@ class Command(BaseCommand):
         self.updated_count = 0
         self.created_count = 0
 
+        self.rejected_path = options['rejected']
+        if self.rejected_path and \
+                os.path.abspath(self.rejected_path) == os.path.abspath(options['rejections']):
+            raise CommandError('Pass a different --rejections log when importing from --rejected.')
+
+        # Importing rejected rows keeps its own checkpoint, so that it can't
+        # skip rows of the spreadsheets
+        if self.rejected_path:
+            self.checkpoint_path = self.rejected_path + '.checkpoint'
+        else:
+            self.checkpoint_path = options['checkpoint']
+
+        # Keep the rows logged before an interrupted bulk import
+        resuming = options['bulk'] and os.path.exists(self.checkpoint_path)
+        self.rejections = RejectionLog(options['rejections'], append=resuming)
+
         # Create commmittees from key
         self.stdout.write(str(datetime.now()) + ': Creating House committees from key...')
         self.bad_rows.append("House Committees\n")
@@ -38,15 +491,28 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(str(datetime.now()) + ': Senate committees imported successfully!'))
 
         # Create hearings
-        self.stdout.write(str(datetime.now()) + ': Creating database entries for the House...')
-        self.bad_rows.append("\nHouse Hearings\n")
-        self.add_house_hearings()
-        self.stdout.write(self.style.SUCCESS(str(datetime.now()) + ': House hearings imported successfully!'))
+        if options['bulk']:
+            self.add_hearings_in_bulk(options)
 
-        self.stdout.write(str(datetime.now()) + ': Creating database entries for the Senate...')
-        self.bad_rows.append("\nSenate Hearings\n")
-        self.add_senate_hearings()
-        self.stdout.write(self.style.SUCCESS(str(datetime.now()) + ': Senate hearings imported successfully!'))
+        else:
+            self.stdout.write(str(datetime.now()) + ': Creating database entries for the House...')
+            self.bad_rows.append("\nHouse Hearings\n")
+            self.add_house_hearings()
+            self.stdout.write(self.style.SUCCESS(str(datetime.now()) + ': House hearings imported successfully!'))
+
+            self.stdout.write(str(datetime.now()) + ': Creating database entries for the Senate...')
+            self.bad_rows.append("\nSenate Hearings\n")
+            self.add_senate_hearings()
+            self.stdout.write(self.style.SUCCESS(str(datetime.now()) + ': Senate hearings imported successfully!'))
+
+        self.rejections.close()
+        self.stdout.write(
+            'Rows with validation errors: {} ({} not imported), logged to {}'.format(
+                self.rejections.count,
+                self.rejections.rejected_count,
+                self.rejections.path
+            )
+        )
 
         # Write bad category rows to file
         with open('bad_rows.txt', 'a') as f:
@@ -58,6 +524,45 @@ class Command(BaseCommand):
         self.stdout.write("Hearings updated: " + str(self.updated_count))
         self.stdout.write("Hearings created: " + str(self.created_count))
 
+    def add_hearings_in_bulk(self, options):
+        self.stdout.write(str(datetime.now()) + ': Loading existing hearings...')
+        index = HearingIndex()
+        checkpoint = ImportCheckpoint(self.checkpoint_path)
+
+        imports = [
+            BulkHearingImport(self, index, checkpoint, 'data/final/house.csv',
+                              'house', options['chunk_size']),
+            BulkHearingImport(self, index, checkpoint, 'data/final/senate.csv',
+                              'senate', options['chunk_size']),
+        ]
+
+        if options['parallel']:
+            self.stdout.write(str(datetime.now()) + ': Creating database entries for the House and Senate...')
+
+            with ThreadPoolExecutor(max_workers=len(imports)) as executor:
+                futures = [executor.submit(bulk_import.run_in_thread)
+                           for bulk_import in imports]
+
+            # Raise the first error, if either import failed
+            for future in futures:
+                future.result()
+
+        else:
+            for bulk_import in imports:
+                self.stdout.write(str(datetime.now()) + ': Creating database entries for the {}...'.format(bulk_import.chamber.title()))
+                bulk_import.run()
+
+        self.stdout.write(self.style.SUCCESS(str(datetime.now()) + ': House and Senate hearings imported successfully!'))
+        checkpoint.clear()
+
+        for heading, bulk_import in zip(("\nHouse Hearings\n", "\nSenate Hearings\n"), imports):
+            self.bad_rows.append(heading)
+            self.bad_rows += bulk_import.bad_rows
+
+            self.noop_count += bulk_import.noop_count
+            self.updated_count += bulk_import.updated_count
+            self.created_count += bulk_import.created_count
+
     def add_house_committees(self):
         house = Organization.objects.get(name="United States House of Representatives")
 
@@ -101,172 +606,97 @@ class Command(BaseCommand):
                                                                    lugar_name=committee_name,
                                                                    organization=organization)
 
-    def add_house_hearings(self):
-        with open('data/final/house.csv', 'r') as csvfile, \
-             transaction.atomic():
+    def read_records(self, filename, chamber, last_row=0):
+        '''
+        Stream validated HearingRecords from a chamber's spreadsheet, or from
+        its rejected rows when importing from --rejected, after last_row.
+        '''
+        if self.rejected_path:
+            rows = read_rejected_rows(self.rejected_path, filename)
+        else:
+            rows = read_rows(filename)
 
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    '''CREATE TEMPORARY TABLE participants AS
-                       SELECT event_id,
-                              ARRAY_AGG(organization_id::text) AS committees
-                       FROM opencivicdata_eventparticipant
-                       GROUP BY event_id''')
+        rows = ((row_index, row) for row_index, row in rows if row_index > last_row)
 
-            reader = csv.DictReader(csvfile)
-            # we want to know the original row index for debugging purposes
-            reader = enumerate(reader, 2)
-            # ignore rows with a missing name
-            reader = ((i, row) for i, row in reader if row['Hearing/Report'])
+        return parse_records(rows, filename, chamber, self.rejections)
+
+    def check_hearing_count(self, filename, chamber, record_count, last_row=0):
+        # Only meaningful when this run read the whole spreadsheet
+        if self.rejected_path or last_row:
+            return
 
-            for i, (self.row_index, row) in enumerate(reader, 1):
+        lugar_in_db = Event.objects.filter(sources__url=filename).count()
+
+        # from manual checking this is acceptable
+        assert abs(lugar_in_db - record_count) < (5 if chamber == 'house' else 80)
+
+    def add_house_hearings(self):
+        filename = 'data/final/house.csv'
 
-                source = row['source']
-                source_file = csvfile.name
-                source_hash = str(sorted(row.items()))
-                start_date = row['Date'].split('T', 1)[0]
-                name = row['Hearing/Report']
-                classification = row['Type']
-                category = row['Category1']
+        with transaction.atomic():
+            i = 0
+            for i, record in enumerate(self.read_records(filename, 'house'), 1):
+                self.row_index = record.row_index
 
-                participating_committees = self.get_participating_committees(row)
+                participating_committees = Committee.objects.filter(lugar_id__in=record.committee_codes)
 
-                self.stdout.write("\nHouse row " + str(self.row_index) + ": " + name)
-                exists = self.does_hearing_exist(source_hash)
+                self.stdout.write("\nHouse row " + str(self.row_index) + ": " + record.name)
+                exists = self.does_hearing_exist(record.source_hash)
 
                 if exists:
                     self.stdout.write("Already exists!")
                     self.noop_count += 1
 
                 else:
-                    event = self.match_by_date_and_participants(name,
+                    event = self.match_by_date_and_participants(record.name,
                                                                 participating_committees,
-                                                                start_date)
+                                                                record.start_date)
 
                     if event:
-                        self.update_hearing(event,
-                                            name,
-                                            start_date,
-                                            participating_committees,
-                                            classification,
-                                            category,
-                                            source,
-                                            source_hash,
-                                            source_file)
+                        self.update_hearing(event, record, participating_committees)
                     else:
-                        self.create_hearing(name,
-                                            start_date,
-                                            participating_committees,
-                                            classification,
-                                            category,
-                                            source,
-                                            source_hash,
-                                            source_file)
-
-            lugar_in_db = len(Event.objects.filter(sources__url=csvfile.name))
-
-
-            assert abs(lugar_in_db - i) < 5
-
-            with connection.cursor() as cursor:
-                    cursor.execute(
-                        '''DROP TABLE participants''')
-
+                        self.create_hearing(record, participating_committees)
 
+            self.check_hearing_count(filename, 'house', i)
 
     def add_senate_hearings(self):
-        with open('data/final/senate.csv', 'r') as csvfile, \
-             transaction.atomic():
-
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    '''CREATE TEMPORARY TABLE participants AS
-                       SELECT event_id,
-                              ARRAY_AGG(organization_id::text) AS committees
-                       FROM opencivicdata_eventparticipant
-                       GROUP BY event_id''')
-
-            reader = csv.DictReader(csvfile)
-            # we want to know the original row index for debugging purposes
-            reader = enumerate(reader, 2)
-            # ignore rows with a missing name
-            reader = ((i, row) for i, row in reader if row['Hearing/Report'])
-
-            for i, (self.row_index, row) in enumerate(reader, 1):
-                name = row['Hearing/Report']
-                start_date = row['Date'].split('T', 1)[0]
-                source = row['source']
-                source_file = csvfile.name
-                source_hash = str(sorted(row.items()))
-                classification = row['Type']
-                category = row['Category1']
-                hearing_number_raw = row['Hearing #']
+        filename = 'data/final/senate.csv'
 
-                committees = [row['Committee1'], row['Committee2']]
+        with transaction.atomic():
+            i = 0
+            for i, record in enumerate(self.read_records(filename, 'senate'), 1):
+                self.row_index = record.row_index
 
-                participating_committees = [committee for committee in committees if committee]
-                participating_committees = Committee.objects.filter(lugar_id__in=participating_committees, organization__isnull=False)
+                participating_committees = Committee.objects.filter(lugar_id__in=record.committee_codes, organization__isnull=False)
 
-                self.stdout.write("\nSenate row " + str(self.row_index) + ": " + name)
-                exists = self.does_hearing_exist(source_hash)
+                self.stdout.write("\nSenate row " + str(self.row_index) + ": " + record.name)
+                exists = self.does_hearing_exist(record.source_hash)
 
                 if exists:
                     self.stdout.write("Already exists!")
                     self.noop_count += 1
 
                 else:
-                    events = self.match_by_hearing_number(hearing_number_raw, name, category, source)
+                    events = self.match_by_hearing_number(record.hearing_number)
                     if events is not None:
                         # hearing numbers can be non-unique if a
                         # hearing has multiple sessions these are
                         # recorded in the Lugar data as separate
                         # events
                         for event in events:
-                            self.update_hearing(event,
-                                                name,
-                                                start_date,
-                                                participating_committees,
-                                                classification,
-                                                category,
-                                                source,
-                                                source_hash,
-                                                source_file)
+                            self.update_hearing(event, record, participating_committees)
 
                     else:
-                        event = self.match_by_date_and_participants(name,
+                        event = self.match_by_date_and_participants(record.name,
                                                                     participating_committees,
-                                                                    start_date)
+                                                                    record.start_date)
 
                         if event:
-                            self.update_hearing(event,
-                                                name,
-                                                start_date,
-                                                participating_committees,
-                                                classification,
-                                                category,
-                                                source,
-                                                source_hash,
-                                                source_file)
+                            self.update_hearing(event, record, participating_committees)
                         else:
-                            self.create_hearing(name,
-                                                start_date,
-                                                participating_committees,
-                                                classification,
-                                                category,
-                                                source,
-                                                source_hash,
-                                                source_file)
-
-
-            lugar_in_db = len(Event.objects.filter(sources__url=csvfile.name))
-            # from manual checking this is acceptable
-            assert abs(lugar_in_db - i) < 80
-
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    '''DROP TABLE participants''')
-
+                            self.create_hearing(record, participating_committees)
 
+            self.check_hearing_count(filename, 'senate', i)
 
     def get_committee(self, committee_name, parent, committee_key):
         classification = "committee"
@@ -288,36 +718,6 @@ class Command(BaseCommand):
         else:
             self.bad_rows.append("Multiple possible committees for " + committee_key + ": " + committee_name)
 
-    def get_participating_committees(self, row):
-        # get committees into a edited list format
-        # committee codes with a zero appended indicate "full committee"
-        # and only the full committee will be recorded as an event participant
-        # hearings with a subcommittee listed will only have the subcommittee saved,
-        # as the full committee is attached as a parent
-
-        committee1 = row['Committee1']
-        committee2 = row['Committee2']
-        subcommittee1 = row['Subcommittee']
-        subcommittee2 = row['Subcommittee2']
-
-        participating_committees = []
-
-        if (committee1 and not subcommittee1) or (subcommittee1 == (committee1 + str(0))):
-            participating_committees.append(committee1)
-        elif committee1:
-            participating_committees.append(subcommittee1)
-
-        if (committee2 and not subcommittee2) or (subcommittee2 == (committee2 + str(0))):
-            participating_committees.append(committee2)
-        elif committee2:
-            participating_committees.append(subcommittee2)
-
-        participating_committees = [committee for committee in participating_committees if committee.isdigit()]
-
-        committee_qs = Committee.objects.filter(lugar_id__in=participating_committees)
-
-        return committee_qs
-
     def new_event_participant(self, committee, event):
         entity_type = "organization"
 
@@ -336,11 +736,6 @@ class Command(BaseCommand):
             pass
 
     def new_category(self, event, category):
-
-        valid_categories = {str(category) for category in range(1,14)}
-        if category not in valid_categories:
-            return False
-
         hearing_category, created = HearingCategory.objects.get_or_create(event=event, category_id=category)
 
     def new_source(self, event, note, url):
@@ -348,71 +743,31 @@ class Command(BaseCommand):
         return created
 
     def does_hearing_exist(self, source_hash):
+        return EventSourceHash.objects.filter(source_hash=source_hash).exists()
 
-        try:
-            Event.objects.get(extras__source_hash=source_hash)
-        except ObjectDoesNotExist:
-            return False
-        else:
-            return True
+    def match_by_hearing_number(self, hearing_number):
+        if hearing_number:
+            events = ExistingEvents.filter(extras__hearing_number__endswith=hearing_number)
+            if len(events) > 0:
+                return events
 
-    def match_by_hearing_number(self, hearing_number_raw, name, category, source):
-        if hearing_number_raw:
-            try:
-                hearing_number = re.search(r'\d{2,}-\d{1,}', hearing_number_raw).group(0)
-                events = ExistingEvents.filter(extras__hearing_number__endswith=hearing_number)
-                if len(events) > 0:
-                    return events
-                else:
-                    return
+    def match_by_date_and_participants(self, name, participating_committees, start_date):
+        lugar_committees = [organization_id for organization_id
+                            in participating_committees.values_list('organization', flat=True)
+                            if organization_id is not None]
 
-            except AttributeError:
-                self.bad_rows.append("Row " + str(self.row_index) + ": Unrecognized hearing number " + hearing_number_raw + " on " + name)
-                return
-        else:
+        if not lugar_committees:
             return
 
-    def match_by_date_and_participants(self, name, participating_committees, start_date):
-        try:
-            lugar_committees = list(org['organization']
-                                    for org in participating_committees.values('organization')
-                                    if org['organization'] is not None)
-            matched_events = ExistingEvents.raw(
-                '''SELECT opencivicdata_event.*
-                   FROM opencivicdata_event
-                   INNER JOIN participants
-                   ON opencivicdata_event.id = participants.event_id
-                   WHERE committees @> %(lugar_committees)s
-                   AND committees <@ %(lugar_committees)s
-                   AND start_date = %(start_date)s
-                   AND opencivicdata_event.id NOT IN
-                       (SELECT event_id FROM opencivicdata_eventsource
-                        WHERE note = 'spreadsheet file')''',
-                {'lugar_committees': lugar_committees,
-                 'start_date': start_date})
-        except ValueError:
-            matched_events = []
-            self.bad_rows.append("Row " + str(self.row_index) + ": Bad committee value in " + str(participating_committees))
+        signature = EventCommitteeSignature.objects.get_signature(lugar_committees)
+        matched_events = ExistingEvents.filter(committee_signature__start_date=start_date,
+                                               committee_signature__signature=signature)
 
         if len(matched_events) == 1:
             return matched_events[0]
 
         elif len(matched_events) > 1:
-            matched_events = ExistingEvents.raw(
-                '''SELECT opencivicdata_event.* 
-                   FROM opencivicdata_event
-                   INNER JOIN participants
-                   ON opencivicdata_event.id = participants.event_id
-                   WHERE committees @> %(lugar_committees)s
-                   AND committees <@ %(lugar_committees)s
-                   AND start_date = %(start_date)s
-                   AND name ILIKE %(name)s
-                   AND opencivicdata_event.id NOT IN
-                       (SELECT event_id FROM opencivicdata_eventsource
-                        WHERE note = 'spreadsheet file')''',
-                {'lugar_committees': lugar_committees,
-                 'start_date': start_date,
-                 'name': name})
+            matched_events = matched_events.filter(name__iexact=name)
             if len(matched_events) == 1:
                 return matched_events[0]
             else:
@@ -421,32 +776,21 @@ class Command(BaseCommand):
         else:
             return
 
-    def update_hearing(self,
-                       event,
-                       name,
-                       start_date,
-                       participating_committees,
-                       classification,
-                       category,
-                       source,
-                       source_hash,
-                       source_file):
-
-        event.name = name
-        event.start_date = start_date
-        event.classification = classification
-        event.extras['source_hash'] = source_hash
+    def update_hearing(self, event, record, participating_committees):
+        event.name = record.name
+        event.start_date = record.start_date
+        event.classification = record.classification
         event.save()
 
-        if category:
-            category_created = self.new_category(event, category)
-        else:
-            category_created = False
+        EventSourceHash.objects.get_or_create(event=event, source_hash=record.source_hash)
 
-        if source.strip():
-            source_created = self.new_source(event, "spreadsheet", source)
+        if record.category:
+            self.new_category(event, record.category)
+
+        if record.source.strip():
+            self.new_source(event, "spreadsheet", record.source)
 
-        source_created = self.new_source(event, 'spreadsheet file', source_file)
+        self.new_source(event, 'spreadsheet file', record.filename)
 
         for committee in participating_committees:
             self.new_event_participant(committee, event)
@@ -454,32 +798,24 @@ class Command(BaseCommand):
         self.updated_count += 1
         self.stdout.write("Match #" + str(self.updated_count) + ": " + event.name)
 
-    def create_hearing(self,
-                       name,
-                       start_date,
-                       participating_committees,
-                       classification,
-                       category,
-                       source,
-                       source_hash,
-                       source_file):
-        event = Event.objects.create(name=name,
-                                     start_date=start_date,
+    def create_hearing(self, record, participating_committees):
+        event = Event.objects.create(name=record.name,
+                                     start_date=record.start_date,
                                      jurisdiction_id=self.jurisdiction_id,
-                                     classification=classification)
-        event.extras['source_hash'] = source_hash
-        event.save()
+                                     classification=record.classification)
+
+        EventSourceHash.objects.create(event=event, source_hash=record.source_hash)
 
         for committee in participating_committees:
             self.new_event_participant(committee, event)
 
-        if category:
-            self.new_category(event, category)
+        if record.category:
+            self.new_category(event, record.category)
 
-        if source.strip():
-            source_created = self.new_source(event, "spreadsheet", source)
+        if record.source.strip():
+            self.new_source(event, "spreadsheet", record.source)
 
-        source_created = self.new_source(event, 'spreadsheet file', source_file)
+        self.new_source(event, 'spreadsheet file', record.filename)
 
         self.created_count += 1
         self.stdout.write("Created #" + str(self.created_count) + ": " + event.name)
@@ -1,47 +1,184 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 from django.db.models import Q
 from datetime import datetime
 
 from committeeoversightapp.models import Congress, CommitteeOrganization, \
-                                         CommitteeRating, Event
+                                         CommitteeRating, CommitteeScorecard, \
+                                         StaleCommitteeRating, Event, \
+                                         HearingEvent
+
+# Investigative Oversight = Agency Conduct Hearings + Private Sector Hearings
+INVESTIGATIVE_OVERSIGHT_CATEGORIES = ['Agency Conduct', 'Private Sector Oversight']
+
+# Policy/Legislative = Policy Hearings + Legislative Hearings + Closed Hearings
+POLICY_LEGISLATIVE_CATEGORIES = ['Legislative', 'Policy', 'Closed']
+
+# Total = Agency Conduct + Private Sector + Policy + Legislative
+# + Nominations + Fact Finding + Field + Closed
+TOTAL_CATEGORIES = ['Nominations', 'Legislative', 'Policy', 'Agency Conduct',
+                    'Private Sector Oversight', 'Fact Finding', 'Field', 'Closed']
+
+# Counts hearings for the committee/Congress pairs selected by {pairs} in one
+# pass and upserts the results into the ratings table. A hearing counts
+# toward a committee if the committee or one of its subcommittees
+# participated, as recorded in CommitteeHearing, and toward every Congress
+# whose date range contains it. The
+# ratings methodology (chp_points) was designed by the Lugar Center.
+BATCH_RATINGS_SQL = '''
+    WITH committees AS (
+      SELECT id
+      FROM opencivicdata_organization
+      WHERE classification = 'committee'
+      AND name = ANY(%(committee_names)s)
+    ),
+    pairs AS (
+      {pairs}
+    ),
+    counts AS (
+      SELECT committee_hearing.committee_id,
+             congress.id AS congress_id,
+             COUNT(DISTINCT committee_hearing.event_id) FILTER (
+               WHERE category_type.name = ANY(%(investigative_oversight)s)
+             ) AS investigative_oversight_hearings,
+             COUNT(DISTINCT committee_hearing.event_id) FILTER (
+               WHERE category_type.name = ANY(%(policy_legislative)s)
+             ) AS policy_legislative_hearings,
+             COUNT(DISTINCT committee_hearing.event_id) FILTER (
+               WHERE category_type.name = ANY(%(total)s)
+             ) AS total_hearings
+      FROM committeeoversightapp_committeehearing AS committee_hearing
+      JOIN committeeoversightapp_hearingcategory AS category
+      ON category.event_id = committee_hearing.event_id
+      JOIN committeeoversightapp_hearingcategorytype AS category_type
+      ON category_type.id = category.category_id
+      JOIN committeeoversightapp_congress AS congress
+      ON committee_hearing.start_date
+        BETWEEN to_char(congress.start_date, 'YYYY-MM-DD')
+        AND to_char(congress.end_date, 'YYYY-MM-DD')
+      JOIN pairs
+      ON pairs.committee_id = committee_hearing.committee_id
+      AND pairs.congress_id = congress.id
+      GROUP BY committee_hearing.committee_id, congress.id
+    )
+    INSERT INTO committeeoversightapp_committeerating (
+      committee_id,
+      congress_id,
+      investigative_oversight_hearings,
+      policy_legislative_hearings,
+      total_hearings,
+      chp_points
+    )
+    SELECT pairs.committee_id,
+           pairs.congress_id,
+           COALESCE(counts.investigative_oversight_hearings, 0),
+           COALESCE(counts.policy_legislative_hearings, 0),
+           COALESCE(counts.total_hearings, 0),
+           7 * COALESCE(counts.investigative_oversight_hearings, 0)
+             + 2 * COALESCE(counts.policy_legislative_hearings, 0)
+             + COALESCE(counts.total_hearings, 0)
+    FROM pairs
+    LEFT JOIN counts
+    ON counts.committee_id = pairs.committee_id
+    AND counts.congress_id = pairs.congress_id
+    ON CONFLICT (committee_id, congress_id) DO UPDATE
+    SET investigative_oversight_hearings = EXCLUDED.investigative_oversight_hearings,
+        policy_legislative_hearings = EXCLUDED.policy_legislative_hearings,
+        total_hearings = EXCLUDED.total_hearings,
+        chp_points = EXCLUDED.chp_points
+'''
+
+# Every permanent committee in every Congress
+ALL_PAIRS_SQL = '''
+      SELECT committees.id AS committee_id,
+             congress.id AS congress_id
+      FROM committees
+      CROSS JOIN committeeoversightapp_congress AS congress
+'''
+
+# Pairs flagged as stale since the last run, cleared as they are recomputed
+STALE_PAIRS_SQL = '''
+      DELETE FROM committeeoversightapp_stalecommitteerating
+      WHERE committee_id IN (SELECT id FROM committees)
+      RETURNING committee_id, congress_id
+'''
 
 
 class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch',
+            action='store_true',
+            help='Count hearings for every committee and Congress in a single '
+                 'grouped query instead of one set of queries per pair.'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only recompute ratings flagged as stale by hearing changes '
+                 'since the last run.'
+        )
+
     def handle(self, **options):
         self.stdout.write(self.style.SUCCESS(str(datetime.now()) + ': Starting committee rating update'))
 
-        for congress in Congress.objects.all():
-            for committee in CommitteeOrganization.objects.permanent_committees():
-                self.build_committee_rating(congress, committee)
+        if options['incremental']:
+            self.build_committee_ratings(STALE_PAIRS_SQL)
+        elif options['batch']:
+            StaleCommitteeRating.objects.all().delete()
+            self.build_committee_ratings(ALL_PAIRS_SQL)
+        else:
+            StaleCommitteeRating.objects.all().delete()
+
+            for congress in Congress.objects.all():
+                for committee in CommitteeOrganization.objects.permanent_committees():
+                    self.build_committee_rating(congress, committee)
+
+        scorecards = CommitteeScorecard.objects.refresh()
+        self.stdout.write('Rebuilt {} committee scorecards.'.format(len(scorecards)))
 
         self.stdout.write(self.style.SUCCESS(str(datetime.now()) + ': Committee rating update completed!'))
 
+    def build_committee_ratings(self, pairs_sql):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(BATCH_RATINGS_SQL.format(pairs=pairs_sql), {
+                'committee_names': settings.CURRENT_PERMANENT_COMMITTEES,
+                'investigative_oversight': INVESTIGATIVE_OVERSIGHT_CATEGORIES,
+                'policy_legislative': POLICY_LEGISLATIVE_CATEGORIES,
+                'total': TOTAL_CATEGORIES,
+            })
+
+            self.stdout.write(
+                'Added rating counts for {} committee/Congress pairs.'.format(
+                    cursor.rowcount
+                )
+            )
+
     def build_committee_rating(self, congress, committee):
-        committee_hearings = committee.hearings.filter(
-            start_date__range=(
+        # Filter on the date copied to the committee's hearings, in one
+        # filter() so that both conditions apply to the same membership
+        committee_hearings = HearingEvent.objects.filter(
+            committee_memberships__committee=committee,
+            committee_memberships__start_date__range=(
                 congress.start_date,
                 congress.end_date
             )
         )
 
-        # Investigative Oversight = Agency Conduct Hearings + Private Sector Hearings
         investigative_oversight_hearings=self.count_by_category(
             committee_hearings,
-            ['Agency Conduct', 'Private Sector Oversight']
+            INVESTIGATIVE_OVERSIGHT_CATEGORIES
         )
 
-        # Policy/Legislative = Policy Hearings + Legislative Hearings + Closed Hearings
         policy_legislative_hearings=self.count_by_category(
             committee_hearings,
-            ['Legislative', 'Policy', 'Closed']
+            POLICY_LEGISLATIVE_CATEGORIES
         )
 
-        # Total = Agency Conduct + Private Sector + Policy + Legislative
-        # + Nominations + Fact Finding + Field + Closed
         total_hearings=self.count_by_category(
             committee_hearings,
-            ['Nominations', 'Legislative', 'Policy', 'Agency Conduct',
-             'Private Sector Oversight', 'Fact Finding', 'Field', 'Closed']
+            TOTAL_CATEGORIES
         )
 
         # This ratings methodology was designed by the Lugar Center
@@ -70,6 +207,7 @@ class Command(BaseCommand):
         )
 
     def count_by_category(self, committee_hearings, category_list):
+        # Hearings with more than one matching category are counted once
         return committee_hearings.filter(
             hearingcategory__category__name__in=category_list
-        ).count()
+        ).distinct().count()
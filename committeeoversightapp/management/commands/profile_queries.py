@@ -0,0 +1,36 @@
+import argparse
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from committeeoversightapp.query_log import QueryLog
+
+
+class Command(BaseCommand):
+    help = "Run another management command and report the queries it ran, " \
+           "e.g., profile_queries load_committeeratings --incremental"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'command_name',
+            help='The command to run'
+        )
+        parser.add_argument(
+            'command_args',
+            nargs=argparse.REMAINDER,
+            help='Arguments and options to pass to the command'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Report this many of the most repeated queries and busiest call sites'
+        )
+
+    def handle(self, *args, **options):
+        # Queries run on other threads, e.g., by archive_documents' workers,
+        # use their own connections and aren't counted
+        with QueryLog() as log:
+            call_command(options['command_name'], *options['command_args'])
+
+        self.stdout.write(log.report(top=options['top']))
@@ -0,0 +1,268 @@
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import RequestFactory
+
+from wagtail.core.models import Site
+
+from committeeoversightapp.models import HearingEvent, CommitteeOrganization, \
+                                         CommitteeDetailPage, LandingPage, \
+                                         CompareCurrentCommitteesPage, \
+                                         CompareCommitteesOverCongressesPage
+from committeeoversightapp.query_log import QueryLog
+from committeeoversightapp.views import EventListJson
+
+# import_data reads the spreadsheets built by data/Makefile
+IMPORT_DATA_FILES = ['data/final/house.csv', 'data/final/house_committees.csv',
+                     'data/final/senate.csv', 'data/final/senate_committees.csv']
+
+# Commands that rewrite the ratings or hearings run once, rather than
+# --repeat times
+RUN_ONCE = {'load_committeeratings', 'load_committeeratings_batch', 'import_data'}
+
+# Rows per page of the hearing list, as on the site
+PAGE_LENGTH = 25
+
+
+class Command(BaseCommand):
+    help = "Time the rating and import commands, the hearing list and the committee pages, " \
+           "and record the results as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'benchmarks',
+            nargs='*',
+            help='Run only these benchmarks. Defaults to all of them'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Run each page benchmark this many times'
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark_results.json',
+            help='The JSON file to record the results in'
+        )
+        parser.add_argument(
+            '--compare',
+            help='Compare the results with an earlier run recorded in this JSON file'
+        )
+        parser.add_argument(
+            '--import-data',
+            action='store_true',
+            help='Also time import_data --bulk. It writes to the database, so '
+                 'it only runs when asked for'
+        )
+
+    def handle(self, *args, **options):
+        if not HearingEvent.objects.exists():
+            raise CommandError('There are no hearings to benchmark. Add some with generate_hearings.')
+
+        self.factory = RequestFactory()
+        self.site = Site.objects.filter(is_default_site=True).first()
+
+        benchmarks = self.get_benchmarks(options)
+
+        unknown = set(options['benchmarks']) - set(benchmarks)
+        if unknown:
+            raise CommandError('Unknown benchmarks: {}. Choose from: {}'.format(
+                ', '.join(sorted(unknown)),
+                ', '.join(benchmarks)
+            ))
+
+        results = {
+            'started_at': datetime.now().isoformat(),
+            'hearings': HearingEvent.objects.count(),
+            'committees': CommitteeOrganization.objects.permanent_committees().count(),
+            'benchmarks': {},
+        }
+
+        for name, benchmark in benchmarks.items():
+            if options['benchmarks'] and name not in options['benchmarks']:
+                continue
+
+            self.stdout.write('Running {}...'.format(name))
+
+            setup = self.setups.get(name)
+            if setup:
+                setup()
+
+            results['benchmarks'][name] = self.time_benchmark(
+                benchmark,
+                1 if name in RUN_ONCE else max(options['repeat'], 1)
+            )
+
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2)
+
+        self.stdout.write(self.style.SUCCESS('Recorded results in {}.'.format(options['output'])))
+
+        self.report(results, options['compare'])
+
+    def get_benchmarks(self, options):
+        """
+        Map the name of each benchmark to a function running it once. Also
+        sets self.setups, mapping some of them to a function to run, untimed,
+        before they are.
+        """
+        # The committee with the most hearings
+        committee = CommitteeOrganization.objects.permanent_committees() \
+            .annotate(hearing_count=Count('committee_hearings')) \
+            .order_by('-hearing_count').first()
+        committee_page = CommitteeDetailPage.objects.live() \
+            .filter(committee=committee).first() \
+            or CommitteeDetailPage(title=str(committee), committee=committee, body='')
+        middle = self.count_listed_hearings() // 2 // PAGE_LENGTH * PAGE_LENGTH
+
+        benchmarks = {
+            'load_committeeratings':
+                lambda: call_command('load_committeeratings', stdout=StringIO()),
+            'load_committeeratings_batch':
+                lambda: call_command('load_committeeratings', '--batch', stdout=StringIO()),
+            'hearing_list':
+                lambda: self.get_hearing_list(),
+            # Paging through to the middle seeks past the previous page's
+            # bookmark, while jumping straight to a page counts through an
+            # OFFSET
+            'hearing_list_deep_page':
+                lambda: self.get_hearing_list(start=middle),
+            'hearing_list_deep_page_offset':
+                lambda: self.get_hearing_list(start=middle + 1),
+            'hearing_list_committee':
+                lambda: self.get_hearing_list(detail_type='committee', id=committee.id),
+            'hearing_list_search':
+                lambda: self.get_hearing_list(**{'search[value]': 'oversight'}),
+            'landing_page':
+                lambda: self.get_page(LandingPage),
+            'compare_current_committees':
+                lambda: self.get_page(CompareCurrentCommitteesPage),
+            'compare_committees_over_congresses':
+                lambda: self.get_page(CompareCommitteesOverCongressesPage),
+            'committee_detail_page':
+                lambda: self.render_page(committee_page),
+        }
+
+        self.setups = {
+            'hearing_list_deep_page': lambda: self.seed_bookmarks(middle),
+        }
+
+        if options['import_data']:
+            missing = [path for path in IMPORT_DATA_FILES if not os.path.exists(path)]
+            if missing:
+                raise CommandError('import_data needs {}. Build them with data/Makefile.'.format(
+                    ', '.join(missing)
+                ))
+
+            benchmarks['import_data'] = \
+                lambda: call_command('import_data', '--bulk', stdout=StringIO())
+
+        return benchmarks
+
+    def get_hearing_list(self, start=0, **params):
+        params.update({
+            'draw': 1,
+            'start': start,
+            'length': PAGE_LENGTH,
+            'order[0][column]': 0,
+            'order[0][dir]': 'desc',
+        })
+        for i in range(len(EventListJson.columns)):
+            params['columns[{}][data]'.format(i)] = i
+            params['columns[{}][searchable]'.format(i)] = 'true'
+            params['columns[{}][orderable]'.format(i)] = 'true'
+
+        request = self.factory.get('/my/datatable/data/', params)
+        request.user = AnonymousUser()
+
+        return EventListJson.as_view()(request)
+
+    def count_listed_hearings(self):
+        """
+        Count the hearings the public can see in the hearing list, without
+        caching the count the hearing_list benchmark would find.
+        """
+        view = EventListJson()
+        view.request = self.factory.get('/my/datatable/data/')
+        view.request.user = AnonymousUser()
+
+        return view.filter_queryset(HearingEvent.objects.all()).count()
+
+    def seed_bookmarks(self, end):
+        """Page through the hearing list up to end, caching each page's bookmark."""
+        for start in range(0, end, PAGE_LENGTH):
+            self.get_hearing_list(start=start)
+
+    def get_page(self, page_model):
+        # Render an unsaved page if the CMS doesn't have one, e.g., on a
+        # database filled by generate_hearings
+        page = page_model.objects.live().first() \
+            or page_model(title=page_model._meta.verbose_name, body='')
+
+        return self.render_page(page)
+
+    def render_page(self, page):
+        request = self.factory.get('/')
+        request.user = AnonymousUser()
+        request.site = self.site
+
+        return page.serve(request).render()
+
+    def time_benchmark(self, benchmark, repeat):
+        """
+        Run a benchmark repeat times, counting the queries of the first run,
+        which is the only one that can't be served from the cache.
+        """
+        seconds = []
+
+        for i in range(repeat):
+            with QueryLog() as log:
+                start = time.perf_counter()
+                benchmark()
+                seconds.append(time.perf_counter() - start)
+
+            if i == 0:
+                queries = log.count
+                query_seconds = log.seconds
+                repeated_queries = sum(count for _, count in log.duplicates())
+
+        return {
+            'seconds': seconds,
+            'first': seconds[0],
+            'median': statistics.median(seconds),
+            'queries': queries,
+            'query_seconds': query_seconds,
+            'repeated_queries': repeated_queries,
+        }
+
+    def report(self, results, compare_path):
+        previous = {}
+        if compare_path:
+            with open(compare_path) as f:
+                previous = json.load(f)['benchmarks']
+
+        for name, result in results['benchmarks'].items():
+            line = '{:>36}: first {:8.1f} ms, median {:8.1f} ms, {:5d} queries'.format(
+                name,
+                result['first'] * 1000,
+                result['median'] * 1000,
+                result['queries']
+            )
+
+            if name in previous:
+                change = (result['median'] - previous[name]['median']) / previous[name]['median']
+                line += ' ({:+.0%} median, {:+d} queries)'.format(
+                    change,
+                    result['queries'] - previous[name]['queries']
+                )
+
+            self.stdout.write(line)
@@ -0,0 +1,42 @@
+# Generated by Django 2.1.15 on 2026-10-18 13:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('committeeoversightapp', '0027_auto_20200423_1225'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommitteeScorecard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('investigative_oversight_hearings', models.IntegerField(blank=True, null=True)),
+                ('policy_legislative_hearings', models.IntegerField(blank=True, null=True)),
+                ('total_hearings', models.IntegerField(blank=True, null=True)),
+                ('chp_score', models.IntegerField()),
+                ('chp_grade', models.CharField(max_length=2)),
+                ('css_class', models.CharField(max_length=20)),
+                ('footnote_symbol', models.CharField(blank=True, max_length=20)),
+                ('investigative_oversight_percent_max', models.IntegerField()),
+                ('policy_legislative_percent_max', models.IntegerField()),
+                ('total_percent_max', models.IntegerField()),
+                ('investigative_oversight_percent_avg', models.IntegerField()),
+                ('policy_legislative_percent_avg', models.IntegerField()),
+                ('total_percent_avg', models.IntegerField()),
+                ('investigative_oversight_hearings_avg', models.FloatField(blank=True, null=True)),
+                ('policy_legislative_hearings_avg', models.FloatField(blank=True, null=True)),
+                ('total_hearings_avg', models.FloatField(blank=True, null=True)),
+                ('committee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='committeeoversightapp.CommitteeOrganization')),
+                ('congress', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='committeeoversightapp.Congress')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='committeescorecard',
+            unique_together={('committee', 'congress')},
+        ),
+    ]
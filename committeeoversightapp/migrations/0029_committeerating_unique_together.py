@@ -0,0 +1,34 @@
+# Generated by Django 2.1.15 on 2026-10-18 13:45
+
+from django.db import migrations
+
+
+def remove_duplicate_ratings(apps, schema_editor):
+    """
+    Keep the first rating for each committee and Congress so the unique
+    constraint can be added. load_committeeratings rebuilds the counts.
+    """
+    CommitteeRating = apps.get_model('committeeoversightapp', 'CommitteeRating')
+
+    seen = set()
+    for rating in CommitteeRating.objects.order_by('id'):
+        key = (rating.committee_id, rating.congress_id)
+        if key in seen:
+            rating.delete()
+        else:
+            seen.add(key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('committeeoversightapp', '0028_committeescorecard'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_ratings, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='committeerating',
+            unique_together={('committee', 'congress')},
+        ),
+    ]
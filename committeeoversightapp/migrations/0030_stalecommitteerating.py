@@ -0,0 +1,27 @@
+# Generated by Django 2.1.15 on 2026-10-18 13:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('committeeoversightapp', '0029_committeerating_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleCommitteeRating',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('committee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='committeeoversightapp.CommitteeOrganization')),
+                ('congress', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='committeeoversightapp.Congress')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='stalecommitteerating',
+            unique_together={('committee', 'congress')},
+        ),
+    ]
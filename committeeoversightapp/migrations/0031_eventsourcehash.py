@@ -0,0 +1,51 @@
+# Generated by Django 2.1.15 on 2026-10-18 13:58
+
+import hashlib
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def hash_source_hashes(apps, schema_editor):
+    """
+    Move the row strings import_data stored in each hearing's extras into
+    EventSourceHash, hashed the way import_data now hashes rows.
+    """
+    Event = apps.get_model('legislative', 'Event')
+    EventSourceHash = apps.get_model('committeeoversightapp', 'EventSourceHash')
+
+    source_hashes = set()
+    for event_id, extras in Event.objects.filter(
+        extras__has_key='source_hash'
+    ).values_list('id', 'extras').iterator():
+        source_hash = hashlib.sha256(extras['source_hash'].encode()).hexdigest()
+        source_hashes.add((event_id, source_hash))
+
+    EventSourceHash.objects.bulk_create([
+        EventSourceHash(event_id=event_id, source_hash=source_hash)
+        for event_id, source_hash in source_hashes
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative', '0008_longer_event_name'),
+        ('committeeoversightapp', '0030_stalecommitteerating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSourceHash',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(db_index=True, max_length=64)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='source_hashes', to='legislative.Event')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='eventsourcehash',
+            unique_together={('event', 'source_hash')},
+        ),
+        migrations.RunPython(hash_source_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.1.15 on 2026-10-18 14:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Sign every existing hearing with participants, as
+# EventCommitteeSignature.objects.rebuild() does
+POPULATE_SQL = '''
+    INSERT INTO committeeoversightapp_eventcommitteesignature
+      (event_id, start_date, signature)
+    SELECT event.id,
+           event.start_date,
+           CASE WHEN COUNT(*) FILTER (WHERE participant.organization_id IS NULL) > 0
+             THEN NULL
+             ELSE string_agg(DISTINCT participant.organization_id, ','
+                             ORDER BY participant.organization_id COLLATE "C")
+           END
+    FROM opencivicdata_event AS event
+    JOIN opencivicdata_eventparticipant AS participant
+    ON participant.event_id = event.id
+    GROUP BY event.id, event.start_date
+'''
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative', '0008_longer_event_name'),
+        ('committeeoversightapp', '0031_eventsourcehash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventCommitteeSignature',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='committee_signature', serialize=False, to='legislative.Event')),
+                ('start_date', models.CharField(max_length=25)),
+                ('signature', models.TextField(null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='eventcommitteesignature',
+            index=models.Index(fields=['start_date', 'signature'], name='committeeov_start_d_33f60a_idx'),
+        ),
+        migrations.RunSQL(POPULATE_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.1.15 on 2026-10-18 14:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative', '0008_longer_event_name'),
+        ('committeeoversightapp', '0032_eventcommitteesignature'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archive_jobs', to='legislative.EventDocumentLink')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivejob',
+            index=models.Index(fields=['status', 'run_at'], name='committeeov_status_dd04f1_idx'),
+        ),
+    ]
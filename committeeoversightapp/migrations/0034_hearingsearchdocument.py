@@ -0,0 +1,46 @@
+# Generated by Django 2.1.15 on 2026-10-18 14:11
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Index every existing hearing, as HearingSearchDocument.objects.rebuild()
+# does
+POPULATE_SQL = '''
+    INSERT INTO committeeoversightapp_hearingsearchdocument
+      (event_id, search_vector)
+    SELECT event.id,
+           setweight(to_tsvector('simple', event.name), 'A')
+           || setweight(to_tsvector('simple', COALESCE(string_agg(participant.name, ' '), '')), 'B')
+           || setweight(to_tsvector('simple', COALESCE(string_agg(details.organization, ' '), '')), 'C')
+    FROM opencivicdata_event AS event
+    LEFT JOIN opencivicdata_eventparticipant AS participant
+    ON participant.event_id = event.id
+    LEFT JOIN committeeoversightapp_witnessdetails AS details
+    ON details.witness_id = participant.id
+    GROUP BY event.id, event.name
+'''
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative', '0008_longer_event_name'),
+        ('committeeoversightapp', '0033_archivejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HearingSearchDocument',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='legislative.Event')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='hearingsearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='committeeov_search__bd10b4_gin'),
+        ),
+        migrations.RunSQL(POPULATE_SQL, migrations.RunSQL.noop),
+    ]
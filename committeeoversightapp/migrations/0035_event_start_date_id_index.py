@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index hearings by (start_date, id), the order EventListJson pages
+    through them in. Event belongs to opencivicdata, so the index is added
+    here.
+    """
+
+    dependencies = [
+        ('legislative', '0008_longer_event_name'),
+        ('committeeoversightapp', '0034_hearingsearchdocument'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS committeeoversight_event_start_date_id '
+            'ON opencivicdata_event (start_date, id)',
+            'DROP INDEX IF EXISTS committeeoversight_event_start_date_id',
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 2.1.15 on 2026-10-18 14:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Add every existing hearing to its committees, as
+# CommitteeHearing.objects.rebuild() does
+POPULATE_SQL = '''
+    INSERT INTO committeeoversightapp_committeehearing
+      (committee_id, event_id, start_date)
+    SELECT DISTINCT committee.id, event.id, event.start_date
+    FROM opencivicdata_event AS event
+    JOIN opencivicdata_eventparticipant AS participant
+    ON participant.event_id = event.id
+    JOIN opencivicdata_organization AS organization
+    ON organization.id = participant.organization_id
+    JOIN opencivicdata_organization AS committee
+    ON committee.id IN (organization.id, organization.parent_id)
+'''
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legislative', '0008_longer_event_name'),
+        ('core', '0004_auto_20171005_2028'),
+        ('committeeoversightapp', '0035_event_start_date_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommitteeHearing',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.CharField(max_length=25)),
+                ('committee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='committee_hearings', to='core.Organization')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='committee_memberships', to='legislative.Event')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='committeehearing',
+            index=models.Index(fields=['committee', 'start_date'], name='committeeov_committ_75a5f8_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='committeehearing',
+            unique_together={('committee', 'event')},
+        ),
+        migrations.RunSQL(POPULATE_SQL, migrations.RunSQL.noop),
+    ]
@@ -3,3 +3,78 @@ def cap_100(percent):
         return percent
     else:
         return 100
+
+
+GRADE_THRESHOLDS = [
+    (92, 'A'),
+    (90, 'A-'),
+    (88, 'B+'),
+    (82, 'B'),
+    (80, 'B-'),
+    (78, 'C+'),
+    (72, 'C'),
+    (70, 'C-'),
+    (68, 'D+'),
+    (62, 'D'),
+    (60, 'D-'),
+    (0, 'F'),
+]
+
+RATING_COLORS = {
+    'A': 'a-rating',
+    'A-': 'a-minus-rating',
+    'B+': 'b-plus-rating',
+    'B': 'b-rating',
+    'B-': 'b-minus-rating',
+    'C+': 'c-plus-rating',
+    'C': 'c-rating',
+    'C-': 'c-minus-rating',
+    'D+': 'd-plus-rating',
+    'D': 'd-rating',
+    'D-': 'd-minus-rating',
+    'F': 'f-rating'
+}
+
+
+def get_chp_score(chp_points, max_chp_points, congress):
+    '''
+    Score a committee's points in a Congress against its best Congress,
+    projecting the current Congress forward. Raises ZeroDivisionError if the
+    committee has no points in any Congress.
+    '''
+    current_score = chp_points / max_chp_points * 100 * congress.normalizer
+
+    if not congress.is_current:
+        return round(current_score)
+    else:
+        return round(current_score / congress.percent_passed * 100)
+
+
+def get_chp_grade(score):
+    for threshold, grade in GRADE_THRESHOLDS:
+        if threshold <= score:
+            return grade
+
+    return 'C'
+
+
+def get_css_class(grade):
+    '''
+    A+ => 'a-plus-rating'
+    '''
+    return RATING_COLORS[grade]
+
+
+def get_percent_max(hearings, hearings_max, congress):
+    try:
+        return cap_100(round(hearings / hearings_max * 100 * congress.normalizer))
+    except ZeroDivisionError:
+        return 0
+
+
+def get_percent_avg(hearings, hearings_avg, congress):
+    try:
+        return round(hearings / hearings_avg * 100 * congress.normalizer)
+    except ZeroDivisionError:
+        return 0
+
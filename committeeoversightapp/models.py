@@ -1,15 +1,22 @@
 import re
-from datetime import date
+import hashlib
+from datetime import date, timedelta
+from itertools import groupby
 
+from django.utils.functional import cached_property, SimpleLazyObject
 from django.utils.text import slugify
 from django.contrib import admin
 from django.contrib.admin.widgets import AutocompleteSelect
 from django.contrib.humanize.templatetags.humanize import ordinal
-from django.db import models
-from django.db.models import Max, Avg, Q
+from django.db import models, transaction, connection
+from django.db.models import Max, Avg, F
 from django.db.models.fields import TextField, BooleanField
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField, SearchQuery, \
+                                           SearchRank
+from django.utils import timezone
 
 from wagtail.core.models import Page
 from wagtail.core.fields import StreamField, RichTextField
@@ -21,18 +28,32 @@ from wagtail.images.blocks import ImageChooserBlock
 
 from opencivicdata.core.models import Organization
 from opencivicdata.legislative.models import Event, EventParticipant, \
-                                             EventDocument
+                                             EventDocument, EventDocumentLink
+
+from .model_utils import cap_100, get_chp_score, get_chp_grade, \
+                         get_css_class, get_percent_max, get_percent_avg
+from .registry import committee_registry
+from .scoring import RatingScores, HEARING_TYPES
+from .cache import get_cache_version, set_cache_version
+
+class HearingEventManager(models.Manager):
+    # Cached hearing list counts and page bookmarks are keyed on this version
+    version_name = 'hearings'
+
+    def invalidate(self):
+        set_cache_version(self.version_name)
 
-from .model_utils import cap_100
 
 class HearingEvent(Event):
     class Meta:
         proxy = True
 
+    objects = HearingEventManager()
+
     def get_absolute_url(self):
         return '/hearing/view/{}/'.format(self.id)
 
-    @property
+    @cached_property
     def category(self):
         try:
             return HearingCategory.objects.get(
@@ -65,17 +86,39 @@ class CommitteeManager(models.Manager):
         )
 
     def last_updated_all_committees(self):
-        return max(
-            [
-                committee.last_updated
-                for committee in self.permanent_committees()
-            ]
-        )
+        """
+        The latest update to a categorized hearing of any permanent
+        committee, in one aggregate query.
+        """
+        return HearingEvent.objects.filter(
+            committee_memberships__committee__in=self.permanent_committees()
+                .order_by().values('id'),
+            hearingcategory__isnull=False
+        ).aggregate(
+            Max('updated_at')
+        )['updated_at__max']
 
     def get_committee_context(self, context):
+        # The committee tables are cached as template fragments keyed on
+        # these versions, so only load the scorecards if a fragment misses
+        context['ratings_version'] = \
+            get_cache_version(CommitteeScorecard.objects.version_name)
+        context['committees_version'] = \
+            get_cache_version(committee_registry.version_name)
+
+        scorecard_committees = SimpleLazyObject(
+            CommitteeScorecard.objects.by_committee
+        )
+
         context['committees'] = self.permanent_committees()
-        context['house_committees'] = self.house_committees()
-        context['senate_committees'] = self.senate_committees()
+        context['house_committees'] = SimpleLazyObject(lambda: [
+            committee for committee in scorecard_committees
+            if committee.parent.name == 'United States House of Representatives'
+        ])
+        context['senate_committees'] = SimpleLazyObject(lambda: [
+            committee for committee in scorecard_committees
+            if committee.parent.name == 'United States Senate'
+        ])
         context['last_updated'] = self.last_updated_all_committees()
         context['current_congress'] = Congress.objects.all().order_by("-id")[0]
         return context
@@ -89,10 +132,7 @@ class CommitteeOrganization(Organization):
 
     @property
     def hearings(self):
-        return HearingEvent.objects.all().filter(
-            Q(participants__organization=self) |
-            Q(participants__organization__parent=self)
-        ).distinct()
+        return HearingEvent.objects.filter(committee_memberships__committee=self)
 
     @property
     def last_updated(self):
@@ -115,41 +155,36 @@ class CommitteeOrganization(Organization):
 
     @property
     def parent_proxy(self):
-        return CommitteeOrganization.objects.get(id=self.parent.id)
+        return committee_registry.organization(self.parent_id) \
+            or CommitteeOrganization.objects.get(id=self.parent.id)
 
     @property
     def display_name(self):
-        try:
-            display_name = CommitteeDetailPage.objects.get(
-                committee=self.id
-            ).display_name
+        detail_page = committee_registry.detail_page(self.id)
 
-            if display_name:
-                return display_name
-        except ObjectDoesNotExist:
-            pass
+        if detail_page and detail_page['display_name']:
+            return detail_page['display_name']
 
         return self.name
 
     @property
     def short_name(self):
-        if self.parent.name in settings.CHAMBERS:
+        if self.parent_proxy.name in settings.CHAMBERS:
             return re.sub(r'(House|Senate) Committee on ', '', self.display_name)
         return self.display_name
 
     @property
     def is_subcommittee(self):
-        if self.parent.parent.name in settings.CHAMBERS:
+        grandparent = committee_registry.organization(self.parent_proxy.parent_id)
+
+        if grandparent and grandparent.name in settings.CHAMBERS:
             return True
         else:
             return False
 
     @property
     def is_permanent(self):
-        if CommitteeOrganization.objects.permanent_committees().filter(id=self.id).exists():
-            return True
-        else:
-            return False
+        return committee_registry.is_permanent(self.id)
 
     @property
     def get_linked_html(self):
@@ -157,11 +192,11 @@ class CommitteeOrganization(Organization):
             if self.parent_proxy.is_permanent:
                 return '<a href=\"{0}\">{1}</a>, {2}'.format(
                     self.parent_proxy.url,
-                    self.parent,
+                    self.parent_proxy.name,
                     self.name
                 )
             else:
-                return '{0}, {1}'.format(self.parent, self)
+                return '{0}, {1}'.format(self.parent_proxy.name, self)
         else:
             if self.is_permanent:
                 return '<a href="{0}">{1}</a>'.format(self.url, self)
@@ -174,10 +209,10 @@ class CommitteeOrganization(Organization):
             if self.parent_proxy.is_permanent:
                 return '<a href=\"{0}\">{1}</a>'.format(
                     self.parent_proxy.url,
-                    self.parent
+                    self.parent_proxy.name
                 )
             else:
-                return self.parent
+                return self.parent_proxy.name
         else:
             if self.is_permanent:
                 return '<a href="{0}">{1}</a>'.format(self.url, self)
@@ -186,11 +221,21 @@ class CommitteeOrganization(Organization):
 
     @property
     def chair(self):
-        return CommitteeDetailPage.objects.get(committee=self.id).chair
+        return self.get_detail_page()['chair']
 
     @property
     def hide_rating(self):
-        return CommitteeDetailPage.objects.get(committee=self.id).hide_rating
+        return self.get_detail_page()['hide_rating']
+
+    def get_detail_page(self):
+        detail_page = committee_registry.detail_page(self.id)
+
+        if detail_page is None:
+            raise CommitteeDetailPage.DoesNotExist(
+                'No CommitteeDetailPage for {}'.format(self.id)
+            )
+
+        return detail_page
 
     @property
     def ratings_by_congress_desc(self):
@@ -347,75 +392,31 @@ class CommitteeRating(models.Model):
     total_hearings = models.IntegerField(null=True, blank=True)
     chp_points = models.IntegerField(null=True, blank=True)
 
+    class Meta:
+        unique_together = ('committee', 'congress')
+
     @property
     def chp_score(self):
         try:
-            current_score = self.chp_points \
-                / self.committee.max_chp_points * 100 \
-                * self.congress.normalizer
-
-            if not self.congress.is_current:
-                return round(current_score)
-            else:
-                return round(current_score / self.congress.percent_passed \
-                    * 100)
-
+            return get_chp_score(
+                self.chp_points,
+                self.committee.max_chp_points,
+                self.congress
+            )
         except ZeroDivisionError:
             print("Divide by zero error on " + self.committee.display_name)
             return 0
 
     @property
     def chp_grade(self):
-        score = self.chp_score
-        if 92 <= score:
-            return 'A'
-        elif 90 <= score < 92:
-            return 'A-'
-        elif 88 <= score < 90:
-            return 'B+'
-        elif 82 <= score < 88:
-            return 'B'
-        elif 80 <= score < 82:
-            return 'B-'
-        elif 78 <= score < 80:
-            return 'C+'
-        elif 72 <= score < 78:
-            return 'C'
-        elif 70 <= score < 72:
-            return 'C-'
-        elif 68 <= score < 70:
-            return 'D+'
-        elif 62 <= score < 68:
-            return 'D'
-        elif 60 <= score < 62:
-            return 'D-'
-        elif 0 <= score < 60:
-            return 'F'
-        else:
-            return 'C'
+        return get_chp_grade(self.chp_score)
 
     @property
     def css_class(self):
         '''
         A+ => 'a-plus-rating'
         '''
-
-        rating_colors = {
-            'A': 'a-rating',
-            'A-': 'a-minus-rating',
-            'B+': 'b-plus-rating',
-            'B': 'b-rating',
-            'B-': 'b-minus-rating',
-            'C+': 'c-plus-rating',
-            'C': 'c-rating',
-            'C-': 'c-minus-rating',
-            'D+': 'd-plus-rating',
-            'D': 'd-rating',
-            'D-': 'd-minus-rating',
-            'F': 'f-rating'
-        }
-
-        return rating_colors[self.chp_grade]
+        return get_css_class(self.chp_grade)
 
     @property
     def investigative_oversight_percent_max(self):
@@ -442,28 +443,286 @@ class CommitteeRating(models.Model):
         return self.get_percent_avg('total_hearings')
 
     def get_percent_max(self, hearing_type):
-        ht = getattr(self, hearing_type)
-        ht_max = getattr(self.committee, hearing_type + '_max')
-
-        try:
-            percent_max = round(ht / ht_max * 100 * self.congress.normalizer)
-            return cap_100(percent_max)
-        except ZeroDivisionError:
-            return 0
+        return get_percent_max(
+            getattr(self, hearing_type),
+            getattr(self.committee, hearing_type + '_max'),
+            self.congress
+        )
 
     def get_percent_avg(self, hearing_type):
-        ht = getattr(self, hearing_type)
-        ht_avg = getattr(self.committee, hearing_type + '_avg')
+        return get_percent_avg(
+            getattr(self, hearing_type),
+            getattr(self.committee, hearing_type + '_avg'),
+            self.congress
+        )
 
-        try:
-            return round(ht / ht_avg * 100 * self.congress.normalizer)
-        except ZeroDivisionError:
-            return 0
+    def __str__(self):
+        return self.chp_grade
+
+
+class CommitteeScorecardManager(models.Manager):
+    version_name = 'committee_ratings'
+
+    def refresh(self):
+        '''
+        Rebuild the scorecard from the current CommitteeRating rows. This is
+        run by load_committeeratings, so that pages listing every committee
+        don't have to score each rating on the fly.
+        '''
+        ratings = CommitteeRating.objects.filter(
+            committee__classification='committee',
+            committee__name__in=settings.CURRENT_PERMANENT_COMMITTEES
+        ).select_related(
+            'committee',
+            'congress'
+        ).order_by('committee_id', '-congress__id')
+
+        scorecards = self.build(ratings)
+
+        with transaction.atomic():
+            self.get_queryset().delete()
+            self.bulk_create(scorecards)
+
+        # Version the cached rating tables by everything they render, so
+        # that a run that doesn't change any ratings keeps the cached
+        # fragments. That includes each Congress's footnote and whether it's
+        # current, which the tables show alongside the scores.
+        fields = [field.attname for field in self.model._meta.concrete_fields
+                  if not field.primary_key]
+        digest = hashlib.md5(repr([
+            [getattr(scorecard, field) for field in fields] + [
+                scorecard.congress.start_date,
+                scorecard.congress.end_date,
+                scorecard.congress.inactive_days,
+                scorecard.congress.footnote,
+                scorecard.congress.is_current,
+            ]
+            for scorecard in scorecards
+        ]).encode()).hexdigest()
+        set_cache_version(self.version_name, digest)
+
+        return scorecards
+
+    def invalidate(self):
+        set_cache_version(self.version_name)
+
+    def build(self, ratings):
+        '''
+        Score a list of ratings, with their committees and congresses loaded,
+        in one pass over the whole ratings matrix and without any further
+        queries. Returns unsaved scorecards in the same order, with the same
+        scores, grades and percentages as the CommitteeRating properties.
+        Footnote symbols are numbered in that order, per committee.
+        '''
+        ratings = list(ratings)
+        if not ratings:
+            return []
+
+        scores = RatingScores(ratings)
+
+        rows = {id: row for row, id in enumerate(scores.committee_ids)}
+        columns = {c.id: column for column, c in enumerate(scores.congresses)}
+        footnote_counts = {}
+
+        scorecards = []
+
+        for rating in ratings:
+            row = rows[rating.committee_id]
+            cell = (row, columns[rating.congress_id])
+
+            if rating.congress.footnote:
+                count = footnote_counts.get(rating.committee_id, 1)
+                footnote_symbol = '*' * count
+                footnote_counts[rating.committee_id] = count + 1
+            else:
+                footnote_symbol = ''
+
+            scorecard = self.model(
+                committee=rating.committee,
+                congress=rating.congress,
+                chp_score=int(scores.chp_score[cell]),
+                chp_grade=scores.chp_grade[cell],
+                css_class=scores.css_class[cell],
+                footnote_symbol=footnote_symbol
+            )
+
+            for hearing_type in HEARING_TYPES:
+                prefix = hearing_type[:-len('_hearings')]
+
+                setattr(scorecard, hearing_type, getattr(rating, hearing_type))
+                setattr(scorecard, hearing_type + '_avg',
+                        float(scores.hearings_avg[hearing_type][row]))
+                setattr(scorecard, prefix + '_percent_max',
+                        int(scores.percent_max[hearing_type][cell]))
+                setattr(scorecard, prefix + '_percent_avg',
+                        int(scores.percent_avg[hearing_type][cell]))
+
+            scorecards.append(scorecard)
+
+        return scorecards
+
+    def by_committee(self):
+        '''
+        Return a list of permanent committees with their scorecard rows
+        attached, newest Congress first, from a single query:
+
+        committee.scorecards => [<CommitteeScorecard: B>, ...]
+        committee.latest_scorecard => <CommitteeScorecard: B>
+        '''
+        scorecards = self.get_queryset().filter(
+            committee__classification='committee',
+            committee__name__in=settings.CURRENT_PERMANENT_COMMITTEES
+        ).select_related(
+            'committee__parent',
+            'congress'
+        ).order_by('committee__name', '-congress__id')
+
+        committees = []
+
+        for _, committee_scorecards in groupby(scorecards, key=lambda s: s.committee_id):
+            committee_scorecards = list(committee_scorecards)
+            committee = committee_scorecards[0].committee
+            committee.scorecards = committee_scorecards
+            committee.latest_scorecard = committee_scorecards[0]
+            committees.append(committee)
+
+        return committees
+
+
+class CommitteeScorecard(models.Model):
+    '''
+    Precomputed scores and grades for each CommitteeRating, so that pages
+    comparing every committee can render from one query. Rows are rebuilt by
+    the load_committeeratings management command; footnote symbols follow
+    newest-to-oldest Congress order, as on the comparison pages.
+    '''
+    committee = models.ForeignKey(CommitteeOrganization, on_delete=models.CASCADE)
+    congress = models.ForeignKey(Congress, on_delete=models.CASCADE)
+    investigative_oversight_hearings = models.IntegerField(null=True, blank=True)
+    policy_legislative_hearings = models.IntegerField(null=True, blank=True)
+    total_hearings = models.IntegerField(null=True, blank=True)
+    chp_score = models.IntegerField()
+    chp_grade = models.CharField(max_length=2)
+    css_class = models.CharField(max_length=20)
+    footnote_symbol = models.CharField(max_length=20, blank=True)
+    investigative_oversight_percent_max = models.IntegerField()
+    policy_legislative_percent_max = models.IntegerField()
+    total_percent_max = models.IntegerField()
+    investigative_oversight_percent_avg = models.IntegerField()
+    policy_legislative_percent_avg = models.IntegerField()
+    total_percent_avg = models.IntegerField()
+    investigative_oversight_hearings_avg = models.FloatField(null=True, blank=True)
+    policy_legislative_hearings_avg = models.FloatField(null=True, blank=True)
+    total_hearings_avg = models.FloatField(null=True, blank=True)
+
+    objects = CommitteeScorecardManager()
+
+    class Meta:
+        unique_together = ('committee', 'congress')
 
     def __str__(self):
         return self.chp_grade
 
 
+class StaleCommitteeRatingManager(models.Manager):
+    def mark(self, start_date, organization_ids):
+        """
+        Flag the ratings of every permanent committee among, or parent to, the
+        given organizations for each Congress containing start_date, which
+        may be a date or a string starting with one.
+        """
+        organization_ids = [id for id in organization_ids if id]
+
+        if not start_date or not organization_ids:
+            return
+
+        # Hearing dates are stored as strings, and compared as strings with
+        # each Congress's dates below
+        start_date = str(start_date)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                '''INSERT INTO committeeoversightapp_stalecommitteerating
+                     (committee_id, congress_id, created_at)
+                   SELECT DISTINCT committee.id, congress.id, NOW()
+                   FROM opencivicdata_organization AS organization
+                   JOIN opencivicdata_organization AS committee
+                   ON committee.id IN (organization.id, organization.parent_id)
+                   JOIN committeeoversightapp_congress AS congress
+                   ON %(start_date)s
+                     BETWEEN to_char(congress.start_date, 'YYYY-MM-DD')
+                     AND to_char(congress.end_date, 'YYYY-MM-DD')
+                   WHERE organization.id = ANY(%(organization_ids)s)
+                   AND committee.classification = 'committee'
+                   AND committee.name = ANY(%(committee_names)s)
+                   ON CONFLICT (committee_id, congress_id) DO NOTHING''',
+                {'start_date': start_date,
+                 'organization_ids': organization_ids,
+                 'committee_names': settings.CURRENT_PERMANENT_COMMITTEES})
+
+    def mark_events(self, event_ids):
+        """
+        Flag the ratings affected by many hearings at once, by their stored
+        dates and participants, e.g., after a bulk import.
+        """
+        if not event_ids:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                '''INSERT INTO committeeoversightapp_stalecommitteerating
+                     (committee_id, congress_id, created_at)
+                   SELECT DISTINCT committee.id, congress.id, NOW()
+                   FROM opencivicdata_event AS event
+                   JOIN opencivicdata_eventparticipant AS participant
+                   ON participant.event_id = event.id
+                   JOIN opencivicdata_organization AS organization
+                   ON organization.id = participant.organization_id
+                   JOIN opencivicdata_organization AS committee
+                   ON committee.id IN (organization.id, organization.parent_id)
+                   JOIN committeeoversightapp_congress AS congress
+                   ON event.start_date
+                     BETWEEN to_char(congress.start_date, 'YYYY-MM-DD')
+                     AND to_char(congress.end_date, 'YYYY-MM-DD')
+                   WHERE event.id = ANY(%(event_ids)s)
+                   AND committee.classification = 'committee'
+                   AND committee.name = ANY(%(committee_names)s)
+                   ON CONFLICT (committee_id, congress_id) DO NOTHING''',
+                {'event_ids': list(event_ids),
+                 'committee_names': settings.CURRENT_PERMANENT_COMMITTEES})
+
+    def mark_event(self, event_id, start_date=None):
+        """
+        Flag the ratings affected by a hearing, e.g., when its category
+        changes. Pass start_date to use a date other than the stored one.
+        """
+        if start_date is None:
+            start_date = Event.objects.filter(id=event_id) \
+                .values_list('start_date', flat=True).first()
+
+        organization_ids = EventParticipant.objects.filter(
+            event_id=event_id
+        ).values_list('organization_id', flat=True)
+
+        self.mark(start_date, list(organization_ids))
+
+
+class StaleCommitteeRating(models.Model):
+    """
+    A committee rating whose hearing counts have changed since it was last
+    computed. Rows are added as hearings are saved and cleared by
+    load_committeeratings --incremental.
+    """
+    committee = models.ForeignKey(CommitteeOrganization, on_delete=models.CASCADE)
+    congress = models.ForeignKey(Congress, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = StaleCommitteeRatingManager()
+
+    class Meta:
+        unique_together = ('committee', 'congress')
+
+
 class HearingCategoryType(models.Model):
     id = models.CharField(max_length=100, primary_key=True)
     name = models.CharField(max_length=100, primary_key=False)
@@ -499,6 +758,148 @@ class WitnessDetails(models.Model):
     retired = models.BooleanField(default=False)
 
 
+class ArchiveJobManager(models.Manager):
+    def enqueue(self, link):
+        """Queue a document link to be archived by archive_documents."""
+        return self.create(link=link)
+
+    def enqueue_missing(self):
+        """
+        Queue every document link whose document has no archived link and
+        that isn't already queued, including links that failed before.
+        Returns the number of links queued.
+        """
+        links = EventDocumentLink.objects.exclude(text='archived') \
+            .exclude(document__links__text='archived') \
+            .exclude(archive_jobs__status=ArchiveJob.PENDING)
+
+        with transaction.atomic():
+            retried = self.filter(status=ArchiveJob.FAILED, link__in=links) \
+                .update(status=ArchiveJob.PENDING,
+                        attempts=0,
+                        run_at=timezone.now(),
+                        updated_at=timezone.now())
+
+            new_jobs = self.bulk_create(
+                [ArchiveJob(link=link) for link in links.filter(archive_jobs__isnull=True)],
+                batch_size=1000
+            )
+
+        return retried + len(new_jobs)
+
+    def claim(self, limit, lease):
+        """
+        Claim up to limit due jobs for lease seconds, skipping jobs claimed
+        by other workers. A job that isn't finished or retried within its
+        lease, e.g., because its worker died, becomes due again.
+        """
+        now = timezone.now()
+
+        with transaction.atomic():
+            jobs = list(
+                self.select_for_update(skip_locked=True, of=('self',))
+                    .select_related('link')
+                    .filter(status=ArchiveJob.PENDING, run_at__lte=now)
+                    .order_by('run_at')[:limit]
+            )
+
+            for job in jobs:
+                job.attempts += 1
+                job.run_at = now + timedelta(seconds=lease)
+                job.save(update_fields=['attempts', 'run_at', 'updated_at'])
+
+        return jobs
+
+
+class ArchiveJob(models.Model):
+    """
+    A document link waiting to be archived, so that hearings can be saved
+    without waiting on the archive. The archive_documents management
+    command works through due jobs, adding an "archived" EventDocumentLink
+    for each snapshot and retrying failures with exponential backoff.
+    """
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    link = models.ForeignKey(EventDocumentLink,
+                             related_name='archive_jobs',
+                             on_delete=models.CASCADE)
+    status = models.CharField(max_length=10,
+                              choices=STATUS_CHOICES,
+                              default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ArchiveJobManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+        ]
+
+    def claimed(self):
+        """
+        This job's row, if it is still held by the claim this instance was
+        loaded with. Another worker may have claimed it since, if this
+        worker outlived its lease.
+        """
+        return ArchiveJob.objects.filter(id=self.id,
+                                         status=self.PENDING,
+                                         attempts=self.attempts)
+
+    def complete(self, archived_url):
+        """
+        Save the link to the snapshot and finish the job. Returns False,
+        saving nothing, if the claim was lost.
+        """
+        with transaction.atomic():
+            # Lock the job, and skip it if its document was deleted, e.g.,
+            # because the hearing was edited while it was being archived, or
+            # if another worker has claimed it since
+            if not self.claimed().select_for_update().exists():
+                return False
+
+            EventDocumentLink.objects.create(url=archived_url,
+                                             document_id=self.link.document_id,
+                                             media_type=self.link.media_type,
+                                             text='archived')
+
+            self.status = self.DONE
+            self.last_error = ''
+            self.save(update_fields=['status', 'last_error', 'updated_at'])
+
+        return True
+
+    def retry(self, error, max_attempts, backoff):
+        """
+        Schedule the job to run again after backoff seconds, doubling with
+        each attempt, or fail it after max_attempts. Returns False, leaving
+        the job alone, if the claim was lost.
+        """
+        self.last_error = str(error)
+
+        if self.attempts >= max_attempts:
+            self.status = self.FAILED
+        else:
+            delay = backoff * 2 ** (self.attempts - 1)
+            self.run_at = timezone.now() + timedelta(seconds=delay)
+
+        return bool(self.claimed().update(status=self.status,
+                                          run_at=self.run_at,
+                                          last_error=self.last_error,
+                                          updated_at=timezone.now()))
+
+
 class Committee(models.Model):
     """
     Used in the import_data management command, not the frontend app.
@@ -515,6 +916,277 @@ class Committee(models.Model):
                                      on_delete=models.CASCADE)
 
 
+class EventSourceHash(models.Model):
+    """
+    Used in the import_data management command, not the frontend app.
+
+    A SHA-256 hash of each spreadsheet row imported into a hearing, so that
+    rows which have already been imported can be skipped with an indexed
+    lookup.
+    """
+    event = models.ForeignKey(Event,
+                              related_name='source_hashes',
+                              on_delete=models.CASCADE)
+    source_hash = models.CharField(max_length=64, db_index=True)
+
+    class Meta:
+        unique_together = ('event', 'source_hash')
+
+
+COMMITTEE_SIGNATURES_SQL = '''
+    INSERT INTO committeeoversightapp_eventcommitteesignature
+      (event_id, start_date, signature)
+    SELECT event.id,
+           event.start_date,
+           CASE WHEN COUNT(*) FILTER (WHERE participant.organization_id IS NULL) > 0
+             THEN NULL
+             ELSE string_agg(DISTINCT participant.organization_id, ','
+                             ORDER BY participant.organization_id COLLATE "C")
+           END
+    FROM opencivicdata_event AS event
+    JOIN opencivicdata_eventparticipant AS participant
+    ON participant.event_id = event.id
+    {where}
+    GROUP BY event.id, event.start_date
+    ON CONFLICT (event_id) DO UPDATE
+    SET start_date = EXCLUDED.start_date,
+        signature = EXCLUDED.signature
+'''
+
+
+class EventCommitteeSignatureManager(models.Manager):
+    def get_signature(self, organization_ids):
+        """
+        The signature of a set of organizations, matching the signature
+        stored for a hearing they took part in.
+        """
+        return ','.join(sorted(set(organization_ids)))
+
+    def refresh(self, event_ids):
+        """
+        Recompute the signatures of the given hearings from their current
+        dates and participants.
+        """
+        event_ids = list(event_ids)
+
+        if not event_ids:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                COMMITTEE_SIGNATURES_SQL.format(where='WHERE event.id = ANY(%(event_ids)s)'),
+                {'event_ids': event_ids}
+            )
+
+        # Hearings without participants have no signature
+        self.get_queryset().filter(event_id__in=event_ids) \
+            .exclude(event__participants__isnull=False).delete()
+
+    def rebuild(self):
+        with transaction.atomic():
+            self.get_queryset().delete()
+
+            with connection.cursor() as cursor:
+                cursor.execute(COMMITTEE_SIGNATURES_SQL.format(where=''))
+
+
+class EventCommitteeSignature(models.Model):
+    """
+    Used in the import_data management command, not the frontend app.
+
+    The date of each hearing with participants, and the sorted ids of the
+    organizations taking part, so that spreadsheet rows can be matched to
+    hearings by date and committees with an indexed lookup. The signature is
+    null if any participant isn't an organization, so those hearings never
+    match. Signals keep this up to date as hearings and participants change.
+    """
+    event = models.OneToOneField(Event,
+                                 primary_key=True,
+                                 related_name='committee_signature',
+                                 on_delete=models.CASCADE)
+    start_date = models.CharField(max_length=25)
+    signature = models.TextField(null=True)
+
+    objects = EventCommitteeSignatureManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date', 'signature']),
+        ]
+
+
+SEARCH_DOCUMENTS_SQL = '''
+    INSERT INTO committeeoversightapp_hearingsearchdocument
+      (event_id, search_vector)
+    SELECT event.id,
+           setweight(to_tsvector('simple', event.name), 'A')
+           || setweight(to_tsvector('simple', COALESCE(string_agg(participant.name, ' '), '')), 'B')
+           || setweight(to_tsvector('simple', COALESCE(string_agg(details.organization, ' '), '')), 'C')
+    FROM opencivicdata_event AS event
+    LEFT JOIN opencivicdata_eventparticipant AS participant
+    ON participant.event_id = event.id
+    LEFT JOIN committeeoversightapp_witnessdetails AS details
+    ON details.witness_id = participant.id
+    {where}
+    GROUP BY event.id, event.name
+    ON CONFLICT (event_id) DO UPDATE
+    SET search_vector = EXCLUDED.search_vector
+'''
+
+
+class PrefixSearchQuery(SearchQuery):
+    """
+    A search query that matches words starting with each term in value, so
+    that results can update as a search is typed.
+    """
+    def __init__(self, value, **kwargs):
+        self.terms = re.findall(r'\w+', value)
+        super().__init__(' & '.join(term + ':*' for term in self.terms), **kwargs)
+
+    def as_sql(self, compiler, connection):
+        sql, params = super().as_sql(compiler, connection)
+        return sql.replace('plainto_tsquery', 'to_tsquery'), params
+
+
+class HearingSearchDocumentManager(models.Manager):
+    def refresh(self, event_ids):
+        """Reindex the given hearings from their current names and participants."""
+        event_ids = list(event_ids)
+
+        if not event_ids:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SEARCH_DOCUMENTS_SQL.format(where='WHERE event.id = ANY(%(event_ids)s)'),
+                {'event_ids': event_ids}
+            )
+
+    def rebuild(self):
+        with transaction.atomic():
+            self.get_queryset().delete()
+
+            with connection.cursor() as cursor:
+                cursor.execute(SEARCH_DOCUMENTS_SQL.format(where=''))
+
+    def search_events(self, events, text):
+        """
+        Filter a queryset of hearings to those matching every word in text,
+        or a word starting with it, annotated with a search_rank.
+        """
+        query = PrefixSearchQuery(text, config='simple')
+
+        if not query.terms:
+            return events.none()
+
+        return events.filter(search_document__search_vector=query).annotate(
+            search_rank=SearchRank(F('search_document__search_vector'), query)
+        )
+
+
+class HearingSearchDocument(models.Model):
+    """
+    The words to search each hearing by: its name, then the names of its
+    committees and witnesses, then its witnesses' organizations, weighted in
+    that order. Signals keep this up to date as hearings, participants and
+    witness details are saved.
+    """
+    event = models.OneToOneField(Event,
+                                 primary_key=True,
+                                 related_name='search_document',
+                                 on_delete=models.CASCADE)
+    search_vector = SearchVectorField()
+
+    objects = HearingSearchDocumentManager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector']),
+        ]
+
+
+COMMITTEE_HEARINGS_SQL = '''
+    INSERT INTO committeeoversightapp_committeehearing
+      (committee_id, event_id, start_date)
+    SELECT DISTINCT committee.id, event.id, event.start_date
+    FROM opencivicdata_event AS event
+    JOIN opencivicdata_eventparticipant AS participant
+    ON participant.event_id = event.id
+    JOIN opencivicdata_organization AS organization
+    ON organization.id = participant.organization_id
+    JOIN opencivicdata_organization AS committee
+    ON committee.id IN (organization.id, organization.parent_id)
+    {where}
+    ON CONFLICT (committee_id, event_id) DO UPDATE
+    SET start_date = EXCLUDED.start_date
+'''
+
+
+class CommitteeHearingManager(models.Manager):
+    def refresh(self, event_ids):
+        """
+        Recompute the committees of the given hearings from their current
+        dates and participants.
+        """
+        event_ids = list(event_ids)
+
+        if not event_ids:
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                '''DELETE FROM committeeoversightapp_committeehearing
+                   WHERE event_id = ANY(%(event_ids)s)''',
+                {'event_ids': event_ids}
+            )
+            cursor.execute(
+                COMMITTEE_HEARINGS_SQL.format(where='WHERE event.id = ANY(%(event_ids)s)'),
+                {'event_ids': event_ids}
+            )
+
+    def refresh_organization(self, organization_id):
+        """
+        Recompute the committees of the hearings an organization took part
+        in, e.g., when it moves to another parent.
+        """
+        self.refresh(EventParticipant.objects.filter(
+            organization_id=organization_id
+        ).values_list('event_id', flat=True).distinct())
+
+    def rebuild(self):
+        with transaction.atomic():
+            self.get_queryset().delete()
+
+            with connection.cursor() as cursor:
+                cursor.execute(COMMITTEE_HEARINGS_SQL.format(where=''))
+
+
+class CommitteeHearing(models.Model):
+    """
+    Each committee a hearing counts toward: the organizations taking part
+    and their parents, so that a committee's hearings, including those of
+    its subcommittees, are one indexed join away. The hearing's date is
+    copied here to count a committee's hearings by Congress from the index.
+    Signals keep this up to date as hearings, participants and
+    organizations change.
+    """
+    committee = models.ForeignKey(Organization,
+                                  related_name='committee_hearings',
+                                  on_delete=models.CASCADE)
+    event = models.ForeignKey(Event,
+                              related_name='committee_memberships',
+                              on_delete=models.CASCADE)
+    start_date = models.CharField(max_length=25)
+
+    objects = CommitteeHearingManager()
+
+    class Meta:
+        unique_together = ('committee', 'event')
+        indexes = [
+            models.Index(fields=['committee', 'start_date']),
+        ]
+
+
 class ResetMixin(object):
     """Deletes and reloads this model in load_cms_content command."""
     reset_on_load = True
@@ -638,34 +1310,26 @@ class CommitteeDetailPage(DetailPage):
 
     def get_context(self, request):
         context = super(CommitteeDetailPage, self).get_context(request)
-        context['latest_rating'] = context['page'].committee.latest_rating
-
-        congresses = context['page'].committee.ratings_by_congress_asc \
-            .values_list('congress_id', flat=True)
-        context['congresses'] = [x for x in congresses]
-
-        investigative_oversight_series = context['page'] \
-            .committee.ratings_by_congress_asc.values_list(
-            'investigative_oversight_hearings',
-            flat=True
+        context['ratings_version'] = \
+            get_cache_version(CommitteeScorecard.objects.version_name)
+
+        # Score every Congress from one query, rather than querying the
+        # ratings again for each series and aggregate
+        ratings = list(
+            context['page'].committee.committeerating_set.select_related('congress')
+            .order_by('congress__id')
         )
-        context['investigative_oversight_series'] = [x for x in \
-            investigative_oversight_series]
+        scorecards = CommitteeScorecard.objects.build(ratings)
 
-        policy_legislative_series = context['page'].committee \
-            .ratings_by_congress_asc.values_list(
-            'policy_legislative_hearings',
-            flat=True
-        )
-        context['policy_legislative_series'] = [x for x in \
-            policy_legislative_series]
+        context['ratings'] = scorecards
+        context['latest_rating'] = scorecards[-1] if scorecards else None
 
-        total_series = context['page'].committee.ratings_by_congress_asc \
-            .values_list(
-            'total_hearings',
-            flat=True
-        )
-        context['total_series'] = [x for x in total_series]
+        context['congresses'] = [s.congress_id for s in scorecards]
+        context['investigative_oversight_series'] = \
+            [s.investigative_oversight_hearings for s in scorecards]
+        context['policy_legislative_series'] = \
+            [s.policy_legislative_hearings for s in scorecards]
+        context['total_series'] = [s.total_hearings for s in scorecards]
 
         return context
 
@@ -0,0 +1,131 @@
+import logging
+import os
+import re
+import time
+import traceback
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+THIS_FILE = os.path.abspath(__file__)
+
+
+def get_signature(sql):
+    """
+    The shape of a query, without the length of its IN lists, so that the
+    same query run for different rows has the same signature.
+    """
+    return re.sub(r'\((?:%s, )+%s\)', '(%s, ...)', sql)
+
+
+def get_call_site():
+    """
+    The innermost line of this project's code on the stack, e.g., the view
+    or template tag that ran a query from deep inside the ORM.
+    """
+    for frame in reversed(traceback.extract_stack()):
+        path = os.path.abspath(frame.filename)
+
+        if path.startswith(settings.BASE_DIR) \
+                and path != THIS_FILE \
+                and 'site-packages' not in path:
+            return '{}:{} in {}'.format(
+                os.path.relpath(path, settings.BASE_DIR),
+                frame.lineno,
+                frame.name
+            )
+
+    return 'unknown'
+
+
+class QueryLog(object):
+    """
+    Record the queries run on this thread's connection while the log is
+    open: how many, how long they took, which were run repeatedly with
+    different parameters (a sign of a query per row) and where they were
+    run from.
+
+        with QueryLog() as log:
+            ...
+
+        print(log.report())
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0
+        self.signatures = Counter()
+        self.call_sites = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+            self.signatures[get_signature(sql)] += 1
+            self.call_sites[get_call_site()] += 1
+
+    def __enter__(self):
+        self.wrapper = connection.execute_wrapper(self)
+        self.wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.wrapper.__exit__(*exc_info)
+
+    def duplicates(self):
+        return [(signature, count)
+                for signature, count in self.signatures.most_common()
+                if count > 1]
+
+    def report(self, top=5):
+        lines = ['{} queries in {:.1f} ms'.format(self.count, self.seconds * 1000)]
+
+        duplicates = self.duplicates()[:top]
+        if duplicates:
+            lines.append('Repeated queries:')
+            lines += ['  {} x {}'.format(count, signature[:300])
+                      for signature, count in duplicates]
+
+        if self.call_sites:
+            lines.append('Call sites:')
+            lines += ['  {} x {}'.format(count, call_site)
+                      for call_site, count in self.call_sites.most_common(top)]
+
+        return '\n'.join(lines)
+
+
+class QueryLogMiddleware(object):
+    """
+    Log the queries run by each request, and report their count and time in
+    the X-Query-Count and Server-Timing response headers. Only used if the
+    QUERY_LOG setting is on.
+
+    Responses served by the cache middleware run no queries, so put this
+    first in MIDDLEWARE to keep the headers out of cached responses.
+    """
+    def __init__(self, get_response):
+        if not settings.QUERY_LOG:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryLog() as log:
+            response = self.get_response(request)
+
+        logger.info('%s %s: %s', request.method, request.get_full_path(), log.report())
+
+        response['X-Query-Count'] = log.count
+        response['Server-Timing'] = 'db;dur={:.1f};desc="{} queries"'.format(
+            log.seconds * 1000,
+            log.count
+        )
+
+        return response
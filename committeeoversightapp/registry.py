@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import namedtuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .cache import get_cache_version, set_cache_version
+
+# Everything the registry loads, replaced as a whole, so that a thread
+# reading one snapshot never sees another thread's half-built one
+RegistrySnapshot = namedtuple('RegistrySnapshot', [
+    'organizations',
+    'permanent_ids',
+    'detail_pages',
+])
+
+class CommitteeRegistry(object):
+    """
+    Process-local store of the committee metadata that templates look up over
+    and over: committee names and parents, permanent committee membership,
+    and the display name, chair and hide_rating settings from each committee's
+    detail page. Everything is loaded in one go on first use and served from
+    memory until it is invalidated.
+
+    invalidate() clears this process's copy and, once the transaction
+    commits, bumps a version number in the shared cache, which other
+    processes check every COMMITTEE_REGISTRY_CHECK_INTERVAL seconds.
+    """
+    version_name = 'committee_registry'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    @property
+    def check_interval(self):
+        return getattr(settings, 'COMMITTEE_REGISTRY_CHECK_INTERVAL', 60)
+
+    def clear(self):
+        self.snapshot = None
+        self.version = None
+        self.checked_at = 0
+
+    def invalidate(self):
+        with self.lock:
+            self.clear()
+
+        # Once the change is visible to other processes, so that they don't
+        # reload the old committees under the new version
+        transaction.on_commit(lambda: set_cache_version(self.version_name))
+
+    def load(self):
+        CommitteeOrganization = apps.get_model('committeeoversightapp', 'CommitteeOrganization')
+        CommitteeDetailPage = apps.get_model('committeeoversightapp', 'CommitteeDetailPage')
+
+        organizations = {
+            organization.id: organization for organization in
+            CommitteeOrganization.objects.filter(
+                Q(classification='committee') | Q(name__in=settings.CHAMBERS)
+            )
+        }
+
+        permanent_ids = {
+            organization.id for organization in organizations.values()
+            if organization.classification == 'committee'
+            and organization.name in settings.CURRENT_PERMANENT_COMMITTEES
+        }
+
+        detail_pages = {
+            page['committee_id']: page for page in
+            CommitteeDetailPage.objects.filter(committee__isnull=False).values(
+                'committee_id',
+                'display_name',
+                'chair',
+                'hide_rating'
+            )
+        }
+
+        return RegistrySnapshot(organizations, permanent_ids, detail_pages)
+
+    def ensure_loaded(self):
+        """
+        Return the current snapshot, loading it first if it was cleared or
+        another process has invalidated it.
+        """
+        now = time.time()
+
+        with self.lock:
+            if now - self.checked_at >= self.check_interval:
+                version = get_cache_version(self.version_name)
+                if version != self.version:
+                    self.snapshot = None
+                self.version = version
+                self.checked_at = now
+
+            if self.snapshot is None:
+                self.snapshot = self.load()
+
+            return self.snapshot
+
+    def organization(self, organization_id):
+        """
+        Return the registry's copy of a committee or chamber, or None if it
+        isn't one. Treat the returned object as read-only; it is shared.
+        """
+        return self.ensure_loaded().organizations.get(organization_id)
+
+    def is_permanent(self, organization_id):
+        return organization_id in self.ensure_loaded().permanent_ids
+
+    def detail_page(self, organization_id):
+        """
+        Return a dict of display_name, chair and hide_rating from the
+        committee's detail page, or None if it doesn't have one.
+        """
+        return self.ensure_loaded().detail_pages.get(organization_id)
+
+
+committee_registry = CommitteeRegistry()
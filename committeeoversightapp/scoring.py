@@ -0,0 +1,137 @@
+import numpy as np
+
+from .model_utils import GRADE_THRESHOLDS, RATING_COLORS
+
+HEARING_TYPES = (
+    'investigative_oversight_hearings',
+    'policy_legislative_hearings',
+    'total_hearings',
+)
+
+# Lowest score first, for np.searchsorted
+GRADE_CUTOFFS = np.array([threshold for threshold, _ in reversed(GRADE_THRESHOLDS)])
+GRADES = np.array([grade for _, grade in reversed(GRADE_THRESHOLDS)], dtype=object)
+CSS_CLASSES = np.array([RATING_COLORS[grade] for grade in GRADES], dtype=object)
+
+
+def percent_of(values, references, normalizer):
+    '''
+    round(value / reference * 100 * normalizer), or 0 where the reference
+    is 0, element-wise.
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percents = values / references * 100 * normalizer
+
+    return np.where(references == 0, 0, np.rint(percents))
+
+
+def round_1(values):
+    # Python's round() works from the shortest repr of each float, which
+    # np.round() doesn't, so use it to match the CommitteeRating properties
+    return np.array([round(value, 1) for value in values.flat]).reshape(values.shape)
+
+
+class RatingScores(object):
+    '''
+    Scores for every committee and Congress in a set of CommitteeRating
+    rows, computed together from (committee x Congress) arrays instead of
+    through the per-rating properties, which aggregate over a committee's
+    ratings each time they're called.
+
+    Rows are committees in committee_ids order and columns are Congresses
+    in congresses order. present marks the cells that have a rating; the
+    other cells hold NaN or 0 and should be ignored.
+
+    The scores are the same as CommitteeRating.chp_score, chp_grade,
+    css_class and the _percent_max and _percent_avg properties.
+    '''
+    def __init__(self, ratings):
+        ratings = list(ratings)
+
+        self.committee_ids = sorted({rating.committee_id for rating in ratings})
+        congresses = {rating.congress_id: rating.congress for rating in ratings}
+        self.congresses = [congresses[id] for id in sorted(congresses)]
+
+        rows = {id: row for row, id in enumerate(self.committee_ids)}
+        columns = {congress.id: column for column, congress in enumerate(self.congresses)}
+        shape = (len(self.committee_ids), len(self.congresses))
+
+        self.present = np.zeros(shape, dtype=bool)
+        self.chp_points = np.full(shape, np.nan)
+        self.hearings = {
+            hearing_type: np.full(shape, np.nan) for hearing_type in HEARING_TYPES
+        }
+
+        for rating in ratings:
+            cell = (rows[rating.committee_id], columns[rating.congress_id])
+            self.present[cell] = True
+
+            if rating.chp_points is not None:
+                self.chp_points[cell] = rating.chp_points
+
+            for hearing_type in HEARING_TYPES:
+                value = getattr(rating, hearing_type)
+                if value is not None:
+                    self.hearings[hearing_type][cell] = value
+
+        self.normalizer = np.array([c.normalizer for c in self.congresses])
+        self.is_current = np.array([c.is_current for c in self.congresses], dtype=bool)
+        self.percent_passed = np.array(
+            [c.percent_passed if c.is_current else 1 for c in self.congresses],
+            dtype=float
+        )
+
+        self.score()
+
+    def score(self):
+        # Committee-level maxima and averages, ignoring missing ratings
+        self.max_chp_points = np.fmax.reduce(self.chp_points, axis=1)
+        self.hearings_max = {}
+        self.hearings_avg = {}
+
+        for hearing_type, values in self.hearings.items():
+            counts = np.sum(~np.isnan(values), axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                averages = np.nansum(values, axis=1) / counts
+
+            self.hearings_max[hearing_type] = np.fmax.reduce(values, axis=1)
+            self.hearings_avg[hearing_type] = round_1(averages)
+
+        # This ratings methodology was designed by the Lugar Center. Scores
+        # for the current Congress are projected to its end.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = self.chp_points / self.max_chp_points[:, None] * 100 \
+                * self.normalizer
+            projected = scores / self.percent_passed * 100
+
+        scores = np.where(self.is_current, projected, scores)
+        scores = np.where(
+            (self.max_chp_points[:, None] == 0)
+            | (self.is_current & (self.percent_passed == 0)),
+            0,
+            np.rint(scores)
+        )
+        self.chp_score = np.nan_to_num(scores).astype(int)
+
+        grade_index = np.searchsorted(GRADE_CUTOFFS, self.chp_score, side='right') - 1
+        self.chp_grade = np.where(grade_index >= 0, GRADES[grade_index], 'C')
+        self.css_class = np.where(grade_index >= 0, CSS_CLASSES[grade_index], 'c-rating')
+
+        self.percent_max = {}
+        self.percent_avg = {}
+
+        for hearing_type, values in self.hearings.items():
+            percent_max = percent_of(
+                values,
+                self.hearings_max[hearing_type][:, None],
+                self.normalizer
+            )
+            self.percent_max[hearing_type] = \
+                np.nan_to_num(np.minimum(percent_max, 100)).astype(int)
+
+            percent_avg = percent_of(
+                values,
+                self.hearings_avg[hearing_type][:, None],
+                self.normalizer
+            )
+            self.percent_avg[hearing_type] = np.nan_to_num(percent_avg).astype(int)
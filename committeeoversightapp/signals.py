@@ -0,0 +1,196 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, \
+                                     post_delete
+from django.db import transaction
+from django.dispatch import receiver
+
+from wagtail.core.signals import page_published, page_unpublished
+
+from opencivicdata.core.models import Organization
+from opencivicdata.legislative.models import Event, EventParticipant
+
+from .models import HearingEvent, HearingCategory, StaleCommitteeRating, \
+                    EventCommitteeSignature, HearingSearchDocument, \
+                    CommitteeHearing, CommitteeScorecard, Congress, \
+                    WitnessDetails, \
+                    CommitteeOrganization, CommitteeDetailPage, LandingPage, \
+                    CompareCurrentCommitteesPage, \
+                    CompareCommitteesOverCongressesPage
+from .registry import committee_registry
+from .cache import purge_pages
+
+
+@receiver(pre_save, sender=Event)
+@receiver(pre_save, sender=HearingEvent)
+def remember_start_date(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._original_start_date = None
+    else:
+        instance._original_start_date = sender.objects.filter(
+            id=instance.id
+        ).values_list('start_date', flat=True).first()
+
+
+def start_date_changed(instance):
+    # Views may assign a date, which is saved as the same string
+    original_start_date = getattr(instance, '_original_start_date', None)
+    return str(original_start_date) != str(instance.start_date)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=HearingEvent)
+def mark_moved_hearing(sender, instance, created, **kwargs):
+    # A new hearing has no participants yet; they flag their own ratings
+    original_start_date = getattr(instance, '_original_start_date', None)
+
+    if not created and start_date_changed(instance):
+        StaleCommitteeRating.objects.mark_event(instance.id, original_start_date)
+        StaleCommitteeRating.objects.mark_event(instance.id, instance.start_date)
+
+
+@receiver(pre_delete, sender=Event)
+@receiver(pre_delete, sender=HearingEvent)
+def mark_deleted_hearing(sender, instance, **kwargs):
+    StaleCommitteeRating.objects.mark_event(instance.id, instance.start_date)
+
+
+@receiver(post_save, sender=EventParticipant)
+@receiver(pre_delete, sender=EventParticipant)
+def mark_participant(sender, instance, **kwargs):
+    start_date = Event.objects.filter(id=instance.event_id) \
+        .values_list('start_date', flat=True).first()
+
+    StaleCommitteeRating.objects.mark(start_date, [instance.organization_id])
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=HearingEvent)
+def refresh_moved_signature(sender, instance, created, **kwargs):
+    if not created and start_date_changed(instance):
+        EventCommitteeSignature.objects.refresh([instance.id])
+
+
+@receiver(post_save, sender=EventParticipant)
+@receiver(post_delete, sender=EventParticipant)
+def refresh_participant_signature(sender, instance, **kwargs):
+    EventCommitteeSignature.objects.refresh([instance.event_id])
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=HearingEvent)
+def refresh_moved_committee_hearings(sender, instance, created, **kwargs):
+    if not created and start_date_changed(instance):
+        CommitteeHearing.objects.refresh([instance.id])
+
+
+@receiver(post_save, sender=EventParticipant)
+@receiver(post_delete, sender=EventParticipant)
+def refresh_participant_committee_hearings(sender, instance, **kwargs):
+    CommitteeHearing.objects.refresh([instance.event_id])
+
+
+@receiver(pre_save, sender=Organization)
+@receiver(pre_save, sender=CommitteeOrganization)
+def remember_parent(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._original_parent_id = None
+    else:
+        instance._original_parent_id = sender.objects.filter(
+            id=instance.id
+        ).values_list('parent_id', flat=True).first()
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_save, sender=CommitteeOrganization)
+def refresh_moved_organization(sender, instance, created, **kwargs):
+    # Hearings count toward the parent of each organization taking part
+    original_parent_id = getattr(instance, '_original_parent_id', None)
+
+    if not created and original_parent_id != instance.parent_id:
+        CommitteeHearing.objects.refresh_organization(instance.id)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=HearingEvent)
+@receiver(post_save, sender=EventParticipant)
+@receiver(post_save, sender=WitnessDetails)
+def refresh_search_document(sender, instance, **kwargs):
+    HearingSearchDocument.objects.refresh([get_event_id(instance)])
+
+
+@receiver(post_delete, sender=EventParticipant)
+@receiver(post_delete, sender=WitnessDetails)
+def refresh_deleted_search_document(sender, instance, **kwargs):
+    # Participants are also deleted along with their hearing, so wait until
+    # the hearing is gone, rather than index it again as it's being deleted
+    event_id = get_event_id(instance)
+    transaction.on_commit(
+        lambda: HearingSearchDocument.objects.refresh([event_id])
+    )
+
+
+def get_event_id(instance):
+    if isinstance(instance, WitnessDetails):
+        return EventParticipant.objects.filter(id=instance.witness_id) \
+            .values_list('event_id', flat=True).first()
+    elif isinstance(instance, EventParticipant):
+        return instance.event_id
+    else:
+        return instance.id
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=HearingEvent)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=HearingEvent)
+@receiver(post_save, sender=EventParticipant)
+@receiver(post_delete, sender=EventParticipant)
+@receiver(post_save, sender=WitnessDetails)
+@receiver(post_delete, sender=WitnessDetails)
+@receiver(post_save, sender=HearingCategory)
+@receiver(post_delete, sender=HearingCategory)
+def invalidate_hearing_list(sender, **kwargs):
+    # Once the change is visible to other requests, so that they don't cache
+    # counts from before it under the new version
+    transaction.on_commit(HearingEvent.objects.invalidate)
+
+
+@receiver(post_save, sender=HearingCategory)
+@receiver(pre_delete, sender=HearingCategory)
+def mark_category(sender, instance, **kwargs):
+    if instance.event_id:
+        StaleCommitteeRating.objects.mark_event(instance.event_id)
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_save, sender=CommitteeOrganization)
+@receiver(post_delete, sender=Organization)
+@receiver(post_delete, sender=CommitteeOrganization)
+@receiver(post_save, sender=CommitteeDetailPage)
+@receiver(post_delete, sender=CommitteeDetailPage)
+def invalidate_committee_registry(sender, **kwargs):
+    # CommitteeDetailPage is saved when it is published
+    committee_registry.invalidate()
+
+
+@receiver(post_save, sender=Congress)
+@receiver(post_delete, sender=Congress)
+def invalidate_rating_tables(sender, **kwargs):
+    # The rating tables show each Congress's label and footnote, which can be
+    # edited without rebuilding the scorecards
+    transaction.on_commit(CommitteeScorecard.objects.invalidate)
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def purge_published_page(sender, instance, **kwargs):
+    pages = [instance]
+
+    # Committee names, chairs and hidden ratings also appear on the pages
+    # listing every committee
+    if isinstance(instance, CommitteeDetailPage):
+        for page_model in (LandingPage,
+                           CompareCurrentCommitteesPage,
+                           CompareCommitteesOverCongressesPage):
+            pages += page_model.objects.live()
+
+    purge_pages(pages)
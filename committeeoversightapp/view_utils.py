@@ -1,15 +1,25 @@
-import requests
+import time
 from os.path import splitext
 from urllib.parse import urlparse
 
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import transaction
 
 from opencivicdata.legislative.models import EventDocument, \
                                              EventDocumentLink, \
-                                             EventParticipant
-from opencivicdata.core.models import Organization
+                                             EventParticipant, \
+                                             EventSource
 
-from .models import WitnessDetails, HearingCategory
+from .models import WitnessDetails, HearingCategory, ArchiveJob, \
+                    EventCommitteeSignature, HearingSearchDocument, \
+                    StaleCommitteeRating, CommitteeHearing
+from .query_log import QueryLog
+
+HEARING_DOCUMENTS = [
+    ('transcript_url', "transcript"),
+    ('opening_statement_chair', "chair opening statement"),
+    ('opening_statement_rm', "ranking member opening statement")
+]
 
 
 def get_ext(url):
@@ -20,18 +30,14 @@ def get_ext(url):
     return ext
 
 
-def archive_url(url):
-    wayback_host = 'http://web.archive.org'
-    save_url = '{0}/save/{1}'.format(wayback_host, url)
-    archived = requests.get(save_url)
-    try:
-        archive_url = '{0}{1}'.format(
-            wayback_host,
-            archived.headers['Content-Location']
-        )
-        return archive_url
-    except KeyError:
-        return None
+def get_media_type(url):
+    extensions = {
+        '.pdf': 'application/pdf',
+        '.htm': 'text/html',
+        '.html': 'text/html'
+        }
+    ext = get_ext(url)
+    return extensions.get(ext.lower(), '')
 
 
 def save_document(url, note, event):
@@ -41,31 +47,15 @@ def save_document(url, note, event):
         new_document = EventDocument(note=note, event=event)
         new_document.save()
 
-        archived_url = archive_url(url)
-
-        extensions = {
-            '.pdf': 'application/pdf',
-            '.htm': 'text/html',
-            '.html': 'text/html'
-            }
-        ext = get_ext(url)
-        media_type = extensions.get(ext.lower(), '')
-
         new_document_link = EventDocumentLink(
             url=url,
             document=new_document,
-            media_type=media_type,
+            media_type=get_media_type(url),
         )
         new_document_link.save()
 
-        if archived_url:
-            new_archived_document_link = EventDocumentLink(
-                url=archived_url,
-                document=new_document,
-                media_type=media_type,
-                text="archived"
-            )
-            new_archived_document_link.save()
+        # archive_documents adds the archived link once there's a snapshot
+        ArchiveJob.objects.enqueue(new_document_link)
 
         return new_document
 
@@ -145,35 +135,279 @@ def save_witnesses(event, witnesses):
             new_witness_details.save()
 
 
-def save_documents(event, transcript_data):
-    """Create EventDocument with original and archived url."""
-    documents = [
-        ('transcript_url', "transcript"),
-        ('opening_statement_chair', "chair opening statement"),
-        ('opening_statement_rm', "ranking member opening statement")
-    ]
-
-    for (field, note) in documents:
-        url = transcript_data[field]
-        save_document(url, note, event)
-
-
 def save_category(event, category):
     if category is not None:
         new_category = HearingCategory(event=event, category=category)
         new_category.save()
 
 
+def get_document_url(document):
+    """Return the URL a document was saved with, rather than its archive."""
+    if document is None:
+        return None
+
+    link = document.links.exclude(text='archived').first()
+    return link.url if link else None
+
+
+def update_document(document, url, note, event):
+    """
+    Replace a saved document if its URL has changed, and return the
+    document now saved for url. Unchanged documents keep their archived
+    links.
+    """
+    if get_document_url(document) == (url or None):
+        return document
+
+    if document is not None:
+        document.delete()
+
+    return save_document(url or '', note, event)
+
+
+def update_documents(event, transcript_data):
+    """
+    Save the transcript and opening statements that have changed. Returns
+    whether any had.
+    """
+    saved_documents = EventDocument.objects.filter(event=event)
+    changed = False
+
+    for (field, note) in HEARING_DOCUMENTS:
+        matches = list(saved_documents.filter(note=note))
+        url = transcript_data[field]
+
+        # Earlier edits could leave more than one document per note
+        for extra in matches[1:]:
+            extra.delete()
+            changed = True
+
+        document = matches[0] if matches else None
+        if update_document(document, url, note, event) != document:
+            changed = True
+
+    return changed
+
+
+def update_witnesses(event, witnesses):
+    """
+    Match submitted witnesses to saved witnesses by name, updating the
+    details and statements that have changed, then add new witnesses and
+    delete the ones that were removed. Returns whether anything changed.
+    """
+    changed = False
+    saved_witnesses = {}
+    for witness in EventParticipant.objects.filter(event=event, note='witness'):
+        saved_witnesses.setdefault(witness.name, []).append(witness)
+
+    new_witnesses = []
+
+    for witness in witnesses:
+        name = witness.get('name', None)
+        if not name:
+            continue
+
+        try:
+            saved_witness = saved_witnesses[name].pop(0)
+        except (KeyError, IndexError):
+            new_witnesses.append(witness)
+            continue
+
+        details = saved_witness.witnessdetails_set.first()
+        if details is None:
+            details = WitnessDetails(witness=saved_witness)
+
+        old_document = details.document
+        url = witness.get('url', None)
+        if get_document_url(old_document) != (url or None):
+            details.document = save_document(url or '', "witness statement", event)
+
+        organization = witness.get('organization', None)
+        retired = witness.get('retired', False)
+
+        if details.pk is None \
+                or details.document != old_document \
+                or details.organization != organization \
+                or details.retired != retired:
+            details.organization = organization
+            details.retired = retired
+            details.save()
+            changed = True
+
+        # Deleting a statement deletes the details that point to it, so
+        # only delete the old one once the details point elsewhere
+        if old_document is not None and details.document != old_document:
+            old_document.delete()
+
+    for removed_witnesses in saved_witnesses.values():
+        for witness in removed_witnesses:
+            for details in witness.witnessdetails_set.all():
+                if details.document:
+                    details.document.delete()
+            witness.delete()
+            changed = True
+
+    save_witnesses(event, new_witnesses)
+
+    return changed or bool(new_witnesses)
+
+
+def update_category(event, category):
+    """
+    Replace the hearing's category if it has changed, and return whether it
+    had.
+    """
+    saved_categories = list(
+        HearingCategory.objects.filter(event=event).values_list('category_id', flat=True)
+    )
+    submitted_categories = [category.id] if category is not None else []
+
+    if saved_categories == submitted_categories:
+        return False
+
+    HearingCategory.objects.filter(event=event).delete()
+    save_category(event, category)
+
+    return True
+
+
+def update_committees(event, committees):
+    """
+    Add and remove committees so they match the submitted ones, and return
+    whether any were.
+    """
+    submitted_ids = {committee.id for committee in committees}
+
+    saved_committees = EventParticipant.objects.filter(event=event,
+                                                       entity_type='organization')
+    saved_ids = set(saved_committees.values_list('organization_id', flat=True))
+
+    # Also deletes participants without an organization
+    deleted, _ = saved_committees.exclude(organization_id__in=submitted_ids).delete()
+
+    new_committees = [committee for committee in committees
+                      if committee.id not in saved_ids]
+    save_committees(event, new_committees)
+
+    return bool(deleted or new_committees)
+
+
 def save_committees(event, committees):
     """Find and create committees as EventParticipants."""
     for committee in committees:
         name = committee.name
-        organization = Organization.objects.get(id=committee.id)
         entity_type = "organization"
         new_committee = EventParticipant(
             name=name,
             event=event,
-            organization=organization,
+            organization=committee,
             entity_type=entity_type
         )
         new_committee.save()
+
+
+def validate(obj, fields):
+    """Validate the given fields of an unsaved object."""
+    obj.clean_fields(exclude=[field.name for field in obj._meta.fields
+                              if field.name not in fields])
+
+
+def create_hearing(event, committees, category, transcript_data, witnesses):
+    """
+    Save a new hearing from the hearing form's cleaned data. Every row is
+    built and validated before anything is written, raising ValidationError
+    if any is invalid, then written in one transaction with one insert per
+    table. Committees are the organizations the form already looked up.
+
+    Returns timing metrics: seconds spent building and writing the rows,
+    and the number of queries run.
+    """
+    start = time.perf_counter()
+
+    participants = [
+        EventParticipant(name=committee.name,
+                         event=event,
+                         organization=committee,
+                         entity_type="organization")
+        for committee in committees
+    ]
+    documents = []
+    links = []
+    witness_details = []
+
+    def add_document(url, note):
+        if not url or url.isspace():
+            return None
+
+        document = EventDocument(note=note, event=event)
+        documents.append(document)
+        links.append(EventDocumentLink(url=url,
+                                       document=document,
+                                       media_type=get_media_type(url)))
+        return document
+
+    for (field, note) in HEARING_DOCUMENTS:
+        add_document(transcript_data[field], note)
+
+    for witness in witnesses:
+        name = witness.get('name', None)
+        if name:
+            new_witness = EventParticipant(name=name,
+                                           event=event,
+                                           entity_type="person",
+                                           note="witness")
+            participants.append(new_witness)
+
+            witness_details.append(WitnessDetails(
+                witness=new_witness,
+                document=add_document(witness.get('url', None), "witness statement"),
+                organization=witness.get('organization', None),
+                retired=witness.get('retired', False)
+            ))
+
+    categories = []
+    if category is not None:
+        categories.append(HearingCategory(event=event, category=category))
+
+    errors = []
+    for obj, fields, label in \
+            [(participant, ['name'], participant.name) for participant in participants] \
+            + [(link, ['url'], link.url) for link in links] \
+            + [(details, ['organization'], details.witness.name) for details in witness_details]:
+        try:
+            validate(obj, fields)
+        except ValidationError as e:
+            errors += ['{}: {}'.format(label, message) for message in e.messages]
+
+    if errors:
+        raise ValidationError(errors)
+
+    built = time.perf_counter()
+
+    with QueryLog() as log, transaction.atomic():
+        event.save()
+
+        EventParticipant.objects.bulk_create(participants)
+        EventDocument.objects.bulk_create(documents)
+        EventDocumentLink.objects.bulk_create(links)
+        WitnessDetails.objects.bulk_create(witness_details)
+        HearingCategory.objects.bulk_create(categories)
+        EventSource.objects.create(event=event, note="web form")
+
+        # archive_documents adds the archived links once there are snapshots
+        ArchiveJob.objects.bulk_create([ArchiveJob(link=link) for link in links])
+
+        # Bulk inserts skip the signals that keep committee signatures,
+        # committee hearings and the search index up to date, and flag ratings to recompute
+        EventCommitteeSignature.objects.refresh([event.id])
+        CommitteeHearing.objects.refresh([event.id])
+        HearingSearchDocument.objects.refresh([event.id])
+        StaleCommitteeRating.objects.mark_events([event.id])
+
+    written = time.perf_counter()
+
+    return {
+        'build_seconds': built - start,
+        'write_seconds': written - built,
+        'queries': log.count,
+    }
@@ -1,12 +1,19 @@
+import os
+import hashlib
+import logging
+
 from django.urls import reverse_lazy
 from django.shortcuts import redirect
 from django.views.generic.edit import DeleteView
 from django.views.generic.detail import DetailView
 from django.views.generic import TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.utils.html import escape
 from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
 
 from opencivicdata.legislative.models import Event, EventParticipant, \
                         EventDocument, EventDocumentLink, EventSource
@@ -14,14 +21,18 @@ from opencivicdata.core.models import Organization
 
 from django_datatables_view.base_datatable_view import BaseDatatableView
 
-from .view_utils import get_document_context, save_witnesses, \
-                   save_documents, save_category, save_committees
+from .view_utils import get_document_context, create_hearing, \
+                   update_witnesses, update_documents, update_category, \
+                   update_committees
 from .models import HearingCategory, HearingCategoryType, WitnessDetails, \
-                    CommitteeOrganization, HearingEvent
+                    CommitteeOrganization, HearingEvent, HearingSearchDocument
+from .cache import get_cache_version
 from .forms import EventForm, CategoryForm, CommitteeForm, \
                    WitnessFormset, TranscriptForm, CategoryEditForm, \
                    CommitteeEditForm
 
+logger = logging.getLogger(__name__)
+
 
 class EventCreate(LoginRequiredMixin, TemplateView):
     template_name = "hearing_create.html"
@@ -53,17 +64,27 @@ class EventCreate(LoginRequiredMixin, TemplateView):
         if all(forms_valid):
             print("All forms valid! Saving...")
 
-            # save event
-            event = event_form.save()
-
-            save_committees(event, committee_form.cleaned_data['name'])
-            save_category(event, category_form.cleaned_data['category'])
-            save_documents(event, transcript_form.cleaned_data)
-            save_witnesses(event, witness_formset.cleaned_data)
-
-            # save event source
-            source = EventSource(event=event, note="web form")
-            source.save()
+            try:
+                metrics = create_hearing(event_form.save(commit=False),
+                                         committee_form.cleaned_data['name'],
+                                         category_form.cleaned_data['category'],
+                                         transcript_form.cleaned_data,
+                                         witness_formset.cleaned_data)
+            except ValidationError as e:
+                event_form.add_error(None, e)
+
+                context = self.get_context_data(**kwargs)
+                context.update({
+                    'event_form': event_form,
+                    'committee_form': committee_form,
+                    'category_form': category_form,
+                    'transcript_form': transcript_form,
+                    'witness_formset': witness_formset,
+                })
+                return self.render_to_response(context)
+
+            logger.info('Saved hearing in %.3fs with %d queries',
+                        metrics['write_seconds'], metrics['queries'])
 
         return redirect('/hearings')
 
@@ -72,6 +93,10 @@ class EventList(LoginRequiredMixin, TemplateView):
     template_name = 'hearing_list.html'
 
 
+# The order the hearing tables ask for when first drawn: column 0, descending
+DEFAULT_ORDER = ('-start_date',)
+
+
 class EventListJson(BaseDatatableView):
     """ Uses django-datatables-view for server-side DataTable processing."""
     model = HearingEvent
@@ -92,6 +117,9 @@ class EventListJson(BaseDatatableView):
     # requests
     max_display_length = 500
 
+    # counts and page bookmarks are also invalidated when hearings change
+    cache_timeout = 60 * 60
+
     def filter_queryset(self, qs):
         # for non-admin users, show only hearings from a set list of categories
         if not self.request.user.is_authenticated:
@@ -108,23 +136,150 @@ class EventListJson(BaseDatatableView):
         if detail_type == 'category':
             qs = qs.filter(hearingcategory__category_id=id)
         if detail_type == 'committee':
-            committee = CommitteeOrganization.objects.get(id=id)
-            qs = qs.filter(id__in=committee.hearings)
+            # hearings of the committee or any of its subcommittees
+            qs = qs.filter(committee_memberships__committee_id=id)
 
         # based on search example at
         # https://pypi.org/project/django-datatables-view/
         search = self.request.GET.get('search[value]', None)
         if search:
-            qs = qs.filter(name__icontains=search)
+            qs = HearingSearchDocument.objects.search_events(qs, search)
+
+        return qs
+
+    def ordering(self, qs):
+        qs = super().ordering(qs)
+        self.seek_order = None
+
+        # The tables list the newest hearings first by default. Searches list
+        # the best matches first instead, unless another column was chosen,
+        # in which case they break its ties.
+        if 'search_rank' in qs.query.annotations:
+            if qs.query.order_by == DEFAULT_ORDER:
+                qs = qs.order_by('-search_rank', *DEFAULT_ORDER, '-id')
+            else:
+                qs = qs.order_by(*qs.query.order_by, '-search_rank')
+
+        # Hearings ordered by date can be paged through by seeking past the
+        # last hearing on the previous page, with the id breaking ties
+        elif qs.query.order_by in (('start_date',), ('-start_date',)):
+            self.seek_order = qs.query.order_by[0]
+            tiebreak = '-id' if self.seek_order.startswith('-') else 'id'
+            qs = qs.order_by(self.seek_order, tiebreak)
 
         return qs
 
+    def paging(self, qs):
+        """
+        Page through hearings ordered by date with keyset pagination: each
+        page caches a bookmark of its last hearing, so that the next page
+        can seek past it instead of counting through an OFFSET. Pages
+        without a bookmark, e.g., when jumping ahead, fall back to OFFSET.
+        """
+        limit = min(int(self._querydict.get('length', 10)), self.max_display_length)
+        start = int(self._querydict.get('start', 0))
+
+        if self.pre_camel_case_notation or limit == -1 or not self.seek_order:
+            return super().paging(qs)
+
+        bookmark = caches['default'].get(self.get_cache_key('bookmark', self.seek_order, start))
+
+        if start == 0:
+            page = qs[:limit]
+        elif bookmark:
+            start_date, id = bookmark
+            if self.seek_order.startswith('-'):
+                seek = Q(start_date__lt=start_date) | Q(start_date=start_date, id__lt=id)
+            else:
+                seek = Q(start_date__gt=start_date) | Q(start_date=start_date, id__gt=id)
+            page = qs.filter(seek)[:limit]
+        else:
+            page = qs[start:start + limit]
+
+        page = list(page)
+
+        if len(page) == limit:
+            caches['default'].set(
+                self.get_cache_key('bookmark', self.seek_order, start + limit),
+                (page[-1].start_date, page[-1].id),
+                self.cache_timeout
+            )
+
+        return page
+
+    def get_cache_key(self, *parts, filtered=True):
+        """
+        Key cached counts and bookmarks on the filters in the request and
+        the version of the hearings, which changes when they're written.
+        Keys for the unfiltered hearings leave out the committee, category
+        and search, so that every page and search shares them.
+        """
+        filters = (self.request.user.is_authenticated,)
+
+        if filtered:
+            filters += (
+                self.request.GET.get('detail_type', None),
+                self.request.GET.get('id', None),
+                self.request.GET.get('search[value]', None),
+            )
+
+        filters += parts
+
+        return 'hearing_list:{}:{}'.format(
+            get_cache_version(HearingEvent.objects.version_name),
+            hashlib.md5(repr(filters).encode()).hexdigest()
+        )
+
+    def get_count(self, qs, name, filtered=True):
+        key = self.get_cache_key(name, filtered=filtered)
+        count = caches['default'].get(key)
+
+        if count is None:
+            count = qs.count()
+            caches['default'].set(key, count, self.cache_timeout)
+
+        return count
+
+    def get_context_data(self, *args, **kwargs):
+        """
+        DatatableMixin.get_context_data, with cached counts.
+        """
+        try:
+            self.initialize(*args, **kwargs)
+
+            if self.pre_camel_case_notation:
+                return super().get_context_data(*args, **kwargs)
+
+            self.columns_data = self.extract_datatables_column_data()
+            self._columns = self.get_columns()
+
+            qs = self.get_initial_queryset()
+            total_records = self.get_count(qs, 'total', filtered=False)
+
+            qs = self.filter_queryset(qs)
+            total_display_records = self.get_count(qs, 'filtered')
+
+            qs = self.ordering(qs)
+            qs = self.paging(qs)
+
+            return {
+                'draw': int(self._querydict.get('draw', 0)),
+                'recordsTotal': total_records,
+                'recordsFiltered': total_display_records,
+                'data': self.prepare_results(qs),
+            }
+        except Exception as e:
+            return self.handle_exception(e)
+
     def prepare_results(self, qs):
         json_data = []
         detail_string = "<a href=\"{0}\">{1}</a>"
         edit_string = "<a href=\"{}\"><i class=\"fas fa fa-pencil-alt\" id=\"edit-icon\"></i></a>"
         delete_string = "<a href=\"{}\"><i class=\"fas fa fa-times-circle\" id=\"delete-icon\"></i></a>"
 
+        qs = list(qs)
+        self.prefetch_rows(qs)
+
         for item in qs:
             row_data = [
                 item.start_date,
@@ -139,6 +294,37 @@ class EventListJson(BaseDatatableView):
 
         return json_data
 
+    def prefetch_rows(self, hearings):
+        """
+        Look up the committees and category of every hearing on the page in
+        a fixed number of queries, rather than several queries per row.
+        """
+        hearing_ids = [hearing.id for hearing in hearings]
+
+        participants = EventParticipant.objects.filter(
+            event_id__in=hearing_ids,
+            organization__isnull=False
+        ).values_list('event_id', 'organization_id')
+
+        committees = CommitteeOrganization.objects.in_bulk(
+            {organization_id for _, organization_id in participants}
+        )
+
+        self.committees_by_hearing = {}
+        for event_id, organization_id in participants:
+            self.committees_by_hearing.setdefault(event_id, []) \
+                .append(committees[organization_id])
+
+        categories = {
+            hearing_category.event_id: hearing_category.category
+            for hearing_category in HearingCategory.objects.filter(
+                event_id__in=hearing_ids
+            ).select_related('category')
+        }
+
+        for hearing in hearings:
+            hearing.category = categories.get(hearing.id)
+
     def get_hearing_title(self, detail_string, item):
         return detail_string.format(
             escape(reverse_lazy(
@@ -150,7 +336,7 @@ class EventListJson(BaseDatatableView):
 
     def get_committees(self, item):
         committees = set()
-        for committee in item.committees:
+        for committee in self.committees_by_hearing.get(item.id, []):
             committees.add(committee.get_linked_html_short)
 
         return ', '.join(committees)
@@ -275,28 +461,38 @@ class EventEdit(LoginRequiredMixin, TemplateView):
         if all(forms_valid):
             print("All forms valid! Saving...")
 
-            # update event
-            event = Event.objects.get(id=self.kwargs['pk'])
-            event.name = event_form.cleaned_data['name']
-            event.start_date = event_form.cleaned_data['start_date']
-            event.save()
-
-            # delete old event data
-            EventParticipant.objects.filter(event=event).delete()
-            EventDocument.objects.filter(event=event).delete()
-            EventDocumentLink.objects.filter(document__event=event).delete()
-            HearingCategory.objects.filter(event=event).delete()
-            WitnessDetails.objects.filter(witness_id__event=event).delete()
-
-            save_committees(event, committee_form.cleaned_data['name'])
-            save_category(event, category_form.cleaned_data['category'])
-            save_documents(event, transcript_form.cleaned_data)
-            save_witnesses(event, witness_formset.cleaned_data)
+            with transaction.atomic():
+                # update event
+                event = Event.objects.get(id=self.kwargs['pk'])
+                name = event_form.cleaned_data['name']
+                start_date = event_form.cleaned_data['start_date'].isoformat()
+
+                saved = (event.name, event.start_date) != (name, start_date)
+                if saved:
+                    event.name = name
+                    event.start_date = start_date
+                    event.save()
+
+                # only touch the rows that changed, so that unchanged
+                # documents keep their archived links
+                changed = [
+                    update_committees(event, committee_form.cleaned_data['name']),
+                    update_category(event, category_form.cleaned_data['category']),
+                    update_documents(event, transcript_form.cleaned_data),
+                    update_witnesses(event, witness_formset.cleaned_data),
+                ]
+
+                # The committees' last updated dates come from their
+                # hearings' updated_at
+                if any(changed) and not saved:
+                    event.save(update_fields=['updated_at'])
 
         return redirect('/hearings')
 
 
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.cache import never_cache
 
 def pong(request):
     try:
@@ -305,3 +501,19 @@ def pong(request):
         return HttpResponse('Bad deployment', status=401)
 
     return HttpResponse(DEPLOYMENT_ID)
+
+
+@never_cache
+@staff_member_required
+def cache_stats(request):
+    """Report cache hits and misses for the worker serving this request."""
+    cache = caches[settings.CACHE_MIDDLEWARE_ALIAS]
+
+    try:
+        stats = cache.stats()
+    except AttributeError:
+        stats = {}
+
+    stats['pid'] = os.getpid()
+
+    return JsonResponse(stats)
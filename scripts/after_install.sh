@@ -61,8 +61,10 @@ if [ "$DEPLOYMENT_GROUP_NAME" == "production" ]; then
   chown root.root /etc/cron.d/committee-oversight-crontasks
   sudo touch /tmp/committee-oversight-crontasks-backups.log
   sudo touch /tmp/committee-oversight-crontasks-ratings.log
+  sudo touch /tmp/committee-oversight-crontasks-archive.log
   sudo chown datamade.www-data /tmp/committee-oversight-crontasks-backups.log
   sudo chown datamade.www-data /tmp/committee-oversight-crontasks-ratings.log
+  sudo chown datamade.www-data /tmp/committee-oversight-crontasks-archive.log
   chmod 644 /etc/cron.d/committee-oversight-crontasks
 fi
 
@@ -1,8 +1,21 @@
+from contextlib import contextmanager
+from datetime import date
+
 import pytest
 
-from committeeoversightapp.models import HearingCategory
-from opencivicdata.legislative.models import Event
-from opencivicdata.core.models import Jurisdiction, Division
+from committeeoversightapp.registry import committee_registry
+from committeeoversightapp.query_log import QueryLog
+from committeeoversightapp.models import HearingCategory, Congress, \
+                                         CommitteeOrganization, CommitteeRating, \
+                                         HearingCategoryType
+from opencivicdata.legislative.models import Event, EventParticipant
+from opencivicdata.core.models import Jurisdiction, Division, Organization
+
+
+@pytest.fixture(autouse=True)
+def clear_committee_registry():
+    # The registry outlives each test's database transaction
+    committee_registry.clear()
 
 
 @pytest.fixture
@@ -26,6 +39,27 @@ def jurisdiction(division):
 
     return jurisdiction
 
+@pytest.fixture
+def query_budget():
+    """
+    Assert that a block runs at most budget queries, e.g.,
+
+        with query_budget(10):
+            client.get(url)
+
+    and report the repeated queries and their call sites if it doesn't.
+    """
+    @contextmanager
+    def assert_budget(budget):
+        with QueryLog() as log:
+            yield log
+
+        assert log.count <= budget, \
+            'Over a budget of {} queries:\n{}'.format(budget, log.report())
+
+    return assert_budget
+
+
 @pytest.fixture
 @pytest.mark.django_db
 def hearing(jurisdiction):
@@ -35,3 +69,138 @@ def hearing(jurisdiction):
         )
 
     return hearing
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def house(jurisdiction):
+    house = Organization.objects.create(
+        name='United States House of Representatives',
+        classification='lower',
+        jurisdiction=jurisdiction
+        )
+
+    return house
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def committee(house, jurisdiction):
+    committee = CommitteeOrganization.objects.create(
+        name='House Committee on Agriculture',
+        classification='committee',
+        parent=house,
+        jurisdiction=jurisdiction
+        )
+
+    return committee
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def subcommittee(committee, jurisdiction):
+    subcommittee = CommitteeOrganization.objects.create(
+        name='Subcommittee on Livestock and Foreign Agriculture',
+        classification='committee',
+        parent=committee,
+        jurisdiction=jurisdiction
+        )
+
+    return subcommittee
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def congresses():
+    congresses = [
+        Congress.objects.create(
+            id=114,
+            start_date=date(2015, 1, 3),
+            end_date=date(2017, 1, 2)
+        ),
+        Congress.objects.create(
+            id=115,
+            start_date=date(2017, 1, 3),
+            end_date=date(2019, 1, 2),
+            footnote='Includes a government shutdown.'
+        ),
+    ]
+
+    return congresses
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def committee_ratings(committee, congresses):
+    committee_ratings = [
+        CommitteeRating.objects.create(
+            committee=committee,
+            congress=congresses[0],
+            investigative_oversight_hearings=10,
+            policy_legislative_hearings=20,
+            total_hearings=40,
+            chp_points=150
+        ),
+        CommitteeRating.objects.create(
+            committee=committee,
+            congress=congresses[1],
+            investigative_oversight_hearings=5,
+            policy_legislative_hearings=30,
+            total_hearings=45,
+            chp_points=140
+        ),
+    ]
+
+    return committee_ratings
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category_types():
+    names = ['Nominations', 'Legislative', 'Policy', 'Agency Conduct',
+             'Private Sector Oversight', 'Fact Finding', 'Field', 'Closed',
+             'Other']
+
+    return {
+        name: HearingCategoryType.objects.create(id=str(i), name=name)
+        for i, name in enumerate(names, 1)
+    }
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def categorized_hearings(jurisdiction, committee, subcommittee, congresses,
+                         category_types):
+    """
+    Hearings held by a committee or its subcommittee across two Congresses,
+    in a mix of categories.
+    """
+    hearing_data = [
+        ('2015-03-01', committee, 'Agency Conduct'),
+        ('2015-04-01', subcommittee, 'Policy'),
+        ('2016-05-01', subcommittee, 'Private Sector Oversight'),
+        ('2017-02-01', committee, 'Legislative'),
+        ('2018-02-01', subcommittee, 'Nominations'),
+        ('2018-03-01', committee, 'Other'),
+    ]
+
+    hearings = []
+    for i, (start_date, organization, category) in enumerate(hearing_data):
+        hearing = Event.objects.create(
+            jurisdiction=jurisdiction,
+            name='Test Hearing {}'.format(i),
+            start_date=start_date
+            )
+        EventParticipant.objects.create(
+            event=hearing,
+            name=organization.name,
+            organization=organization,
+            entity_type='organization'
+            )
+        HearingCategory.objects.create(
+            event=hearing,
+            category=category_types[category]
+            )
+        hearings.append(hearing)
+
+    return hearings
@@ -0,0 +1,149 @@
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from django.core.management import call_command
+
+from opencivicdata.legislative.models import EventDocument, EventDocumentLink
+
+from committeeoversightapp.archive import ArchiveError
+from committeeoversightapp.models import ArchiveJob
+from committeeoversightapp.view_utils import save_document
+
+
+class StubArchive(object):
+    """Fails the first save of each URL, and every save of a 'broken' URL."""
+    calls = Counter()
+
+    def save(self, url):
+        self.calls[url] += 1
+
+        if 'broken' in url or self.calls[url] == 1:
+            raise ArchiveError('No snapshot of {} was returned'.format(url))
+
+        return 'https://archive.example.com/' + url
+
+
+@pytest.fixture
+def archive(settings):
+    settings.ARCHIVE_BACKEND = 'tests.test_archive.StubArchive'
+    settings.ARCHIVE_OPTIONS = {}
+    StubArchive.calls.clear()
+
+    return StubArchive
+
+
+# The worker's threads use their own database connections, so they only see
+# committed data
+@pytest.mark.django_db(transaction=True)
+def test_archive_documents(hearing, archive):
+    transcript = save_document('https://example.com/transcript.pdf', 'transcript', hearing)
+    statement = save_document('https://example.com/broken.htm', 'witness statement', hearing)
+
+    # Saving a document only queues it to be archived
+    assert not archive.calls
+    assert ArchiveJob.objects.filter(status=ArchiveJob.PENDING).count() == 2
+
+    call_command('archive_documents', max_attempts=3, backoff=0)
+
+    transcript_job = ArchiveJob.objects.get(link__document=transcript)
+    assert transcript_job.status == ArchiveJob.DONE
+    assert transcript_job.attempts == 2
+
+    archived = EventDocumentLink.objects.get(document=transcript, text='archived')
+    assert archived.url == 'https://archive.example.com/https://example.com/transcript.pdf'
+    assert archived.media_type == 'application/pdf'
+
+    statement_job = ArchiveJob.objects.get(link__document=statement)
+    assert statement_job.status == ArchiveJob.FAILED
+    assert statement_job.attempts == 3
+    assert 'No snapshot' in statement_job.last_error
+    assert not statement.links.filter(text='archived').exists()
+
+
+class FakeWaybackHandler(BaseHTTPRequestHandler):
+    """
+    Answers /save/<url> like the Wayback Machine, except that snapshots of
+    'missing' URLs come back without a Content-Location.
+    """
+    def do_GET(self):
+        url = self.path[len('/save/'):]
+        self.server.saved.append(url)
+
+        self.send_response(200)
+        if 'missing' not in url:
+            self.send_header('Content-Location', '/web/20200101000000/' + url)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_wayback(settings):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeWaybackHandler)
+    server.saved = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    host = 'http://127.0.0.1:{}'.format(server.server_port)
+    settings.ARCHIVE_BACKEND = 'committeeoversightapp.archive.WaybackArchive'
+    settings.ARCHIVE_OPTIONS = {'host': host, 'requests_per_minute': 6000}
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_backfill_archived_links(hearing, fake_wayback):
+    def add_document(url, archived_url=None):
+        document = EventDocument.objects.create(event=hearing, note='transcript')
+        document.links.create(url=url, media_type='text/html')
+        if archived_url:
+            document.links.create(url=archived_url, media_type='text/html', text='archived')
+        return document
+
+    missing = add_document('https://example.com/transcript.htm')
+    archived = add_document('https://example.com/archived.htm', 'https://web.archive.org/1')
+    never_archived = add_document('https://example.com/missing.htm')
+
+    call_command('backfill_archived_links', max_attempts=1)
+
+    assert sorted(fake_wayback.saved) == [
+        'https://example.com/missing.htm',
+        'https://example.com/transcript.htm',
+    ]
+    assert missing.links.get(text='archived').url == \
+        'http://127.0.0.1:{}/web/20200101000000/https://example.com/transcript.htm'.format(
+            fake_wayback.server_port
+        )
+    assert archived.links.filter(text='archived').count() == 1
+    assert not never_archived.links.filter(text='archived').exists()
+
+    # Failed documents are tried again by the next backfill
+    call_command('backfill_archived_links', max_attempts=1)
+
+    assert fake_wayback.saved.count('https://example.com/missing.htm') == 2
+    assert fake_wayback.saved.count('https://example.com/transcript.htm') == 1
+
+
+@pytest.mark.django_db
+def test_archive_job_lost_claim(hearing):
+    document = save_document('https://example.com/transcript.pdf', 'transcript', hearing)
+
+    # A worker claims the job, then outlives its lease, and another worker
+    # claims it again
+    job, = ArchiveJob.objects.claim(1, lease=0)
+    reclaimed, = ArchiveJob.objects.claim(1, lease=600)
+
+    # The first worker's results are dropped
+    assert not job.complete('https://archive.example.com/1')
+    assert not job.retry(ArchiveError('Timed out'), max_attempts=1, backoff=0)
+    assert not document.links.filter(text='archived').exists()
+
+    assert reclaimed.complete('https://archive.example.com/2')
+    assert document.links.get(text='archived').url == 'https://archive.example.com/2'
+    assert ArchiveJob.objects.get(id=job.id).status == ArchiveJob.DONE
@@ -0,0 +1,60 @@
+import json
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from committeeoversightapp.models import HearingEvent, CommitteeHearing, \
+                                         ArchiveJob, CommitteeOrganization
+
+
+@pytest.mark.django_db
+def test_generate_hearings_and_run_benchmarks(tmp_path):
+    def generate(*args):
+        call_command('generate_hearings', '--subcommittees', '1',
+                     '--first-congress', '114', '--last-congress', '115',
+                     *args, stdout=StringIO())
+
+    generate('--hearings', '30')
+
+    assert HearingEvent.objects.count() == 30
+
+    # Every hearing counts toward a permanent committee
+    assert CommitteeHearing.objects.filter(
+        committee__in=CommitteeOrganization.objects.permanent_committees()
+    ).values('event').distinct().count() == 30
+
+    # Generated documents are already archived
+    assert ArchiveJob.objects.enqueue_missing() == 0
+
+    output = tmp_path / 'results.json'
+    call_command('run_benchmarks', '--repeat', '2', '--output', str(output),
+                 stdout=StringIO())
+
+    results = json.loads(output.read_text())
+    assert results['hearings'] == 30
+
+    # Deep pages are timed both when seeking past a bookmark and when
+    # jumping straight to them
+    assert {'hearing_list_deep_page', 'hearing_list_deep_page_offset'} <= \
+        set(results['benchmarks'])
+
+    for name, result in results['benchmarks'].items():
+        assert result['queries'] > 0, name
+        assert len(result['seconds']) == \
+            (1 if name.startswith('load_committeeratings') else 2)
+
+    # Runs can be compared with earlier ones
+    stdout = StringIO()
+    call_command('run_benchmarks', 'hearing_list', '--repeat', '1',
+                 '--output', str(tmp_path / 'next.json'),
+                 '--compare', str(output),
+                 stdout=stdout)
+
+    assert '% median' in stdout.getvalue()
+
+    # Generated hearings are replaced, not added to, with --clear
+    generate('--hearings', '10', '--clear')
+
+    assert HearingEvent.objects.count() == 10
@@ -0,0 +1,112 @@
+import pytest
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.cache import learn_cache_key
+
+from committeeoversightapp.cache import purge_urls, get_cache_version
+from committeeoversightapp.models import CommitteeScorecard
+
+
+@pytest.fixture
+def tiered_cache(settings):
+    # Stand in a local-memory cache for the shared cache
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'committeeoversightapp.cache.TieredCache',
+            'LOCATION': 'test-l1',
+            'OPTIONS': {'L2': 'shared'},
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'test-l2',
+        },
+        'versions': {
+            'BACKEND': 'committeeoversightapp.cache.TieredCache',
+            'LOCATION': 'test-versions-l1',
+            'OPTIONS': {'L2': 'shared_versions'},
+        },
+        'shared_versions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'test-versions-l2',
+        },
+    }
+
+    caches['versions'].clear()
+    cache = caches['default']
+    cache.clear()
+
+    return cache
+
+
+def test_tiered_cache(tiered_cache):
+    assert tiered_cache.get('key') is None
+
+    tiered_cache.set('key', 'value')
+    assert tiered_cache.get('key') == 'value'
+
+    # Values missing from this worker's memory are fetched from the shared
+    # cache and kept in memory again
+    tiered_cache.l1.clear()
+    assert tiered_cache.get('key') == 'value'
+    assert tiered_cache.l1.get('key') == 'value'
+
+    assert tiered_cache.stats() == {'l1_hits': 1, 'l2_hits': 1, 'misses': 1}
+
+    tiered_cache.delete('key')
+    assert tiered_cache.get('key') is None
+    assert caches['shared'].get('key') is None
+
+
+def test_purge_urls(tiered_cache):
+    request = RequestFactory().get('/compare-committees/')
+    key = learn_cache_key(request, HttpResponse(), cache=tiered_cache)
+    tiered_cache.set(key, HttpResponse('Cached page'))
+
+    purge_urls(['http://testserver/compare-committees/'])
+
+    assert tiered_cache.get(key) is None
+
+
+@pytest.mark.django_db
+def test_ratings_version(tiered_cache, committee, committee_ratings):
+    CommitteeScorecard.objects.refresh()
+    version = get_cache_version(CommitteeScorecard.objects.version_name)
+    assert version
+
+    # Rebuilding unchanged ratings keeps the cached rating tables
+    CommitteeScorecard.objects.refresh()
+    assert get_cache_version(CommitteeScorecard.objects.version_name) == version
+
+    rating = committee_ratings[0]
+    rating.total_hearings += 1
+    rating.save()
+
+    CommitteeScorecard.objects.refresh()
+    assert get_cache_version(CommitteeScorecard.objects.version_name) != version
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ratings_version_congress_footnote(tiered_cache, committee, committee_ratings):
+    CommitteeScorecard.objects.refresh()
+    version = get_cache_version(CommitteeScorecard.objects.version_name)
+
+    congress = committee_ratings[0].congress
+    congress.footnote = 'The committee was reorganized.'
+    congress.save()
+
+    assert get_cache_version(CommitteeScorecard.objects.version_name) != version
+
+
+def test_cache_version_evicted(tiered_cache):
+    version = get_cache_version('evicted')
+    assert version
+    assert get_cache_version('evicted') == version
+
+    # Clearing or culling the cached data keeps the versions
+    tiered_cache.clear()
+    assert get_cache_version('evicted') == version
+
+    caches['versions'].clear()
+    assert get_cache_version('evicted') not in (None, version)
@@ -0,0 +1,234 @@
+import csv
+import json
+
+import pytest
+
+from django.core.management import call_command
+
+from opencivicdata.core.models import Jurisdiction, Organization
+from opencivicdata.legislative.models import Event, EventParticipant
+
+from committeeoversightapp.models import CommitteeRating, HearingCategory, \
+                                         StaleCommitteeRating
+
+
+def rating_counts():
+    return list(CommitteeRating.objects.order_by('congress_id').values_list(
+        'committee_id',
+        'congress_id',
+        'investigative_oversight_hearings',
+        'policy_legislative_hearings',
+        'total_hearings',
+        'chp_points'
+    ))
+
+
+@pytest.mark.django_db
+def test_load_committeeratings(committee, categorized_hearings):
+    call_command('load_committeeratings')
+
+    assert rating_counts() == [
+        (committee.id, 114, 2, 1, 3, 19),
+        (committee.id, 115, 0, 1, 2, 4),
+    ]
+
+
+@pytest.mark.django_db
+def test_load_committeeratings_batch(categorized_hearings):
+    call_command('load_committeeratings')
+    expected = rating_counts()
+
+    CommitteeRating.objects.update(chp_points=0)
+    call_command('load_committeeratings', batch=True)
+
+    assert rating_counts() == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('batch', [False, True])
+def test_load_committeeratings_multiple_categories(committee, categorized_hearings,
+                                                   category_types, batch):
+    # A second investigative category doesn't count the hearing twice
+    HearingCategory.objects.create(event=categorized_hearings[0],
+                                   category=category_types['Private Sector Oversight'])
+
+    call_command('load_committeeratings', batch=batch)
+
+    assert rating_counts() == [
+        (committee.id, 114, 2, 1, 3, 19),
+        (committee.id, 115, 0, 1, 2, 4),
+    ]
+
+
+@pytest.mark.django_db
+def test_load_committeeratings_incremental(committee, categorized_hearings,
+                                           category_types):
+    call_command('load_committeeratings', batch=True)
+    assert not StaleCommitteeRating.objects.exists()
+
+    # Recategorizing a 115th Congress subcommittee hearing flags only the
+    # parent committee's 115th Congress rating
+    hearing_category = HearingCategory.objects.get(event=categorized_hearings[4])
+    hearing_category.category = category_types['Agency Conduct']
+    hearing_category.save()
+
+    assert list(StaleCommitteeRating.objects.values_list(
+        'committee_id',
+        'congress_id'
+    )) == [(committee.id, 115)]
+
+    call_command('load_committeeratings', incremental=True)
+
+    assert not StaleCommitteeRating.objects.exists()
+    assert rating_counts() == [
+        (committee.id, 114, 2, 1, 3, 19),
+        (committee.id, 115, 1, 1, 2, 11),
+    ]
+
+
+def write_csv(path, rows):
+    with open(str(path), 'w') as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def spreadsheets(tmp_path, monkeypatch, division, house, committee):
+    Jurisdiction.objects.create(
+        id='ocd-jurisdiction/country:us/legislature',
+        name='United States of America',
+        division=division
+    )
+    Organization.objects.create(name='United States Senate', classification='upper')
+
+    data = tmp_path / 'data' / 'final'
+    data.mkdir(parents=True)
+
+    write_csv(data / 'house_committees.csv', [{'code': '101', 'name': 'Agriculture'}])
+    write_csv(data / 'senate_committees.csv', [{'code': '301', 'name': 'Aging'}])
+
+    house_row = {
+        'source': 'https://example.com/hearing',
+        'Date': '2017-03-01T00:00:00',
+        'Hearing/Report': 'Farm Bill Hearing',
+        'Type': 'hearing',
+        'Category1': '2',
+        'Committee1': '101',
+        'Committee2': '',
+        'Subcommittee': '',
+        'Subcommittee2': '',
+    }
+    write_csv(data / 'house.csv', [
+        house_row,
+        dict(house_row, **{'Date': '2017-04-01T00:00:00', 'Hearing/Report': 'New Hearing'}),
+        dict(house_row, **{'Hearing/Report': ''}),
+    ])
+    write_csv(data / 'senate.csv', [{
+        'source': '',
+        'Date': '2017-05-01T00:00:00',
+        'Hearing/Report': 'Senate Hearing',
+        'Type': 'hearing',
+        'Category1': '1',
+        'Committee1': '301',
+        'Committee2': '',
+        'Hearing #': '',
+    }])
+
+    monkeypatch.chdir(str(tmp_path))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('bulk', [False, True])
+def test_import_data(spreadsheets, house, committee, congresses, category_types, bulk):
+    scraped_hearing = Event.objects.create(
+        jurisdiction_id='ocd-jurisdiction/country:us/legislature',
+        name='Scraped Hearing',
+        start_date='2017-03-01'
+    )
+    EventParticipant.objects.create(
+        event=scraped_hearing,
+        name=committee.name,
+        organization=committee,
+        entity_type='organization'
+    )
+
+    call_command('import_data', bulk=bulk, chunk_size=1)
+
+    # The first House row is matched to the scraped hearing by date and
+    # committee; the other rows are new hearings
+    assert Event.objects.count() == 3
+
+    scraped_hearing.refresh_from_db()
+    assert scraped_hearing.name == 'Farm Bill Hearing'
+    assert scraped_hearing.source_hashes.count() == 1
+    assert set(scraped_hearing.sources.values_list('note', 'url')) == {
+        ('spreadsheet', 'https://example.com/hearing'),
+        ('spreadsheet file', 'data/final/house.csv'),
+    }
+    assert scraped_hearing.participants.count() == 1
+
+    new_hearing = Event.objects.get(name='New Hearing')
+    assert new_hearing.start_date == '2017-04-01'
+    assert list(new_hearing.participants.values_list('organization_id', flat=True)) \
+        == [committee.id]
+    assert HearingCategory.objects.get(event=new_hearing).category_id == '2'
+
+    assert not Event.objects.get(name='Senate Hearing').participants.exists()
+
+    assert list(StaleCommitteeRating.objects.values_list(
+        'committee_id',
+        'congress_id'
+    )) == [(committee.id, 115)]
+
+    # Rows that have already been imported are skipped
+    call_command('import_data', bulk=bulk)
+    assert Event.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_import_data_resume(spreadsheets, committee, category_types, tmp_path):
+    # An earlier run saved the first House row before stopping
+    checkpoint = tmp_path / 'import_data_checkpoint.json'
+    checkpoint.write_text(json.dumps({'data/final/house.csv': 2}))
+
+    call_command('import_data', bulk=True, checkpoint=str(checkpoint))
+
+    assert set(Event.objects.values_list('name', flat=True)) == \
+        {'New Hearing', 'Senate Hearing'}
+    assert not checkpoint.exists()
+
+
+@pytest.mark.django_db
+def test_import_categories(tmp_path, monkeypatch, hearing, category_types):
+    hearing.start_date = '2017-03-01'
+    hearing.save()
+    HearingCategory.objects.create(event=hearing, category=category_types['Other'])
+
+    data = tmp_path / 'data' / 'final'
+    data.mkdir(parents=True)
+
+    write_csv(data / 'categories_edited.csv', [
+        {'DATE': '2017-03-01', 'NAME': 'Test Hearing', 'CATEGORY': 'Field'},
+        {'DATE': '2017-03-01', 'NAME': 'Another Hearing', 'CATEGORY': 'Field'},
+    ])
+    write_csv(data / 'categories_ml.csv', [
+        {'DATE': '2017-03-01', 'NAME': 'test  hearing.', 'CATEGORY': 'Policy'},
+        {'DATE': '2017-03-01', 'NAME': 'Test Hearings', 'CATEGORY': 'Field'},
+    ])
+
+    monkeypatch.chdir(str(tmp_path))
+    call_command('import_categories')
+
+    # The ML file's match updates the hearing's existing category, but a
+    # merely similar name is left for review
+    assert list(HearingCategory.objects.values_list('event_id', 'category__name')) == \
+        [(hearing.id, 'Policy')]
+    assert (tmp_path / 'no_category_match.csv').read_text() == \
+        '2017-03-01,Another Hearing\n'
+
+    with open(str(tmp_path / 'category_matches_to_review.csv')) as f:
+        to_review = list(csv.DictReader(f))
+
+    assert [(row['NAME'], row['MATCHED_ID']) for row in to_review] == \
+        [('Test Hearings', hearing.id)]
@@ -0,0 +1,77 @@
+import json
+
+from committeeoversightapp.import_utils import HearingNameMatcher, RejectionLog, \
+                                               parse_records, read_rejected_rows
+
+
+def test_parse_records(tmp_path):
+    row = {
+        'source': '',
+        'Date': '2017-03-01T00:00:00',
+        'Hearing/Report': 'Senate Hearing',
+        'Type': 'hearing',
+        'Category1': '2',
+        'Committee1': '301',
+        'Committee2': '',
+        'Hearing #': 'S. Hrg. 115-12',
+    }
+    rows = [
+        (2, row),
+        (3, dict(row, **{'Committee2': 'n/a', 'Category1': '99'})),
+        (4, dict(row, **{'Date': '2017-02-30'})),
+    ]
+
+    path = str(tmp_path / 'rejections.jsonl')
+    rejections = RejectionLog(path)
+    records = list(parse_records(rows, 'senate.csv', 'senate', rejections))
+    rejections.close()
+
+    assert [record.row_index for record in records] == [2, 3]
+    assert records[0].start_date == '2017-03-01'
+    assert records[0].committee_codes == ['301']
+    assert records[0].category == '2'
+    assert records[0].hearing_number == '115-12'
+
+    # Bad committee codes and categories are dropped but the hearing is kept
+    assert records[1].committee_codes == ['301']
+    assert records[1].category is None
+
+    with open(path) as f:
+        entries = [json.loads(line) for line in f]
+
+    assert [(entry['row_index'], entry['rejected']) for entry in entries] == \
+        [(3, False), (4, True)]
+    assert [error['field'] for error in entries[0]['errors']] == \
+        ['Committee', 'Category1']
+
+    # Only rejected rows are fed back in
+    assert list(read_rejected_rows(path, 'senate.csv')) == [(4, rows[2][1])]
+
+
+def test_hearing_name_matcher():
+    matcher = HearingNameMatcher([
+        ('event-1', '2017-03-01', 'The Nation’s Farms: Part 1'),
+        ('event-2', '2017-03-01', 'The Nation’s Farms: Part 2'),
+        ('event-3', '2017-03-02', 'Oversight of the Department of Agriculture'),
+        ('event-4', '2017-03-03', 'Nomination of John Smith'),
+        ('event-5', '2017-03-03', 'Nomination of Jane Smith'),
+    ])
+
+    # Punctuation, whitespace and encoding don't matter
+    match = matcher.match('2017-03-01', 'the nation\'s farms -- part  1')
+    assert match.event_id == 'event-1'
+    assert match.ratio == 1
+    assert matcher.match('2017-03-01', 'The Nationâ€™s Farms: Part 2').event_id == 'event-2'
+
+    # Small differences still match, but only on the same date
+    match = matcher.match('2017-03-02', 'Oversight of the Dept. of Agriculture')
+    assert match.event_id == 'event-3'
+    assert match.ratio < 1
+    assert matcher.match('2017-03-01', 'Oversight of the Department of Agriculture') is None
+
+    # Names with different numbers never match
+    assert matcher.match('2017-03-01', 'The Nation’s Farms: Part 3') is None
+    assert matcher.match('2017-03-01', 'The Nation’s Farms') is None
+
+    # Nor do names about as similar to a sibling hearing
+    assert matcher.match('2017-03-03', 'Nomination of Jon Smith') is None
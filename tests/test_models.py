@@ -1,6 +1,184 @@
 import pytest
 
+from wagtail.core.models import Page
+
+from committeeoversightapp.models import CommitteeScorecard, CommitteeDetailPage, \
+                                         EventCommitteeSignature, CommitteeHearing, \
+                                         CommitteeOrganization
+from committeeoversightapp.registry import committee_registry
+
 @pytest.mark.django_db
 def test_hearing(hearing):
     assert hearing.jurisdiction.name == 'United States of America'
     assert hearing.name == 'Test Hearing'
+
+
+@pytest.mark.django_db
+def test_committee_scorecard(committee, committee_ratings):
+    CommitteeScorecard.objects.refresh()
+
+    committees = CommitteeScorecard.objects.by_committee()
+    assert [c.id for c in committees] == [committee.id]
+
+    scorecards = committees[0].scorecards
+    assert [s.congress_id for s in scorecards] == [115, 114]
+    assert committees[0].latest_scorecard == scorecards[0]
+
+    # Scorecards match the scores computed from each CommitteeRating
+    for scorecard, rating in zip(scorecards, committee.ratings_by_congress_desc):
+        assert scorecard.chp_score == rating.chp_score
+        assert scorecard.chp_grade == rating.chp_grade
+        assert scorecard.css_class == rating.css_class
+        assert scorecard.footnote_symbol == rating.footnote_symbol
+        assert scorecard.total_percent_max == rating.total_percent_max
+        assert scorecard.total_percent_avg == rating.total_percent_avg
+        assert scorecard.total_hearings_avg == committee.total_hearings_avg
+
+
+@pytest.mark.django_db
+def test_committee_registry(committee, django_assert_num_queries):
+    assert committee.display_name == 'House Committee on Agriculture'
+
+    # Committee metadata is served from memory once loaded
+    with django_assert_num_queries(0):
+        assert committee.is_permanent
+        assert committee.short_name == 'Agriculture'
+        assert not committee.is_subcommittee
+
+    # Publishing a detail page refreshes the registry
+    Page.objects.get(depth=1).add_child(instance=CommitteeDetailPage(
+        committee=committee,
+        body='',
+        slug='committee-agriculture',
+        display_name='House Agriculture Committee',
+        chair='Rep. Collin Peterson'
+    ))
+
+    assert committee.display_name == 'House Agriculture Committee'
+    assert committee.chair == 'Rep. Collin Peterson'
+    assert not committee.hide_rating
+
+
+@pytest.mark.django_db
+def test_committee_registry_snapshot(committee):
+    # A reader keeps the whole snapshot it started with, even if another
+    # thread invalidates the registry meanwhile
+    snapshot = committee_registry.ensure_loaded()
+    committee_registry.invalidate()
+
+    assert committee.id in snapshot.permanent_ids
+    assert snapshot.organizations[committee.id].name == committee.name
+
+    assert committee_registry.ensure_loaded() is not snapshot
+    assert committee_registry.is_permanent(committee.id)
+
+
+@pytest.mark.django_db
+def test_committee_scorecard_build(committee, committee_ratings,
+                                   django_assert_num_queries):
+    ratings = list(
+        committee.committeerating_set.select_related('congress')
+        .order_by('congress__id')
+    )
+
+    with django_assert_num_queries(0):
+        scorecards = CommitteeScorecard.objects.build(ratings)
+
+    for scorecard, rating in zip(scorecards, committee.ratings_by_congress_asc):
+        assert scorecard.congress == rating.congress
+        assert scorecard.chp_score == rating.chp_score
+        assert scorecard.chp_grade == rating.chp_grade
+        assert scorecard.footnote_symbol == rating.footnote_symbol
+        assert scorecard.investigative_oversight_percent_max == \
+            rating.investigative_oversight_percent_max
+        assert scorecard.policy_legislative_percent_avg == \
+            rating.policy_legislative_percent_avg
+        assert scorecard.total_hearings_avg == committee.total_hearings_avg
+
+
+@pytest.mark.django_db
+def test_event_committee_signature(hearing, committee, subcommittee):
+    hearing.start_date = '2017-03-01'
+    hearing.save()
+
+    for organization in (subcommittee, committee):
+        hearing.participants.create(name=organization.name,
+                                    organization=organization,
+                                    entity_type='organization')
+
+    signature = EventCommitteeSignature.objects.get(event=hearing)
+    assert signature.start_date == '2017-03-01'
+    assert signature.signature == EventCommitteeSignature.objects.get_signature(
+        [committee.id, subcommittee.id]
+    )
+
+    # Moving the hearing moves its signature
+    hearing.start_date = '2017-03-02'
+    hearing.save()
+
+    signature.refresh_from_db()
+    assert signature.start_date == '2017-03-02'
+
+    # Hearings with a participant that isn't an organization never match
+    witness = hearing.participants.create(name='Jane Doe', entity_type='person')
+
+    signature.refresh_from_db()
+    assert signature.signature is None
+
+    witness.delete()
+    hearing.participants.all().delete()
+
+    assert not EventCommitteeSignature.objects.filter(event=hearing).exists()
+
+
+@pytest.mark.django_db
+def test_committee_hearing(hearing, house, committee, subcommittee):
+    def memberships():
+        return set(CommitteeHearing.objects.filter(event=hearing)
+                   .values_list('committee_id', 'start_date'))
+
+    hearing.start_date = '2017-03-01'
+    hearing.save()
+
+    hearing.participants.create(name=subcommittee.name,
+                                organization=subcommittee,
+                                entity_type='organization')
+    hearing.participants.create(name='Jane Doe', entity_type='person')
+
+    # A subcommittee's hearings count toward its parent committee
+    assert memberships() == {(subcommittee.id, '2017-03-01'),
+                             (committee.id, '2017-03-01')}
+    assert list(committee.hearings) == [hearing]
+
+    hearing.start_date = '2017-03-02'
+    hearing.save()
+
+    assert memberships() == {(subcommittee.id, '2017-03-02'),
+                             (committee.id, '2017-03-02')}
+
+    # ...or to its new parent, if it moves
+    subcommittee.parent = house
+    subcommittee.save()
+
+    assert memberships() == {(subcommittee.id, '2017-03-02'),
+                             (house.id, '2017-03-02')}
+    assert not committee.hearings.exists()
+
+    hearing.participants.all().delete()
+
+    assert memberships() == set()
+
+
+@pytest.mark.django_db
+def test_last_updated_all_committees(categorized_hearings, hearing, committee,
+                                     django_assert_num_queries):
+    # Uncategorized hearings don't count
+    hearing.participants.create(name=committee.name,
+                                organization=committee,
+                                entity_type='organization')
+
+    with django_assert_num_queries(1):
+        last_updated = CommitteeOrganization.objects.last_updated_all_committees()
+
+    assert last_updated == max(hearing.updated_at for hearing in categorized_hearings)
+    assert last_updated == committee.last_updated
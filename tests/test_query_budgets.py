@@ -0,0 +1,145 @@
+from io import StringIO
+from urllib.parse import urlencode
+
+import pytest
+
+from django.conf import settings as django_settings
+from django.core.management import call_command
+
+from wagtail.core.models import Site
+
+from opencivicdata.legislative.models import Event
+
+from committeeoversightapp.models import CommitteeOrganization, LandingPage, \
+                                         CommitteeDetailPage, \
+                                         CompareCurrentCommitteesPage, \
+                                         CompareCommitteesOverCongressesPage
+from committeeoversightapp.views import EventListJson
+from committeeoversightapp.view_utils import create_hearing
+
+
+@pytest.fixture
+def no_cache(settings):
+    # Count the queries behind each page, rather than a cached copy
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        'shared': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+        'versions': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    }
+
+
+def hearing_list_url(**params):
+    params.update({
+        'draw': 1,
+        'start': 0,
+        'length': 25,
+        'order[0][column]': 0,
+        'order[0][dir]': 'desc',
+    })
+    for i in range(len(EventListJson.columns)):
+        params['columns[{}][data]'.format(i)] = i
+        params['columns[{}][searchable]'.format(i)] = 'true'
+        params['columns[{}][orderable]'.format(i)] = 'true'
+
+    return '/my/datatable/data/?' + urlencode(params)
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def seeded_site(no_cache, jurisdiction, house, committee, subcommittee,
+                congresses, category_types):
+    """
+    Enough committees, hearings and witnesses that a query per row on any
+    page would run it over budget, and the URL of each type of page.
+    """
+    committees = [committee, subcommittee] + [
+        CommitteeOrganization.objects.create(
+            name=name,
+            classification='committee',
+            parent=house,
+            jurisdiction=jurisdiction
+        )
+        for name in django_settings.CURRENT_PERMANENT_COMMITTEES
+        if name.startswith('House') and name != committee.name
+    ]
+
+    categories = list(category_types.values())
+    hearings = []
+
+    for i in range(40):
+        event = Event(jurisdiction=jurisdiction,
+                      name='Hearing {}'.format(i),
+                      start_date='{}-03-{:02d}'.format(2015 + i % 4, i % 28 + 1),
+                      classification='Hearing')
+
+        create_hearing(
+            event,
+            [committees[i % len(committees)]],
+            categories[i % len(categories)],
+            {
+                'transcript_url': 'https://example.com/{}/transcript.pdf'.format(i),
+                'opening_statement_chair': 'https://example.com/{}/chair.pdf'.format(i),
+                'opening_statement_rm': '',
+            },
+            [
+                {'name': 'Witness {}'.format(j),
+                 'organization': 'Agency {}'.format(j),
+                 'url': 'https://example.com/{}/witness-{}.pdf'.format(i, j),
+                 'retired': False}
+                for j in range(3)
+            ]
+        )
+        hearings.append(event)
+
+    call_command('load_committeeratings', '--batch', stdout=StringIO())
+
+    root = Site.objects.get(is_default_site=True).root_page
+    pages = {
+        'landing': LandingPage(title='Home', slug='home', body='<p>Home</p>'),
+        'compare_current_committees': CompareCurrentCommitteesPage(
+            title='Compare Current Committees',
+            slug='compare-current-committees',
+            body='<p>Compare</p>'
+        ),
+        'compare_committees_over_congresses': CompareCommitteesOverCongressesPage(
+            title='Compare Committees Over Congresses',
+            slug='compare-committees-over-congresses',
+            body='<p>Compare</p>'
+        ),
+        'committee_detail': CommitteeDetailPage(
+            committee=committee,
+            slug='committee-agriculture',
+            chair='Rep. Collin Peterson',
+            body='<p>Agriculture</p>'
+        ),
+    }
+
+    urls = {
+        name: root.add_child(instance=page).url
+        for name, page in pages.items()
+    }
+    urls.update({
+        'hearing_detail': '/hearing/view/{}/'.format(hearings[0].id),
+        'hearing_list': hearing_list_url(),
+        'committee_hearing_list': hearing_list_url(detail_type='committee',
+                                                   id=committee.id),
+    })
+
+    return urls
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('page,budget', [
+    ('hearing_list', 20),
+    ('committee_hearing_list', 20),
+    ('hearing_detail', 30),
+    ('committee_detail', 30),
+    ('landing', 30),
+    ('compare_current_committees', 30),
+    ('compare_committees_over_congresses', 30),
+])
+def test_query_budget(client, seeded_site, query_budget, page, budget):
+    with query_budget(budget):
+        response = client.get(seeded_site[page])
+
+    assert response.status_code == 200
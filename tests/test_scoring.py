@@ -0,0 +1,83 @@
+from datetime import date, timedelta
+import random
+
+import pytest
+
+from committeeoversightapp.models import CommitteeOrganization, CommitteeRating, \
+                                         Congress
+from committeeoversightapp.scoring import RatingScores, HEARING_TYPES
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def ratings_matrix(house, congresses):
+    # A Congress in progress, so that its scores are projected
+    current_congress = Congress.objects.create(
+        id=116,
+        start_date=date.today() - timedelta(days=300),
+        end_date=date.today() + timedelta(days=400),
+        inactive_days=80
+    )
+
+    committees = [
+        CommitteeOrganization.objects.create(
+            name='House Committee {}'.format(i),
+            classification='committee',
+            parent=house
+        )
+        for i in range(4)
+    ]
+
+    random.seed(1)
+
+    for i, committee in enumerate(committees):
+        for congress in congresses + [current_congress]:
+            # Leave a gap in one committee's history
+            if i == 1 and congress.id == 115:
+                continue
+
+            # One committee has held no hearings at all
+            if i == 2:
+                counts = [0, 0, 0]
+            else:
+                counts = [random.randint(0, 50) for _ in range(3)]
+
+            CommitteeRating.objects.create(
+                committee=committee,
+                congress=congress,
+                investigative_oversight_hearings=counts[0],
+                policy_legislative_hearings=counts[1],
+                total_hearings=counts[2],
+                chp_points=7 * counts[0] + 2 * counts[1] + counts[2]
+            )
+
+    return committees
+
+
+@pytest.mark.django_db
+def test_rating_scores(ratings_matrix):
+    ratings = list(CommitteeRating.objects.select_related('committee', 'congress'))
+    scores = RatingScores(ratings)
+
+    assert scores.committee_ids == sorted(c.id for c in ratings_matrix)
+    assert [c.id for c in scores.congresses] == [114, 115, 116]
+    assert scores.present.sum() == len(ratings)
+
+    # The vectorized scores match the CommitteeRating properties
+    for rating in ratings:
+        row = scores.committee_ids.index(rating.committee_id)
+        cell = (row, [c.id for c in scores.congresses].index(rating.congress_id))
+
+        assert scores.chp_score[cell] == rating.chp_score
+        assert scores.chp_grade[cell] == rating.chp_grade
+        assert scores.css_class[cell] == rating.css_class
+
+        for hearing_type in HEARING_TYPES:
+            prefix = hearing_type[:-len('_hearings')]
+
+            assert scores.hearings_avg[hearing_type][row] == \
+                getattr(rating.committee, hearing_type + '_avg')
+            assert scores.percent_max[hearing_type][cell] == \
+                getattr(rating, prefix + '_percent_max')
+            assert scores.percent_avg[hearing_type][cell] == \
+                getattr(rating, prefix + '_percent_avg')
@@ -0,0 +1,367 @@
+from datetime import date
+
+import pytest
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.test import RequestFactory
+
+from opencivicdata.legislative.models import Event, EventDocument, EventDocumentLink, \
+                                             EventParticipant
+
+from committeeoversightapp.models import HearingEvent, ArchiveJob, WitnessDetails, \
+                                         EventCommitteeSignature, StaleCommitteeRating
+from committeeoversightapp.views import EventListJson
+from committeeoversightapp.view_utils import save_document, save_witnesses, \
+                                             create_hearing
+
+
+@pytest.mark.django_db
+def test_event_list_json_rows(categorized_hearings):
+    request = RequestFactory().get('/my/datatable/data/')
+    request.user = AnonymousUser()
+
+    view = EventListJson()
+    view.request = request
+
+    rows = view.prepare_results(HearingEvent.objects.order_by('start_date'))
+
+    # Rows match the per-hearing committee and category lookups
+    detail_string = "<a href=\"{0}\">{1}</a>"
+    for row, hearing in zip(rows, HearingEvent.objects.order_by('start_date')):
+        assert row[2] == ', '.join({
+            committee.get_linked_html_short for committee in hearing.committees
+        })
+        assert row[3] == detail_string.format(
+            hearing.category.url,
+            hearing.category.name
+        )
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def edited_hearing(hearing, committee):
+    hearing.start_date = '2017-03-01'
+    hearing.save()
+
+    hearing.participants.create(name=committee.name,
+                                organization=committee,
+                                entity_type='organization')
+
+    transcript = save_document('https://example.com/transcript.pdf', 'transcript', hearing)
+    transcript.links.create(url='https://web.archive.org/transcript.pdf', text='archived')
+
+    save_witnesses(hearing, [{
+        'name': 'Jane Doe',
+        'organization': 'USDA',
+        'url': 'https://example.com/statement.pdf',
+        'retired': False,
+    }])
+
+    return hearing
+
+
+def edit_form_data(hearing, committee, **changes):
+    data = {
+        'event-jurisdiction': hearing.jurisdiction_id,
+        'event-classification': 'Hearing',
+        'event-name': hearing.name,
+        'event-start_date': hearing.start_date,
+        'committee-name': [committee.id],
+        'category-category': '',
+        'transcript-transcript_url': 'https://example.com/transcript.pdf',
+        'transcript-opening_statement_chair': '',
+        'transcript-opening_statement_rm': '',
+        'witness-TOTAL_FORMS': 1,
+        'witness-INITIAL_FORMS': 1,
+        'witness-0-name': 'Jane Doe',
+        'witness-0-organization': 'USDA',
+        'witness-0-url': 'https://example.com/statement.pdf',
+    }
+    data.update(changes)
+
+    return data
+
+
+@pytest.mark.django_db
+def test_event_edit(admin_client, edited_hearing, committee):
+    url = '/hearing/edit/{}/'.format(edited_hearing.id)
+    documents = set(EventDocument.objects.filter(event=edited_hearing))
+    participants = set(edited_hearing.participants.all())
+    jobs = ArchiveJob.objects.count()
+
+    # Fixing a typo in the title leaves everything else alone
+    admin_client.post(url, edit_form_data(edited_hearing, committee,
+                                          **{'event-name': 'Fixed Hearing'}))
+
+    edited_hearing.refresh_from_db()
+    assert edited_hearing.name == 'Fixed Hearing'
+    assert set(EventDocument.objects.filter(event=edited_hearing)) == documents
+    assert set(edited_hearing.participants.all()) == participants
+    assert EventDocumentLink.objects.filter(document__event=edited_hearing,
+                                            text='archived').count() == 1
+    assert ArchiveJob.objects.count() == jobs
+
+    # Changing a URL replaces only that document
+    admin_client.post(url, edit_form_data(edited_hearing, committee, **{
+        'transcript-transcript_url': 'https://example.com/transcript-2.pdf',
+        'witness-0-retired': 'on',
+    }))
+
+    transcript = EventDocument.objects.get(event=edited_hearing, note='transcript')
+    assert transcript not in documents
+    assert transcript.links.get().url == 'https://example.com/transcript-2.pdf'
+    assert ArchiveJob.objects.count() == jobs + 1
+
+    details = WitnessDetails.objects.get(witness__event=edited_hearing)
+    assert details.retired
+    assert details.document in documents
+
+
+@pytest.mark.django_db
+def test_event_edit_updated_at(admin_client, edited_hearing, committee, category_types):
+    url = '/hearing/edit/{}/'.format(edited_hearing.id)
+    form_data = edit_form_data(edited_hearing, committee)
+
+    def updated_at():
+        return Event.objects.get(id=edited_hearing.id).updated_at
+
+    # An edit that changes nothing leaves the hearing alone
+    before = updated_at()
+    admin_client.post(url, form_data)
+    assert updated_at() == before
+
+    # Changing only the category still marks the hearing updated, so that
+    # its committees' last updated dates move
+    admin_client.post(url, dict(form_data, **{'category-category': category_types['Policy'].id}))
+    assert updated_at() > before
+    assert edited_hearing.hearingcategory_set.get().category == category_types['Policy']
+
+
+@pytest.mark.django_db
+def test_event_edit_start_date(admin_client, edited_hearing, committee, congresses):
+    url = '/hearing/edit/{}/'.format(edited_hearing.id)
+    StaleCommitteeRating.objects.all().delete()
+
+    # Moving a hearing to another Congress flags the ratings of both
+    response = admin_client.post(url, edit_form_data(edited_hearing, committee,
+                                                     **{'event-start_date': '2016-03-01'}))
+    assert response.status_code == 302
+
+    edited_hearing.refresh_from_db()
+    assert edited_hearing.start_date == '2016-03-01'
+    assert set(StaleCommitteeRating.objects.values_list('committee_id', 'congress_id')) == \
+        {(committee.id, 114), (committee.id, 115)}
+
+    # Saving the same date as a date object doesn't count as a move
+    StaleCommitteeRating.objects.all().delete()
+    edited_hearing.start_date = date(2016, 3, 1)
+    edited_hearing.save()
+    assert not StaleCommitteeRating.objects.exists()
+
+    # Nor does flagging a rating by a date object fail
+    StaleCommitteeRating.objects.mark(date(2016, 3, 1), [committee.id])
+    assert StaleCommitteeRating.objects.filter(congress_id=114).exists()
+
+
+@pytest.mark.django_db
+def test_create_hearing(jurisdiction, committee, subcommittee, category_types):
+    witnesses = [
+        {'name': 'Jane Doe', 'organization': 'USDA',
+         'url': 'https://example.com/statement.htm', 'retired': False},
+        {'name': 'John Doe', 'organization': '', 'url': '', 'retired': True},
+        {},
+    ]
+    transcript_data = {
+        'transcript_url': 'https://example.com/transcript.pdf',
+        'opening_statement_chair': '',
+        'opening_statement_rm': '',
+    }
+
+    # Nothing is saved if any row is invalid
+    with pytest.raises(ValidationError):
+        create_hearing(Event(jurisdiction=jurisdiction, name='Bad Hearing'),
+                       [committee],
+                       None,
+                       dict(transcript_data, transcript_url='not a url'),
+                       witnesses)
+
+    assert not Event.objects.exists()
+
+    event = Event(jurisdiction=jurisdiction,
+                  name='Farm Hearing',
+                  start_date='2017-03-01',
+                  classification='Hearing')
+
+    metrics = create_hearing(event,
+                             [committee, subcommittee],
+                             category_types['Field'],
+                             transcript_data,
+                             witnesses)
+
+    # A few queries, however many rows are written
+    assert metrics['queries'] < 20
+
+    assert sorted(event.participants.values_list('name', flat=True)) == \
+        sorted([committee.name, subcommittee.name, 'Jane Doe', 'John Doe'])
+    assert HearingEvent.objects.get(id=event.id).category == category_types['Field']
+    assert sorted(EventDocumentLink.objects.filter(document__event=event)
+                  .values_list('url', flat=True)) == \
+        ['https://example.com/statement.htm', 'https://example.com/transcript.pdf']
+    assert ArchiveJob.objects.count() == 2
+
+    details = WitnessDetails.objects.get(witness__name='Jane Doe')
+    assert details.document.note == 'witness statement'
+    assert details.organization == 'USDA'
+    assert WitnessDetails.objects.get(witness__name='John Doe').retired
+
+    # The bulk inserts still sign the hearing. Witnesses aren't organizations,
+    # so it won't match spreadsheet rows by committee.
+    assert EventCommitteeSignature.objects.get(event=event).signature is None
+
+
+@pytest.mark.django_db
+def test_event_list_json_search(edited_hearing, committee, admin_user):
+    def search(text):
+        request = RequestFactory().get('/my/datatable/data/', {'search[value]': text})
+        request.user = admin_user
+
+        view = EventListJson()
+        view.request = request
+
+        return list(view.filter_queryset(HearingEvent.objects.all()))
+
+    # Hearing names, committees, witnesses and witness organizations are
+    # searchable by prefix, as they're typed
+    assert search('Test Hear') == [edited_hearing]
+    assert search('agricul') == [edited_hearing]
+    assert search('jane') == [edited_hearing]
+    assert search('USDA') == [edited_hearing]
+    assert search('hearing farm') == []
+    assert search('!!') == []
+
+    edited_hearing.name = 'Farm Hearing'
+    edited_hearing.save()
+
+    assert search('hearing farm') == [edited_hearing]
+
+
+@pytest.mark.django_db
+def test_event_list_json_search_order(jurisdiction, admin_user):
+    older = Event.objects.create(jurisdiction=jurisdiction,
+                                 name='Oversight of the Farm Bill',
+                                 start_date='2015-03-01')
+    newer = Event.objects.create(jurisdiction=jurisdiction,
+                                 name='Farm Bill Implementation',
+                                 start_date='2018-03-01')
+    EventParticipant.objects.create(event=newer,
+                                    name='Subcommittee on Oversight',
+                                    entity_type='organization')
+
+    def search(column, direction):
+        params = {
+            'draw': 1,
+            'start': 0,
+            'length': 10,
+            'order[0][column]': column,
+            'order[0][dir]': direction,
+            'search[value]': 'oversight',
+        }
+        for i in range(len(EventListJson.columns)):
+            params['columns[{}][data]'.format(i)] = i
+            params['columns[{}][searchable]'.format(i)] = 'true'
+            params['columns[{}][orderable]'.format(i)] = 'true'
+
+        request = RequestFactory().get('/my/datatable/data/', params)
+        request.user = admin_user
+
+        view = EventListJson()
+        view.request = request
+        view.kwargs = {}
+
+        return [row[0] for row in view.get_context_data()['data']]
+
+    # In the default order, a match on the hearing's name beats a newer
+    # hearing's match on a committee
+    assert search(0, 'desc') == [older.start_date, newer.start_date]
+
+    # Sorting by a column still sorts by it
+    assert search(0, 'asc') == [older.start_date, newer.start_date]
+    assert search(1, 'asc') == [newer.start_date, older.start_date]
+
+
+@pytest.mark.django_db
+def test_event_list_json_count_keys(committee, admin_user):
+    def get_view(**params):
+        request = RequestFactory().get('/my/datatable/data/', params)
+        request.user = admin_user
+
+        view = EventListJson()
+        view.request = request
+
+        return view
+
+    views = [
+        get_view(),
+        get_view(**{'search[value]': 'farm'}),
+        get_view(detail_type='committee', id=committee.id),
+    ]
+
+    # Every page and search shares the count of all hearings, but not the
+    # count of the hearings it lists
+    assert len({view.get_cache_key('total', filtered=False) for view in views}) == 1
+    assert len({view.get_cache_key('filtered') for view in views}) == 3
+
+
+@pytest.mark.django_db
+def test_event_list_json_paging(categorized_hearings, jurisdiction, admin_user):
+    # Start from a fresh version of the hearings, so nothing is cached
+    HearingEvent.objects.invalidate()
+
+    def get_view(start=0, length=2):
+        params = {
+            'draw': 1,
+            'start': start,
+            'length': length,
+            'order[0][column]': 0,
+            'order[0][dir]': 'desc',
+        }
+        for i in range(len(EventListJson.columns)):
+            params['columns[{}][data]'.format(i)] = i
+            params['columns[{}][searchable]'.format(i)] = 'true'
+            params['columns[{}][orderable]'.format(i)] = 'true'
+
+        request = RequestFactory().get('/my/datatable/data/', params)
+        request.user = admin_user
+
+        view = EventListJson()
+        view.request = request
+        view.kwargs = {}
+
+        return view
+
+    # Hearings on the same date are ordered by id, so seeking past the
+    # previous page's bookmark returns the same rows as OFFSET
+    for hearing in categorized_hearings[:3]:
+        hearing.start_date = '2016-01-01'
+        hearing.save()
+
+    expected = get_view().prepare_results(
+        HearingEvent.objects.order_by('-start_date', '-id')
+    )
+
+    rows = []
+    for start in range(0, len(expected), 2):
+        rows += get_view(start).get_context_data()['data']
+
+    assert rows == expected
+
+    # Pages without a bookmark fall back to OFFSET
+    assert get_view(3, length=1).get_context_data()['data'] == expected[3:4]
+
+    # Counts are cached until the hearings change
+    Event.objects.create(jurisdiction=jurisdiction, name='New Hearing', start_date='2019-01-01')
+    assert get_view().get_context_data()['recordsTotal'] == len(expected)
+
+    HearingEvent.objects.invalidate()
+    assert get_view().get_context_data()['recordsTotal'] == len(expected) + 1